@@ -13,57 +13,56 @@ def main():
         user='scraper_user',
         password='dev_password_change_in_production'
     )
-    cur = conn.cursor()
 
-    # Get latest embeddings batch
-    cur.execute("""
-        SELECT cluster_batch_id
-        FROM article_clusters
-        WHERE clustering_method = 'embeddings'
-        ORDER BY created_at DESC
-        LIMIT 1
+    # Latest embeddings batch, cluster size statistics and SEC form check in
+    # one round-trip (streamed server-side)
+    stats_cur = conn.cursor(name='cluster_sizes_stream')
+    stats_cur.itersize = 2000
+    stats_cur.execute("""
+        WITH latest_batch AS (
+            SELECT cluster_batch_id
+            FROM article_clusters
+            WHERE clustering_method = 'embeddings'
+            ORDER BY created_at DESC
+            LIMIT 1
+        )
+        SELECT
+            ac.cluster_batch_id,
+            ac.cluster_label,
+            COUNT(*) as size,
+            COUNT(*) FILTER (WHERE a.title ~ 'Form |424B| - ') as sec_count
+        FROM latest_batch lb
+        JOIN article_clusters ac ON ac.cluster_batch_id = lb.cluster_batch_id
+        JOIN articles_raw a ON ac.article_id = a.id
+        GROUP BY ac.cluster_batch_id, ac.cluster_label
     """)
-    batch_id = cur.fetchone()[0]
+
+    batch_id = None
+    num_clusters = 0
+    total_articles = 0
+    sec_count = 0
+    cluster_sizes = Counter()
+    for batch_id, label, size, label_sec_count in stats_cur:
+        sec_count += label_sec_count
+        if label == -1 or size < 2:
+            continue
+        num_clusters += 1
+        total_articles += size
+        cluster_sizes[size] += 1
+    stats_cur.close()
+
+    if batch_id is None:
+        print("No embeddings clustering batches found")
+        conn.close()
+        return
 
     print(f"Cluster Report - Batch ID: {batch_id}")
     print("=" * 80)
     print()
 
-    # Get cluster summary
-    cur.execute("""
-        WITH cluster_info AS (
-            SELECT
-                ac.cluster_label,
-                COUNT(*) as size,
-                ARRAY_AGG(a.title ORDER BY ac.is_centroid DESC, a.published_at DESC) as headlines,
-                ARRAY_AGG(a.source ORDER BY ac.is_centroid DESC, a.published_at DESC) as sources,
-                ARRAY_AGG(ac.is_centroid ORDER BY ac.is_centroid DESC, a.published_at DESC) as centroids
-            FROM article_clusters ac
-            JOIN articles_raw a ON ac.article_id = a.id
-            WHERE ac.cluster_batch_id = %s
-                AND ac.cluster_label <> -1
-            GROUP BY ac.cluster_label
-            HAVING COUNT(*) >= 2
-        )
-        SELECT
-            cluster_label,
-            size,
-            headlines,
-            sources,
-            centroids
-        FROM cluster_info
-        ORDER BY size DESC
-    """, (batch_id,))
-
-    clusters = cur.fetchall()
-
-    # Statistics
-    total_articles = sum(c[1] for c in clusters)
-    cluster_sizes = Counter([c[1] for c in clusters])
-
-    print(f"Total Clusters: {len(clusters)}")
+    print(f"Total Clusters: {num_clusters}")
     print(f"Total Articles in Clusters: {total_articles}")
-    print(f"Average Cluster Size: {total_articles / len(clusters):.1f}")
+    print(f"Average Cluster Size: {total_articles / num_clusters:.1f}")
     print()
 
     print("Cluster Size Distribution:")
@@ -78,29 +77,61 @@ def main():
     print("=" * 80)
     print()
 
-    for i, (label, size, headlines, sources, centroids) in enumerate(clusters[:20], 1):
+    # Pick the 20 largest clusters first, then read at most 10 headlines
+    # for each via LATERAL instead of aggregating every title
+    top_cur = conn.cursor(name='top_clusters_stream')
+    top_cur.itersize = 20
+    top_cur.execute("""
+        SELECT
+            c.cluster_label,
+            c.size,
+            arr.headlines,
+            arr.sources,
+            arr.centroids
+        FROM (
+            SELECT cluster_label, COUNT(*) as size
+            FROM article_clusters
+            WHERE cluster_batch_id = %(batch_id)s
+                AND cluster_label <> -1
+            GROUP BY cluster_label
+            HAVING COUNT(*) >= 2
+            ORDER BY size DESC
+            LIMIT 20
+        ) c
+        CROSS JOIN LATERAL (
+            SELECT
+                ARRAY_AGG(sub.title ORDER BY sub.rn) as headlines,
+                ARRAY_AGG(sub.source ORDER BY sub.rn) as sources,
+                ARRAY_AGG(sub.is_centroid ORDER BY sub.rn) as centroids
+            FROM (
+                SELECT
+                    a.title,
+                    a.source,
+                    ac.is_centroid,
+                    ROW_NUMBER() OVER (ORDER BY ac.is_centroid DESC, a.published_at DESC) as rn
+                FROM article_clusters ac
+                JOIN articles_raw a ON ac.article_id = a.id
+                WHERE ac.cluster_batch_id = %(batch_id)s
+                    AND ac.cluster_label = c.cluster_label
+                ORDER BY ac.is_centroid DESC, a.published_at DESC
+                LIMIT 10
+            ) sub
+        ) arr
+        ORDER BY c.size DESC
+    """, {'batch_id': batch_id})
+
+    for label, size, headlines, sources, centroids in top_cur:
         print(f"Cluster #{label} ({size} articles)")
         print("-" * 80)
 
-        # Show all headlines
-        for j, (headline, source, is_centroid) in enumerate(zip(headlines, sources, centroids)):
+        # Headlines are capped at 10 per cluster server-side
+        for headline, source, is_centroid in zip(headlines, sources, centroids):
             marker = "[CENTROID]" if is_centroid else "          "
             print(f"  {marker} {headline[:100]}")
-            if j >= 9:  # Limit to 10 headlines per cluster
-                if len(headlines) > 10:
-                    print(f"           ... and {len(headlines) - 10} more")
-                break
+        if size > len(headlines):
+            print(f"           ... and {size - len(headlines)} more")
         print()
-
-    # Check for SEC forms
-    cur.execute("""
-        SELECT COUNT(DISTINCT a.id)
-        FROM article_clusters ac
-        JOIN articles_raw a ON ac.article_id = a.id
-        WHERE ac.cluster_batch_id = %s
-            AND (a.title LIKE '%Form %' OR a.title LIKE '%424B%' OR a.title LIKE '% - %')
-    """, (batch_id,))
-    sec_count = cur.fetchone()[0]
+    top_cur.close()
 
     print("=" * 80)
     print(f"SEC Forms found in clusters: {sec_count}")
@@ -0,0 +1,12 @@
+-- Migration 07: Cache headline embeddings of cluster centroids
+-- Run on production: docker cp this_file sp500_postgres:/tmp/ && docker exec sp500_postgres psql -U scraper_user -d sp500_news -f /tmp/07_article_embeddings.sql
+
+-- One unit-length float16 headline embedding per article and model, written
+-- by incremental_clustering.py so centroids are not re-encoded every run
+CREATE TABLE IF NOT EXISTS article_embeddings (
+    article_id INTEGER NOT NULL REFERENCES articles_raw(id) ON DELETE CASCADE,
+    model_name VARCHAR(100) NOT NULL,
+    embedding BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT now(),
+    PRIMARY KEY (article_id, model_name)
+);
@@ -4,8 +4,10 @@ Embeddings Sandbox - Test headline similarity with sentence transformers.
 A mini web app to test how the embeddings clustering works on headlines.
 """
 
+import hashlib
 import os
 import sys
+from collections import OrderedDict
 from flask import Flask, render_template, request, jsonify
 import numpy as np
 
@@ -13,19 +15,114 @@ import numpy as np
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'processing-worker'))
 
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # Falls back to the pure-Python greedy loop
+
+try:
+    import faiss
+except ImportError:
+    faiss = None  # Dense n x n similarity matrix only
 
 app = Flask(__name__)
 
-# Load model once at startup
+
+def _detect_device() -> str:
+    """Pick the fastest available torch device (CUDA, then Apple MPS, then CPU)."""
+    import torch
+
+    if torch.cuda.is_available():
+        return 'cuda'
+    if torch.backends.mps.is_available():
+        return 'mps'
+    torch.set_num_threads(min(8, os.cpu_count() or 1))
+    return 'cpu'
+
+
+class OnnxSentenceEncoder:
+    """
+    all-MiniLM-L6-v2 served through ONNX Runtime on CPU.
+
+    Mirrors the parts of SentenceTransformer used here (`tokenizer` and
+    `encode`): mean pooling over the attention mask, optional L2 norm.
+    The exported graph is cached on disk so export only happens once.
+    """
+
+    MODEL_ID = 'sentence-transformers/all-MiniLM-L6-v2'
+    MAX_SEQ_LENGTH = 256
+    EXPORT_DIR = os.path.join(os.path.dirname(__file__), 'onnx-model')
+
+    def __init__(self):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        if os.path.isdir(self.EXPORT_DIR):
+            self.ort_model = ORTModelForFeatureExtraction.from_pretrained(
+                self.EXPORT_DIR, provider='CPUExecutionProvider'
+            )
+            self.tokenizer = AutoTokenizer.from_pretrained(self.EXPORT_DIR)
+        else:
+            self.ort_model = ORTModelForFeatureExtraction.from_pretrained(
+                self.MODEL_ID, export=True, provider='CPUExecutionProvider'
+            )
+            self.tokenizer = AutoTokenizer.from_pretrained(self.MODEL_ID)
+            self.ort_model.save_pretrained(self.EXPORT_DIR)
+            self.tokenizer.save_pretrained(self.EXPORT_DIR)
+
+    def encode(self, texts: list, batch_size: int = 32, show_progress_bar: bool = False,
+               normalize_embeddings: bool = False) -> np.ndarray:
+        """Encode texts to mean-pooled sentence embeddings."""
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.MAX_SEQ_LENGTH,
+                return_tensors='np'
+            )
+            hidden = self.ort_model(**inputs).last_hidden_state
+            mask = inputs['attention_mask'][..., None].astype(np.float32)
+            batches.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+
+        embeddings = np.concatenate(batches).astype(np.float32, copy=False)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+# Load model once at startup (EMBEDDINGS_BACKEND=onnx for ONNX Runtime on CPU)
 print("Loading sentence transformer model...")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-print("Model loaded!")
+if os.getenv('EMBEDDINGS_BACKEND', 'torch').lower() == 'onnx':
+    device = 'onnx-cpu'
+    model = OnnxSentenceEncoder()
+else:
+    device = _detect_device()
+    model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+    if device == 'cuda':
+        # Half precision halves embedding bandwidth; scores only feed a threshold/sort
+        model.half()
+print(f"Model loaded on {device}!")
 
 # Store headlines in memory for the session
 stored_headlines = []
 stored_embeddings = None
 
+# Embedding cache keyed by sha1(headline); content-addressed so never stale
+EMB_CACHE = {}
+EMB_CACHE_MAX = 50000
+
+# Above this many headlines (and with faiss installed) /analyze skips the
+# dense n x n matrix and works from FAISS neighbor lists instead
+FAISS_MIN_HEADLINES = 2000
+
+# (embeddings, similarity matrix) per headline list, so re-running /analyze
+# at a new threshold only redoes clustering. Small LRU.
+MATRIX_CACHE = OrderedDict()
+MATRIX_CACHE_MAX = 16
+
 
 @app.route('/')
 def index():
@@ -51,34 +148,21 @@ def analyze():
     if len(headlines) < 2:
         return jsonify({'error': 'Need at least 2 headlines to compare'}), 400
 
-    # Generate embeddings
-    embeddings = model.encode(headlines, show_progress_bar=False)
-    stored_headlines = headlines
-    stored_embeddings = embeddings
+    if faiss is not None and len(headlines) >= FAISS_MIN_HEADLINES:
+        # Large inputs: threshold edges and top pairs straight from FAISS
+        embeddings = encode_cached(headlines)
+        clusters, pairs = faiss_cluster_and_pairs(embeddings, headlines, threshold, limit=50)
+    else:
+        embeddings, similarity_matrix = similarity_for(headlines)
 
-    # Compute similarity matrix
-    similarity_matrix = cosine_similarity(embeddings)
+        # Find clusters using greedy algorithm (same as production)
+        clusters = greedy_cluster(similarity_matrix, threshold)
 
-    # Find clusters using greedy algorithm (same as production)
-    clusters = greedy_cluster(similarity_matrix, threshold)
+        # Top pairs from the upper triangle (vectorized, no per-pair Python loop)
+        pairs = top_pairs(similarity_matrix, headlines, threshold, limit=50)
 
-    # Find pairs above threshold
-    pairs = []
-    n = len(headlines)
-    for i in range(n):
-        for j in range(i + 1, n):
-            sim = float(similarity_matrix[i][j])
-            pairs.append({
-                'headline1': headlines[i],
-                'headline2': headlines[j],
-                'similarity': round(sim, 4),
-                'would_cluster': sim >= threshold,
-                'idx1': i,
-                'idx2': j
-            })
-
-    # Sort by similarity descending
-    pairs.sort(key=lambda x: x['similarity'], reverse=True)
+    stored_headlines = headlines
+    stored_embeddings = embeddings
 
     # Build cluster info
     cluster_info = []
@@ -107,7 +191,7 @@ def analyze():
     }
 
     return jsonify({
-        'pairs': pairs[:50],  # Top 50 pairs
+        'pairs': pairs,  # Top 50 pairs
         'clusters': cluster_info,
         'noise_points': noise_points,
         'stats': stats,
@@ -130,10 +214,10 @@ def compare_single():
         return jsonify({'error': 'No headline provided'}), 400
 
     # Encode new headline
-    new_embedding = model.encode([new_headline], show_progress_bar=False)
+    new_embedding = encode_cached([new_headline])
 
-    # Compare against all stored
-    similarities = cosine_similarity(new_embedding, stored_embeddings)[0]
+    # Compare against all stored (normalized, so a GEMV gives cosine)
+    similarities = stored_embeddings @ new_embedding[0]
 
     results = []
     for i, (headline, sim) in enumerate(zip(stored_headlines, similarities)):
@@ -151,8 +235,262 @@ def compare_single():
     })
 
 
+def _pick_batch_size(max_tokens: int) -> int:
+    """Larger batches for short inputs, where padding waste and memory are small."""
+    if max_tokens < 24:
+        return 256
+    if max_tokens < 64:
+        return 128
+    return 32
+
+
+def encode_smart(model, texts: list, batch_size: int = None) -> np.ndarray:
+    """
+    Encode texts in length-sorted order so each batch pads to similar lengths.
+
+    Lengths come from one batched fast-tokenizer call; unless given, the
+    batch size is picked from the longest text.
+
+    Returns L2-normalized float32 embeddings in the original input order.
+    """
+    token_ids = model.tokenizer(texts, add_special_tokens=False)['input_ids']
+    lengths = [len(ids) for ids in token_ids]
+    if batch_size is None:
+        batch_size = _pick_batch_size(max(lengths))
+
+    order = np.argsort(lengths, kind='stable')
+    sorted_texts = [texts[i] for i in order]
+    emb_sorted = model.encode(
+        sorted_texts,
+        batch_size=batch_size,
+        show_progress_bar=False,
+        normalize_embeddings=True
+    )
+    embeddings = np.empty_like(emb_sorted, dtype=np.float32)
+    embeddings[order] = emb_sorted
+    return embeddings
+
+
+def encode_cached(texts: list) -> np.ndarray:
+    """Encode texts, reusing cached embeddings and only encoding cache misses."""
+    keys = [hashlib.sha1(t.encode('utf-8')).hexdigest() for t in texts]
+
+    if len(EMB_CACHE) + len(keys) > EMB_CACHE_MAX:
+        EMB_CACHE.clear()
+
+    misses = {}
+    for key, text in zip(keys, texts):
+        if key not in EMB_CACHE and key not in misses:
+            misses[key] = text
+
+    if misses:
+        new_embeddings = encode_smart(model, list(misses.values()))
+        for key, emb in zip(misses, new_embeddings):
+            EMB_CACHE[key] = emb
+
+    # C-contiguous float32 so the similarity matmul dispatches straight to sgemm
+    return np.ascontiguousarray(np.stack([EMB_CACHE[key] for key in keys]), dtype=np.float32)
+
+
+def similarity_for(headlines: list) -> tuple:
+    """Return (embeddings, similarity matrix) for headlines, cached per headline list."""
+    key = hashlib.blake2b('\n'.join(headlines).encode('utf-8')).hexdigest()
+
+    cached = MATRIX_CACHE.get(key)
+    if cached is not None:
+        MATRIX_CACHE.move_to_end(key)
+        return cached
+
+    # Generate L2-normalized embeddings (dot product == cosine similarity)
+    embeddings = encode_cached(headlines)
+
+    # Compute similarity matrix
+    similarity_matrix = embeddings @ embeddings.T
+
+    MATRIX_CACHE[key] = (embeddings, similarity_matrix)
+    if len(MATRIX_CACHE) > MATRIX_CACHE_MAX:
+        MATRIX_CACHE.popitem(last=False)
+
+    return embeddings, similarity_matrix
+
+
+def top_pairs(similarity_matrix: np.ndarray, headlines: list, threshold: float, limit: int = 50) -> list:
+    """Return the `limit` most similar headline pairs, sorted descending."""
+    n = len(headlines)
+    num_pairs = n * (n - 1) // 2
+    limit = min(limit, num_pairs)
+
+    # Mask out the diagonal and lower triangle in one broadcast np.where
+    # instead of materializing n(n-1)/2 index pairs
+    upper = np.arange(n)[:, None] < np.arange(n)[None, :]
+    flat = np.where(upper, similarity_matrix, -np.inf).ravel()
+
+    # Partial selection of the top `limit` pairs, then sort only those
+    if limit < flat.size:
+        top = np.argpartition(-flat, limit)[:limit]
+    else:
+        top = np.arange(flat.size)
+    top = top[np.argsort(-flat[top], kind='stable')]
+    i_idx, j_idx = np.divmod(top, n)
+
+    return [
+        _pair_dict(headlines, i, j, sim, threshold)
+        for i, j, sim in zip(i_idx, j_idx, flat[top])
+    ]
+
+
+def _pair_dict(headlines: list, i: int, j: int, sim: float, threshold: float) -> dict:
+    """JSON-ready description of one headline pair."""
+    return {
+        'headline1': headlines[i],
+        'headline2': headlines[j],
+        'similarity': round(float(sim), 4),
+        'would_cluster': bool(sim >= threshold),
+        'idx1': int(i),
+        'idx2': int(j)
+    }
+
+
+def faiss_cluster_and_pairs(embeddings: np.ndarray, headlines: list, threshold: float,
+                            limit: int = 50) -> tuple:
+    """
+    Cluster and find top pairs from FAISS search results, without an n x n matrix.
+
+    range_search returns only edges above the threshold (adjacency lists for
+    the greedy clustering). A k-NN search with k = limit + 1 covers the top
+    pairs, since every global top-`limit` pair is among each endpoint's own
+    `limit` nearest neighbors.
+    """
+    n = len(headlines)
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+
+    # Clustering from thresholded adjacency lists
+    lims, _, neighbor_ids = index.range_search(embeddings, threshold)
+    neighbors = []
+    for i in range(n):
+        row = np.sort(neighbor_ids[lims[i]:lims[i + 1]])
+        neighbors.append(row[row != i])
+    clusters = _greedy_cluster_lists(neighbors)
+
+    # Top pairs from each headline's nearest neighbors
+    k = min(n, limit + 1)
+    sims, ids = index.search(embeddings, k)
+    rows = np.repeat(np.arange(n), k)
+    cols = ids.ravel()
+    vals = sims.ravel()
+    valid = (cols >= 0) & (cols != rows)
+    lo = np.minimum(rows, cols)[valid]
+    hi = np.maximum(rows, cols)[valid]
+    vals = vals[valid]
+
+    # Each pair can appear from both endpoints; keep one copy
+    _, first = np.unique(lo * n + hi, return_index=True)
+    top = first[np.argsort(-vals[first], kind='stable')[:limit]]
+    pairs = [_pair_dict(headlines, lo[t], hi[t], vals[t], threshold) for t in top]
+
+    return clusters, pairs
+
+
+def _greedy_cluster_lists(neighbors: list) -> list:
+    """Greedy clustering over per-article neighbor index arrays (sorted, self excluded)."""
+    n = len(neighbors)
+    clusters = [-1] * n  # -1 = noise/unique
+    current_cluster = 0
+
+    # Process in order of most connected first
+    connectivity = np.array([len(row) for row in neighbors])
+    processing_order = np.argsort(-connectivity)
+
+    for i in processing_order:
+        if clusters[i] != -1:
+            continue  # Already assigned
+
+        similar = neighbors[i]
+        if len(similar) == 0:
+            continue  # No matches, stays as noise
+
+        # Check if any similar articles are already in a cluster
+        existing_cluster = None
+        for j in similar:
+            if clusters[j] != -1:
+                existing_cluster = clusters[j]
+                break
+
+        if existing_cluster is not None:
+            # Join existing cluster
+            clusters[i] = existing_cluster
+        else:
+            # Create new cluster
+            clusters[i] = current_cluster
+            for j in similar:
+                if clusters[j] == -1:
+                    clusters[j] = current_cluster
+            current_cluster += 1
+
+    return clusters
+
+
+def _greedy_cluster_kernel(adj: np.ndarray, processing_order: np.ndarray) -> np.ndarray:
+    """Greedy assignment over a boolean adjacency matrix (compiled with numba when available)."""
+    n = adj.shape[0]
+    clusters = np.full(n, -1, dtype=np.int32)
+    current_cluster = 0
+
+    for k in range(n):
+        i = processing_order[k]
+        if clusters[i] != -1:
+            continue  # Already assigned
+
+        # Scan row for similar articles; stop at the first one already clustered
+        has_similar = False
+        existing_cluster = -1
+        for j in range(n):
+            if j != i and adj[i, j]:
+                has_similar = True
+                if clusters[j] != -1:
+                    existing_cluster = clusters[j]
+                    break
+
+        if not has_similar:
+            continue  # No matches, stays as noise
+
+        if existing_cluster != -1:
+            # Join existing cluster
+            clusters[i] = existing_cluster
+        else:
+            # Create new cluster
+            clusters[i] = current_cluster
+            for j in range(n):
+                if j != i and adj[i, j] and clusters[j] == -1:
+                    clusters[j] = current_cluster
+            current_cluster += 1
+
+    return clusters
+
+
+if njit is not None:
+    _greedy_cluster_kernel = njit(cache=True)(_greedy_cluster_kernel)
+
+
 def greedy_cluster(similarity_matrix: np.ndarray, threshold: float) -> list:
     """Greedy clustering algorithm matching production code."""
+    if njit is None:
+        return _greedy_cluster_py(similarity_matrix, threshold)
+
+    adj = np.ascontiguousarray(similarity_matrix >= threshold)
+
+    # Calculate connectivity (how many articles each is similar to)
+    connectivity = adj.sum(axis=1) - 1  # -1 for self
+
+    # Process in order of most connected first
+    processing_order = np.argsort(-connectivity)
+
+    return _greedy_cluster_kernel(adj, processing_order).tolist()
+
+
+def _greedy_cluster_py(similarity_matrix: np.ndarray, threshold: float) -> list:
+    """Pure-Python greedy clustering, used when numba is not installed."""
     n = len(similarity_matrix)
     clusters = [-1] * n  # -1 = noise/unique
     current_cluster = 0
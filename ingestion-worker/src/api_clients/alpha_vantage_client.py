@@ -5,13 +5,17 @@ Documentation: https://www.alphavantage.co/documentation/#news-sentiment
 Rate limits: 5 API calls/minute, 500 calls/day (free tier)
 """
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 from datetime import datetime
-from typing import List, Dict, Optional
-from collections import deque
+from typing import List, Dict, Optional, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from src.logger import setup_logger
+from src.api_clients.rate_limiter import TokenBucket
 
 logger = setup_logger(__name__)
 
@@ -24,27 +28,46 @@ class AlphaVantageClient:
     MAX_REQUESTS_PER_DAY = 500
     REQUEST_TIMEOUT = 10  # seconds
     MAX_RETRIES = 3
-    RETRY_DELAY = 3  # seconds
+    MAX_CONCURRENT_REQUESTS = 2  # worker threads for multi-ticker fetches
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_concurrent_requests: Optional[int] = None):
         """
         Initialize Alpha Vantage client.
 
         Args:
             api_key: Alpha Vantage API key
+            max_concurrent_requests: Worker threads for multi-ticker fetches
+                (defaults to MAX_CONCURRENT_REQUESTS)
         """
         if not api_key or api_key == 'your_alphavantage_api_key_here':
             raise ValueError("Valid Alpha Vantage API key is required")
 
         self.api_key = api_key
+        self.max_concurrent_requests = max_concurrent_requests or self.MAX_CONCURRENT_REQUESTS
         self.session = requests.Session()
+
+        # Pooled keep-alive connections; urllib3 handles retry/backoff so
+        # retries reuse the open TLS connection
+        retry_strategy = Retry(
+            total=self.MAX_RETRIES,
+            backoff_factor=1.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(16, self.max_concurrent_requests),
+            max_retries=retry_strategy
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
         self.session.headers.update({
             'User-Agent': 'S&P500NewsAggregator/1.0'
         })
 
-        # Rate limiting tracking
-        self.request_times_minute = deque(maxlen=self.MAX_REQUESTS_PER_MINUTE)
-        self.request_times_day = deque(maxlen=self.MAX_REQUESTS_PER_DAY)
+        # Rate limiting (token buckets for minute and day budgets)
+        self._minute_bucket = TokenBucket(self.MAX_REQUESTS_PER_MINUTE, 60)
+        self._day_bucket = TokenBucket(self.MAX_REQUESTS_PER_DAY, 86400)
 
     def _wait_for_rate_limit(self):
         """
@@ -54,30 +77,28 @@ class AlphaVantageClient:
         - 5 requests per minute
         - 500 requests per day
         """
-        now = time.time()
-
-        # Check minute limit (more strict for Alpha Vantage)
-        if len(self.request_times_minute) >= self.MAX_REQUESTS_PER_MINUTE:
-            oldest_request = self.request_times_minute[0]
-            time_since_oldest = now - oldest_request
-            if time_since_oldest < 60:
-                sleep_time = 60 - time_since_oldest + 1
-                logger.warning(f"Rate limit reached (minute). Sleeping {sleep_time:.1f}s")
-                time.sleep(sleep_time)
-
         # Check daily limit
-        if len(self.request_times_day) >= self.MAX_REQUESTS_PER_DAY:
+        if self._day_bucket.tokens < 1:
             logger.error("Daily API limit reached (500 requests). Cannot make more requests today.")
             raise Exception("Alpha Vantage daily rate limit exceeded")
 
-        # Record request time
-        self.request_times_minute.append(now)
-        self.request_times_day.append(now)
+        # Reserve a slot in the minute budget (sleeps if it is exhausted)
+        sleep_time = self._minute_bucket.acquire()
+        if sleep_time > 0:
+            logger.warning("Rate limit reached (minute). Sleeping %.1fs", sleep_time)
+            time.sleep(sleep_time)
+
+        # Record request
+        self._day_bucket.consume()
 
     def _make_request(self, params: Dict) -> Optional[Dict]:
         """
         Make API request with retry logic and error handling.
 
+        HTTP-level retries (429/5xx, timeouts) are handled by the session's
+        HTTPAdapter; this loop only retries Alpha Vantage's in-body
+        rate-limit 'Note' responses, which arrive with HTTP 200.
+
         Args:
             params: Query parameters
 
@@ -99,30 +120,21 @@ class AlphaVantageClient:
                     timeout=self.REQUEST_TIMEOUT
                 )
 
-                # Check response status
-                if response.status_code == 429:
-                    logger.warning(f"Rate limit hit (429). Retry {attempt + 1}/{self.MAX_RETRIES}")
-                    time.sleep(self.RETRY_DELAY * (attempt + 1))  # Exponential backoff
-                    continue
-
                 if response.status_code != 200:
-                    logger.error(f"API error {response.status_code}: {response.text}")
-                    if attempt < self.MAX_RETRIES - 1:
-                        time.sleep(self.RETRY_DELAY)
-                        continue
+                    logger.error("API error %s: %s", response.status_code, response.text)
                     return None
 
-                # Parse JSON
-                data = response.json()
+                # Parse JSON (orjson parses the raw bytes, no str decode)
+                data = orjson.loads(response.content)
 
                 # Check for API error messages
                 if 'Error Message' in data:
-                    logger.error(f"API error: {data['Error Message']}")
+                    logger.error("API error: %s", data['Error Message'])
                     return None
 
                 if 'Note' in data:
                     # Rate limit message from Alpha Vantage
-                    logger.warning(f"API note: {data['Note']}")
+                    logger.warning("API note: %s", data['Note'])
                     if attempt < self.MAX_RETRIES - 1:
                         time.sleep(60)  # Wait a minute
                         continue
@@ -131,55 +143,67 @@ class AlphaVantageClient:
                 # Success
                 return data
 
+            except requests.exceptions.RetryError as e:
+                logger.error("Failed after %s retries: %s", self.MAX_RETRIES, e)
+                return None
+
             except requests.exceptions.Timeout:
-                logger.warning(f"Request timeout. Retry {attempt + 1}/{self.MAX_RETRIES}")
-                if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.RETRY_DELAY)
-                    continue
+                logger.warning("Request timeout after %s retries", self.MAX_RETRIES)
                 return None
 
             except requests.exceptions.RequestException as e:
-                logger.error(f"Request error: {e}")
-                if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.RETRY_DELAY)
-                    continue
+                logger.error("Request error: %s", e)
                 return None
 
             except Exception as e:
-                logger.error(f"Unexpected error: {e}")
+                logger.error("Unexpected error: %s", e)
                 return None
 
-        logger.error(f"Failed after {self.MAX_RETRIES} retries")
+        logger.error("Failed after %s retries", self.MAX_RETRIES)
         return None
 
     def _parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
         """
         Parse Alpha Vantage timestamp format.
 
+        The common 'YYYYMMDDTHHMMSS' shape is sliced directly into integers,
+        skipping strptime's per-call format parsing; anything else falls back
+        to ISO 8601.
+
         Args:
             timestamp_str: Timestamp string (format: 'YYYYMMDDTHHMMSS')
 
         Returns:
             datetime object or None
         """
-        try:
-            # Format: 20231225T120000
-            return datetime.strptime(timestamp_str, '%Y%m%dT%H%M%S')
-        except Exception:
+        s = timestamp_str
+        # Format: 20231225T120000
+        if len(s) == 15 and s[8] == 'T' and s[:8].isdigit() and s[9:].isdigit():
+            try:
+                return datetime(
+                    int(s[:4]), int(s[4:6]), int(s[6:8]),
+                    int(s[9:11]), int(s[11:13]), int(s[13:15])
+                )
+            except ValueError:
+                pass  # Out-of-range field, e.g. month 13
+        else:
             try:
                 # Try alternative format with timezone
-                return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            except Exception:
-                logger.warning(f"Could not parse timestamp: {timestamp_str}")
-                return None
+                return datetime.fromisoformat(s.replace('Z', '+00:00'))
+            except ValueError:
+                pass
+
+        logger.warning("Could not parse timestamp: %s", timestamp_str)
+        return None
 
-    def fetch_news_sentiment(self, ticker: str, limit: int = 50) -> List[Dict]:
+    def fetch_news_sentiment(self, ticker: str, limit: int = 50, keep_raw: bool = False) -> List[Dict]:
         """
         Fetch news with sentiment analysis for a specific ticker.
 
         Args:
             ticker: Stock ticker symbol (e.g., 'AAPL')
             limit: Maximum number of articles (default 50, max 1000)
+            keep_raw: Build the per-article 'raw_json' dict (None otherwise)
 
         Returns:
             List of article dictionaries in standardized format with sentiment:
@@ -191,7 +215,7 @@ class AlphaVantageClient:
                 'published_at': datetime,
                 'sentiment_score': float (-1 to 1),
                 'sentiment_label': str,
-                'raw_json': dict
+                'raw_json': dict or None
             }, ...]
         """
         params = {
@@ -201,25 +225,32 @@ class AlphaVantageClient:
             'sort': 'LATEST'
         }
 
-        logger.debug(f"Fetching news sentiment for {ticker}")
+        logger.debug("Fetching news sentiment for %s", ticker)
 
         # Make API request
         data = self._make_request(params)
 
         if not data:
-            logger.warning(f"No data returned for {ticker}")
+            logger.warning("No data returned for %s", ticker)
             return []
 
         # Extract feed items
         feed = data.get('feed', [])
         if not feed:
-            logger.warning(f"No news feed returned for {ticker}")
+            logger.warning("No news feed returned for %s", ticker)
             return []
 
         # Transform to standardized format
+        ticker_upper = ticker.upper()
         articles = []
         for item in feed:
             try:
+                # Validate required fields before doing any other work
+                url = item.get('url', '')
+                title = item.get('title', 'No title')
+                if not url or not title:
+                    continue
+
                 # Parse published timestamp
                 time_published = item.get('time_published', '')
                 published_at = self._parse_timestamp(time_published) if time_published else None
@@ -231,7 +262,7 @@ class AlphaVantageClient:
                 # Find ticker-specific sentiment if available
                 ticker_sentiment = None
                 for ticker_item in item.get('ticker_sentiment', []):
-                    if ticker_item.get('ticker', '').upper() == ticker.upper():
+                    if ticker_item.get('ticker', '').upper() == ticker_upper:
                         ticker_sentiment = {
                             'score': float(ticker_item.get('ticker_sentiment_score', overall_sentiment)),
                             'label': ticker_item.get('ticker_sentiment_label', overall_label),
@@ -247,15 +278,9 @@ class AlphaVantageClient:
                     sentiment_score = float(overall_sentiment)
                     sentiment_label = overall_label
 
-                article = {
-                    'url': item.get('url', ''),
-                    'title': item.get('title', 'No title'),
-                    'summary': item.get('summary', ''),
-                    'source': f"Alpha Vantage ({item.get('source', 'Unknown')})",
-                    'published_at': published_at,
-                    'sentiment_score': sentiment_score,
-                    'sentiment_label': sentiment_label,
-                    'raw_json': {
+                raw_json = None
+                if keep_raw:
+                    raw_json = {
                         'ticker': ticker,
                         'authors': item.get('authors', []),
                         'banner_image': item.get('banner_image', ''),
@@ -265,19 +290,59 @@ class AlphaVantageClient:
                         'ticker_sentiment': ticker_sentiment,
                         'topics': item.get('topics', [])
                     }
-                }
 
-                # Validate required fields
-                if article['url'] and article['title']:
-                    articles.append(article)
+                articles.append({
+                    'url': url,
+                    'title': title,
+                    'summary': item.get('summary', ''),
+                    'source': f"Alpha Vantage ({item.get('source', 'Unknown')})",
+                    'published_at': published_at,
+                    'sentiment_score': sentiment_score,
+                    'sentiment_label': sentiment_label,
+                    'raw_json': raw_json
+                })
 
             except Exception as e:
-                logger.error(f"Error parsing article for {ticker}: {e}")
+                logger.error("Error parsing article for %s: %s", ticker, e)
                 continue
 
-        logger.info(f"Fetched {len(articles)} articles with sentiment for {ticker} from Alpha Vantage")
+        logger.info("Fetched %s articles with sentiment for %s from Alpha Vantage", len(articles), ticker)
         return articles
 
+    def fetch_news_sentiment_concurrent(
+        self,
+        tickers: List[str],
+        limit: int = 50,
+        keep_raw: bool = False
+    ) -> Iterator[Tuple[str, List[Dict], Optional[Exception]]]:
+        """
+        Fetch news for many tickers concurrently.
+
+        Requests run on a thread pool sharing this client's session and rate
+        limiter, so the minute budget is filled instead of idling on
+        sequential round-trips.
+
+        Args:
+            tickers: Stock ticker symbols
+            limit: Passed through to fetch_news_sentiment()
+            keep_raw: Passed through to fetch_news_sentiment()
+
+        Yields:
+            (ticker, articles, error) as each ticker completes; error is None
+            on success
+        """
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as executor:
+            futures = {
+                executor.submit(self.fetch_news_sentiment, ticker, limit, keep_raw): ticker
+                for ticker in tickers
+            }
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    yield ticker, future.result(), None
+                except Exception as e:
+                    yield ticker, [], e
+
     def get_request_stats(self) -> Dict:
         """
         Get current rate limit statistics.
@@ -285,11 +350,17 @@ class AlphaVantageClient:
         Returns:
             Dictionary with request counts
         """
+        minute_remaining = int(self._minute_bucket.tokens)
+        daily_remaining = int(self._day_bucket.tokens)
         return {
-            'requests_last_minute': len(self.request_times_minute),
-            'requests_today': len(self.request_times_day),
+            'requests_last_minute': self.MAX_REQUESTS_PER_MINUTE - minute_remaining,
+            'requests_today': self.MAX_REQUESTS_PER_DAY - daily_remaining,
             'minute_limit': self.MAX_REQUESTS_PER_MINUTE,
             'daily_limit': self.MAX_REQUESTS_PER_DAY,
-            'minute_remaining': self.MAX_REQUESTS_PER_MINUTE - len(self.request_times_minute),
-            'daily_remaining': self.MAX_REQUESTS_PER_DAY - len(self.request_times_day)
+            'minute_remaining': minute_remaining,
+            'daily_remaining': daily_remaining
         }
+
+    def close(self):
+        """Close the pooled HTTP session."""
+        self.session.close()
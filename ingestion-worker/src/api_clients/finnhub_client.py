@@ -5,13 +5,17 @@ Documentation: https://finnhub.io/docs/api/company-news
 Rate limits: 60 API calls/minute, 500 calls/day (free tier)
 """
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from collections import deque
+from typing import List, Dict, Optional, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from src.logger import setup_logger
+from src.api_clients.rate_limiter import TokenBucket
 
 logger = setup_logger(__name__)
 
@@ -24,29 +28,47 @@ class FinnhubClient:
     MAX_REQUESTS_PER_DAY = 500
     REQUEST_TIMEOUT = 10  # seconds
     MAX_RETRIES = 3
-    RETRY_DELAY = 2  # seconds
+    MAX_CONCURRENT_REQUESTS = 8  # worker threads for multi-ticker fetches
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_concurrent_requests: Optional[int] = None):
         """
         Initialize Finnhub client.
 
         Args:
             api_key: Finnhub API key
+            max_concurrent_requests: Worker threads for multi-ticker fetches
+                (defaults to MAX_CONCURRENT_REQUESTS)
         """
         if not api_key or api_key == 'your_finnhub_api_key_here':
             raise ValueError("Valid Finnhub API key is required")
 
         self.api_key = api_key
+        self.max_concurrent_requests = max_concurrent_requests or self.MAX_CONCURRENT_REQUESTS
         self.session = requests.Session()
+
+        # Pooled keep-alive connections; urllib3 handles retry/backoff so
+        # retries reuse the open TLS connection
+        retry_strategy = Retry(
+            total=self.MAX_RETRIES,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(16, self.max_concurrent_requests),
+            max_retries=retry_strategy
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
         self.session.headers.update({
             'X-Finnhub-Token': self.api_key,
             'User-Agent': 'S&P500NewsAggregator/1.0'
         })
 
-        # Rate limiting tracking
-        self.request_times_minute = deque(maxlen=self.MAX_REQUESTS_PER_MINUTE)
-        self.request_times_day = deque(maxlen=self.MAX_REQUESTS_PER_DAY)
-        self.daily_request_count = 0
+        # Rate limiting (token buckets for minute and day budgets)
+        self._minute_bucket = TokenBucket(self.MAX_REQUESTS_PER_MINUTE, 60)
+        self._day_bucket = TokenBucket(self.MAX_REQUESTS_PER_DAY, 86400)
 
     def _wait_for_rate_limit(self):
         """
@@ -56,29 +78,26 @@ class FinnhubClient:
         - 60 requests per minute
         - 500 requests per day
         """
-        now = time.time()
-
-        # Check minute limit
-        if len(self.request_times_minute) >= self.MAX_REQUESTS_PER_MINUTE:
-            oldest_request = self.request_times_minute[0]
-            time_since_oldest = now - oldest_request
-            if time_since_oldest < 60:
-                sleep_time = 60 - time_since_oldest + 1
-                logger.warning(f"Rate limit reached (minute). Sleeping {sleep_time:.1f}s")
-                time.sleep(sleep_time)
-
         # Check daily limit
-        if len(self.request_times_day) >= self.MAX_REQUESTS_PER_DAY:
+        if self._day_bucket.tokens < 1:
             logger.error("Daily API limit reached (500 requests). Cannot make more requests today.")
             raise Exception("Finnhub daily rate limit exceeded")
 
-        # Record request time
-        self.request_times_minute.append(now)
-        self.request_times_day.append(now)
+        # Reserve a slot in the minute budget (sleeps if it is exhausted)
+        sleep_time = self._minute_bucket.acquire()
+        if sleep_time > 0:
+            logger.warning("Rate limit reached (minute). Sleeping %.1fs", sleep_time)
+            time.sleep(sleep_time)
+
+        # Record request
+        self._day_bucket.consume()
 
     def _make_request(self, endpoint: str, params: Dict) -> Optional[Dict]:
         """
-        Make API request with retry logic and error handling.
+        Make API request with error handling.
+
+        Retries with exponential backoff (429/5xx, timeouts) are handled by
+        the session's HTTPAdapter.
 
         Args:
             endpoint: API endpoint (e.g., '/company-news')
@@ -89,60 +108,45 @@ class FinnhubClient:
         """
         url = f"{self.BASE_URL}{endpoint}"
 
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                # Wait for rate limit
-                self._wait_for_rate_limit()
-
-                # Make request
-                response = self.session.get(
-                    url,
-                    params=params,
-                    timeout=self.REQUEST_TIMEOUT
-                )
-
-                # Handle rate limit response
-                if response.status_code == 429:
-                    logger.warning(f"Rate limit hit (429). Retry {attempt + 1}/{self.MAX_RETRIES}")
-                    time.sleep(self.RETRY_DELAY * (attempt + 1))  # Exponential backoff
-                    continue
-
-                # Handle unauthorized
-                if response.status_code == 401:
-                    logger.error("Invalid API key (401). Check your Finnhub API key.")
-                    return None
-
-                # Handle other errors
-                if response.status_code != 200:
-                    logger.error(f"API error {response.status_code}: {response.text}")
-                    if attempt < self.MAX_RETRIES - 1:
-                        time.sleep(self.RETRY_DELAY)
-                        continue
-                    return None
-
-                # Success
-                return response.json()
-
-            except requests.exceptions.Timeout:
-                logger.warning(f"Request timeout. Retry {attempt + 1}/{self.MAX_RETRIES}")
-                if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.RETRY_DELAY)
-                    continue
-                return None
+        try:
+            # Wait for rate limit
+            self._wait_for_rate_limit()
+
+            # Make request
+            response = self.session.get(
+                url,
+                params=params,
+                timeout=self.REQUEST_TIMEOUT
+            )
 
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request error: {e}")
-                if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.RETRY_DELAY)
-                    continue
+            # Handle unauthorized
+            if response.status_code == 401:
+                logger.error("Invalid API key (401). Check your Finnhub API key.")
                 return None
 
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
+            # Handle other errors
+            if response.status_code != 200:
+                logger.error("API error %s: %s", response.status_code, response.text)
                 return None
 
-        logger.error(f"Failed after {self.MAX_RETRIES} retries")
-        return None
+            # Success (orjson parses the raw bytes, no str decode)
+            return orjson.loads(response.content)
+
+        except requests.exceptions.RetryError as e:
+            logger.error("Failed after %s retries: %s", self.MAX_RETRIES, e)
+            return None
+
+        except requests.exceptions.Timeout:
+            logger.warning("Request timeout after %s retries", self.MAX_RETRIES)
+            return None
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Request error: %s", e)
+            return None
+
+        except Exception as e:
+            logger.error("Unexpected error: %s", e)
+            return None
 
     def fetch_company_news(self, ticker: str, days_back: int = 7) -> List[Dict]:
         """
@@ -174,13 +178,13 @@ class FinnhubClient:
             'to': to_date.strftime('%Y-%m-%d')
         }
 
-        logger.debug(f"Fetching news for {ticker} from {params['from']} to {params['to']}")
+        logger.debug("Fetching news for %s from %s to %s", ticker, params['from'], params['to'])
 
         # Make API request
         data = self._make_request('/company-news', params)
 
         if not data or not isinstance(data, list):
-            logger.warning(f"No news data returned for {ticker}")
+            logger.warning("No news data returned for %s", ticker)
             return []
 
         # Transform to standardized format
@@ -214,12 +218,44 @@ class FinnhubClient:
                     articles.append(article)
 
             except Exception as e:
-                logger.error(f"Error parsing article for {ticker}: {e}")
+                logger.error("Error parsing article for %s: %s", ticker, e)
                 continue
 
-        logger.info(f"Fetched {len(articles)} articles for {ticker} from Finnhub")
+        logger.info("Fetched %s articles for %s from Finnhub", len(articles), ticker)
         return articles
 
+    def fetch_company_news_concurrent(
+        self,
+        tickers: List[str],
+        days_back: int = 7
+    ) -> Iterator[Tuple[str, List[Dict], Optional[Exception]]]:
+        """
+        Fetch news for many tickers concurrently.
+
+        Requests run on a thread pool sharing this client's session and rate
+        limiter, so the minute budget is filled instead of idling on
+        sequential round-trips.
+
+        Args:
+            tickers: Stock ticker symbols
+            days_back: Passed through to fetch_company_news()
+
+        Yields:
+            (ticker, articles, error) as each ticker completes; error is None
+            on success
+        """
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as executor:
+            futures = {
+                executor.submit(self.fetch_company_news, ticker, days_back): ticker
+                for ticker in tickers
+            }
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    yield ticker, future.result(), None
+                except Exception as e:
+                    yield ticker, [], e
+
     def get_request_stats(self) -> Dict:
         """
         Get current rate limit statistics.
@@ -227,11 +263,17 @@ class FinnhubClient:
         Returns:
             Dictionary with request counts
         """
+        minute_remaining = int(self._minute_bucket.tokens)
+        daily_remaining = int(self._day_bucket.tokens)
         return {
-            'requests_last_minute': len(self.request_times_minute),
-            'requests_today': len(self.request_times_day),
+            'requests_last_minute': self.MAX_REQUESTS_PER_MINUTE - minute_remaining,
+            'requests_today': self.MAX_REQUESTS_PER_DAY - daily_remaining,
             'minute_limit': self.MAX_REQUESTS_PER_MINUTE,
             'daily_limit': self.MAX_REQUESTS_PER_DAY,
-            'minute_remaining': self.MAX_REQUESTS_PER_MINUTE - len(self.request_times_minute),
-            'daily_remaining': self.MAX_REQUESTS_PER_DAY - len(self.request_times_day)
+            'minute_remaining': minute_remaining,
+            'daily_remaining': daily_remaining
         }
+
+    def close(self):
+        """Close the pooled HTTP session."""
+        self.session.close()
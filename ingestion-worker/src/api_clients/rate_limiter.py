@@ -0,0 +1,84 @@
+"""
+Token-bucket rate limiter for API clients.
+
+O(1) per request: a float token count refilled from elapsed monotonic time,
+instead of tracking a timestamp per request.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket allowing `capacity` requests per `period` seconds."""
+
+    def __init__(self, capacity: int, period: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            capacity: Maximum number of requests per period (burst size)
+            period: Refill period in seconds
+        """
+        self.capacity = capacity
+        self.refill_rate = capacity / period  # tokens per second
+        self._tokens = float(capacity)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Add tokens for the time elapsed since the last refill."""
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._refilled_at = now
+
+    @property
+    def tokens(self) -> float:
+        """Currently available tokens."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self) -> float:
+        """
+        Reserve one token, returning how long the caller must sleep first.
+
+        The reservation is atomic, so concurrent callers queue up behind
+        each other instead of all seeing the same free token.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_rate
+
+    def consume(self):
+        """Take one token (may go negative if called without waiting)."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+
+    def wait(self):
+        """Reserve one token, sleeping until it is available."""
+        sleep_time = self.acquire()
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+    def drain(self, seconds: float):
+        """
+        Empty the bucket so no token is available for `seconds`.
+
+        Used when the server signals throttling (e.g. HTTP 429), so every
+        caller sharing the bucket backs off, not just the one that was hit.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.refill_rate)
+
+
+# SEC asks for at most 10 requests/second per user agent across all of
+# sec.gov/data.sec.gov; every SEC call in the process shares this bucket
+SEC_RATE_LIMITER = TokenBucket(10, 1)
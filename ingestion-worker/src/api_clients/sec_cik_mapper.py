@@ -4,14 +4,31 @@ SEC CIK Mapper utility.
 Downloads and parses SEC company tickers JSON to map ticker symbols to CIK numbers.
 """
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Optional
-import json
+import os
+import time
 
 from src.logger import setup_logger
+from src.api_clients.rate_limiter import SEC_RATE_LIMITER
 
 logger = setup_logger(__name__)
 
+# Shared keep-alive session for sec.gov requests; urllib3 retries 429/5xx
+# with backoff on the pooled connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+_SESSION.headers.update({
+    'User-Agent': 'S&P500NewsAggregator/1.0 (Educational/Research Project)'
+})
+
 
 class SECCIKMapper:
     """Maps ticker symbols to SEC CIK numbers."""
@@ -19,26 +36,80 @@ class SECCIKMapper:
     SEC_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
     REQUEST_TIMEOUT = 30
 
+    # The SEC mapping changes at most daily; cache the parsed result
+    CACHE_TTL = 86400  # seconds
+    CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'sec_ticker_to_cik.json')
+
+    # In-process memo shared by all instances: url -> (loaded_at, mapping)
+    _memo: Dict[str, tuple] = {}
+
     def __init__(self):
         """Initialize CIK mapper."""
         self.ticker_to_cik = {}
 
+    def _load_cached_mapping(self) -> Optional[Dict[str, str]]:
+        """
+        Return a cached mapping younger than CACHE_TTL, from memory or disk.
+
+        Returns:
+            Cached ticker -> CIK mapping, or None if no fresh cache exists
+        """
+        now = time.time()
+
+        memo = self._memo.get(self.SEC_TICKERS_URL)
+        if memo and now - memo[0] < self.CACHE_TTL:
+            return memo[1]
+
+        try:
+            mtime = os.path.getmtime(self.CACHE_PATH)
+            if now - mtime < self.CACHE_TTL:
+                with open(self.CACHE_PATH, 'rb') as f:
+                    mapping = orjson.loads(f.read())
+                self._memo[self.SEC_TICKERS_URL] = (mtime, mapping)
+                return mapping
+        except (OSError, ValueError) as e:
+            logger.debug(f"No usable CIK mapping cache: {e}")
+
+        return None
+
+    def _save_cached_mapping(self, mapping: Dict[str, str]):
+        """Store mapping in memory and atomically on disk."""
+        self._memo[self.SEC_TICKERS_URL] = (time.time(), mapping)
+
+        try:
+            os.makedirs(os.path.dirname(self.CACHE_PATH), exist_ok=True)
+            tmp_path = f"{self.CACHE_PATH}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(mapping))
+            os.replace(tmp_path, self.CACHE_PATH)
+        except OSError as e:
+            logger.warning(f"Could not write CIK mapping cache: {e}")
+
     def download_cik_mapping(self) -> Dict[str, str]:
         """
         Download CIK mapping from SEC.
 
+        Served from the in-process or on-disk cache when it is less than
+        CACHE_TTL old.
+
         Returns:
             Dictionary mapping ticker -> CIK (as zero-padded 10-digit string)
         """
+        cached = self._load_cached_mapping()
+        if cached is not None:
+            logger.info(f"Using cached CIK mapping for {len(cached)} companies")
+            self.ticker_to_cik = cached
+            return cached
+
         try:
             logger.info(f"Downloading CIK mapping from SEC: {self.SEC_TICKERS_URL}")
 
             headers = {
-                'User-Agent': 'S&P500NewsAggregator/1.0 (Educational/Research Project)',
                 'Accept': 'application/json'
             }
 
-            response = requests.get(
+            SEC_RATE_LIMITER.wait()
+            response = _SESSION.get(
                 self.SEC_TICKERS_URL,
                 headers=headers,
                 timeout=self.REQUEST_TIMEOUT
@@ -48,7 +119,8 @@ class SECCIKMapper:
                 logger.error(f"Failed to download CIK mapping: HTTP {response.status_code}")
                 return {}
 
-            data = response.json()
+            # orjson parses the ~1MB body straight from bytes
+            data = orjson.loads(response.content)
 
             # Parse the SEC format
             # Format: {"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}, ...}
@@ -64,6 +136,7 @@ class SECCIKMapper:
 
             logger.info(f"Successfully downloaded CIK mapping for {len(ticker_to_cik)} companies")
             self.ticker_to_cik = ticker_to_cik
+            self._save_cached_mapping(ticker_to_cik)
             return ticker_to_cik
 
         except requests.exceptions.Timeout:
@@ -72,7 +145,7 @@ class SECCIKMapper:
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error while downloading CIK mapping: {e}")
             return {}
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse CIK mapping JSON: {e}")
             return {}
         except Exception as e:
@@ -112,21 +185,21 @@ class SECCIKMapper:
         tickers = db_manager.get_all_tickers()
         logger.info(f"Found {len(tickers)} tickers in database")
 
-        updated_count = 0
+        # Resolve all CIKs locally, then update in one round-trip
+        ticker_ciks = []
         not_found_count = 0
 
         for ticker in tickers:
             cik = self.get_cik(ticker)
 
             if cik:
-                # Update database
-                success = db_manager.update_company_cik(ticker, cik)
-                if success:
-                    updated_count += 1
+                ticker_ciks.append((ticker, cik))
             else:
                 logger.warning(f"CIK not found for ticker: {ticker}")
                 not_found_count += 1
 
+        updated_count = db_manager.bulk_update_company_ciks(ticker_ciks)
+
         logger.info(
             f"CIK update complete: {updated_count} updated, "
             f"{not_found_count} not found, "
@@ -31,6 +31,12 @@ class Config:
     NEWSAPI_KEY = os.getenv('NEWSAPI_KEY', '')
     POLYGON_API_KEY = os.getenv('POLYGON_API_KEY', '')
 
+    # Concurrent requests per multi-ticker fetch (rate limiters still cap
+    # the request rate; this only bounds how many are in flight)
+    FINNHUB_CONCURRENCY = int(os.getenv('FINNHUB_CONCURRENCY', '8'))
+    ALPHAVANTAGE_CONCURRENCY = int(os.getenv('ALPHAVANTAGE_CONCURRENCY', '2'))
+    SEEKINGALPHA_CONCURRENCY = int(os.getenv('SEEKINGALPHA_CONCURRENCY', '4'))
+
     # RSS Feed URLs
     RSS_FEEDS = [
         {
@@ -4,12 +4,16 @@ Database connection and operations module.
 Handles PostgreSQL connections and article storage.
 """
 
+import functools
+import io
+import time
+import orjson
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, Json, execute_values
 from psycopg2 import pool
-import json
+import weakref
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Set, Iterable, Iterator
 from contextlib import contextmanager
 
 from src.config import Config
@@ -18,29 +22,122 @@ from src.logger import setup_logger
 logger = setup_logger(__name__)
 
 
+def _orjson_dumps(obj) -> str:
+    """Serialize with orjson (psycopg2's Json expects a str)."""
+    return orjson.dumps(obj).decode()
+
+
+def json_param(obj: Optional[Dict]) -> Optional[Json]:
+    """
+    Wrap a dict as a jsonb query parameter, serialized with orjson.
+
+    Args:
+        obj: Value to store (falsy values become NULL)
+
+    Returns:
+        Json adapter, or None
+    """
+    return Json(obj, dumps=_orjson_dumps) if obj else None
+
+
+def _csv_field(value: Optional[str]) -> str:
+    """
+    Format one value for COPY ... WITH CSV.
+
+    NULL is an unquoted empty field; every other value is quoted, so empty
+    strings stay empty strings instead of loading as NULL.
+    """
+    if value is None:
+        return ''
+    return '"' + value.replace('"', '""') + '"'
+
+# Server-side prepared statement for single-row article inserts
+INSERT_ARTICLE_PREPARE = """
+    PREPARE ins_article (text, text, text, text, timestamptz, jsonb) AS
+    INSERT INTO articles_raw
+    (url, title, summary, source, published_at, raw_json)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    ON CONFLICT (url) DO NOTHING
+    RETURNING id
+"""
+
+
+def _cached_company_query(method):
+    """
+    Cache a companies-table read per arguments for COMPANY_CACHE_TTL seconds.
+
+    The company list changes rarely (CIK refreshes invalidate the cache), so
+    scheduled tasks reuse one result instead of re-querying every tick.
+    Empty results, including errors, are not cached.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        entry = self._company_cache.get(key)
+        if entry is not None and now - entry[0] < self.COMPANY_CACHE_TTL:
+            return entry[1]
+
+        result = method(self, *args, **kwargs)
+        if result:
+            self._company_cache[key] = (now, result)
+        return result
+
+    return wrapper
+
+
 class DatabaseManager:
     """Manages database connections and operations."""
 
+    # Seconds an article count estimate is reused by get_article_count_fast()
+    ARTICLE_COUNT_TTL = 60
+
+    # Seconds ticker/company lists are reused (see _cached_company_query)
+    COMPANY_CACHE_TTL = 3600
+
     def __init__(self):
         """Initialize database connection pool."""
         self.connection_pool = None
+        # Pooled connections that already have ins_article prepared
+        self._prepared_conns = weakref.WeakSet()
+        # (monotonic time, estimate) of the last article count estimate
+        self._article_count_cache: Tuple[float, int] = (0.0, 0)
+        # (method, args) -> (monotonic time, result) for company queries
+        self._company_cache: Dict[tuple, tuple] = {}
         self._initialize_pool()
 
     def _initialize_pool(self):
-        """Create connection pool."""
+        """
+        Create a thread-safe connection pool and pre-warm it.
+
+        TCP keepalives stop idle pooled connections from being silently
+        dropped by middleboxes; the minconn connections are opened up front
+        so the first queries do not pay connection setup.
+        """
         try:
-            self.connection_pool = psycopg2.pool.SimpleConnectionPool(
-                minconn=1,
+            self.connection_pool = psycopg2.pool.ThreadedConnectionPool(
+                minconn=2,
                 maxconn=10,
                 host=Config.DB_HOST,
                 port=Config.DB_PORT,
                 database=Config.DB_NAME,
                 user=Config.DB_USER,
-                password=Config.DB_PASSWORD
+                password=Config.DB_PASSWORD,
+                connect_timeout=5,
+                keepalives=1,
+                keepalives_idle=30,
+                keepalives_interval=10,
+                keepalives_count=3
             )
+
+            # Pre-warm: check out and return the minimum connections once
+            warm = [self.connection_pool.getconn() for _ in range(self.connection_pool.minconn)]
+            for conn in warm:
+                self.connection_pool.putconn(conn)
+
             logger.info("Database connection pool initialized")
         except Exception as e:
-            logger.error(f"Failed to initialize connection pool: {e}")
+            logger.error("Failed to initialize connection pool: %s", e)
             raise
 
     @contextmanager
@@ -59,7 +156,7 @@ class DatabaseManager:
         except Exception as e:
             if conn:
                 conn.rollback()
-            logger.error(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             raise
         finally:
             if conn:
@@ -80,9 +177,24 @@ class DatabaseManager:
                     logger.info("Database connection test successful")
                     return result[0] == 1
         except Exception as e:
-            logger.error(f"Database connection test failed: {e}")
+            logger.error("Database connection test failed: %s", e)
             return False
 
+    def _ensure_insert_prepared(self, conn, cur):
+        """
+        PREPARE the single-row article insert once per pooled connection.
+
+        Prepared statements live for the session, so the parse/plan cost
+        is paid on the first insert through each connection only.
+
+        Args:
+            conn: Pooled database connection
+            cur: Cursor on that connection
+        """
+        if conn not in self._prepared_conns:
+            cur.execute(INSERT_ARTICLE_PREPARE)
+            self._prepared_conns.add(conn)
+
     def insert_article(
         self,
         url: str,
@@ -110,41 +222,190 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
                     # Insert with ON CONFLICT DO NOTHING for deduplication
-                    cur.execute("""
-                        INSERT INTO articles_raw
-                        (url, title, summary, source, published_at, raw_json)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (url) DO NOTHING
-                        RETURNING id
-                    """, (
+                    self._ensure_insert_prepared(conn, cur)
+                    cur.execute("EXECUTE ins_article (%s, %s, %s, %s, %s, %s)", (
                         url,
                         title,
                         summary,
                         source,
                         published_at,
-                        json.dumps(raw_json) if raw_json else None
+                        json_param(raw_json)
                     ))
 
                     result = cur.fetchone()
                     if result:
                         article_id = result[0]
-                        logger.debug(f"Inserted article: {article_id} - {title[:50]}...")
+                        logger.debug("Inserted article: %s - %.50s...", article_id, title)
                         return article_id
                     else:
-                        logger.debug(f"Duplicate article skipped: {url}")
+                        logger.debug("Duplicate article skipped: %s", url)
                         return None
 
         except Exception as e:
-            logger.error(f"Failed to insert article: {e}")
+            logger.error("Failed to insert article: %s", e)
             return None
 
-    def get_article_count(self) -> int:
+    def bulk_insert_articles(self, articles: List[Dict], page_size: int = 500) -> int:
+        """
+        Insert many articles in one transaction with deduplication.
+
+        Uses execute_values so each page of rows is a single multi-row
+        INSERT. If the batch fails (e.g. one malformed row), falls back to
+        per-row insert_article so good rows are still stored.
+
+        Args:
+            articles: Article dicts with url, title, summary, source,
+                published_at and raw_json keys
+            page_size: Rows per INSERT statement
+
+        Returns:
+            Number of articles inserted (duplicates are skipped)
+        """
+        rows = [
+            (
+                article['url'],
+                article['title'],
+                article['summary'],
+                article['source'],
+                article['published_at'],
+                json_param(article['raw_json'])
+            )
+            for article in articles
+        ]
+        return self.bulk_insert_rows(rows, page_size=page_size)
+
+    def bulk_insert_rows(self, rows: List[Tuple], page_size: int = 500) -> int:
+        """
+        Insert pre-built article rows in one transaction with deduplication.
+
+        Args:
+            rows: Tuples shaped as the INSERT row:
+                (url, title, summary, source, published_at, raw_json), with
+                raw_json already wrapped with json_param() (or None)
+            page_size: Rows per INSERT statement
+
+        Returns:
+            Number of articles inserted (duplicates are skipped)
+        """
+        if not rows:
+            return 0
+
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    inserted = execute_values(
+                        cur,
+                        """
+                        INSERT INTO articles_raw
+                        (url, title, summary, source, published_at, raw_json)
+                        VALUES %s
+                        ON CONFLICT (url) DO NOTHING
+                        RETURNING id
+                        """,
+                        rows,
+                        page_size=page_size,
+                        fetch=True
+                    )
+                    logger.debug("Bulk inserted %s/%s articles", len(inserted), len(rows))
+                    return len(inserted)
+
+        except Exception as e:
+            logger.error("Bulk insert failed, falling back to per-row inserts: %s", e)
+            inserted_count = 0
+            for url, title, summary, source, published_at, raw_json in rows:
+                article_id = self.insert_article(
+                    url=url,
+                    title=title,
+                    summary=summary,
+                    source=source,
+                    published_at=published_at,
+                    raw_json=raw_json.adapted if raw_json is not None else None
+                )
+                if article_id is not None:
+                    inserted_count += 1
+            return inserted_count
+
+    def copy_articles(self, rows: List[Tuple]) -> int:
+        """
+        Load a large batch of article rows with COPY (for initial loads).
+
+        Rows are streamed as CSV into a temporary staging table, then moved
+        into articles_raw with ON CONFLICT (url) DO NOTHING in the same
+        transaction. Falls back to bulk_insert_rows() if the COPY fails.
+        Incremental cycles should keep using bulk_insert_rows().
+
+        Args:
+            rows: Tuples shaped as for bulk_insert_rows()
+
+        Returns:
+            Number of articles inserted (duplicates are skipped)
+        """
+        if not rows:
+            return 0
+
+        buffer = io.StringIO()
+        for url, title, summary, source, published_at, raw_json in rows:
+            buffer.write(','.join(_csv_field(value) for value in (
+                url,
+                title,
+                summary,
+                source,
+                published_at.isoformat() if published_at else None,
+                raw_json.dumps(raw_json.adapted) if raw_json is not None else None
+            )))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    # published_at is staged as timestamptz so offsets are
+                    # converted the same way as in bulk_insert_rows()
+                    cur.execute("""
+                        CREATE TEMP TABLE articles_raw_staging (
+                            url VARCHAR(1000),
+                            title TEXT,
+                            summary TEXT,
+                            source VARCHAR(100),
+                            published_at TIMESTAMPTZ,
+                            raw_json JSONB
+                        ) ON COMMIT DROP
+                    """)
+                    cur.copy_expert(
+                        "COPY articles_raw_staging "
+                        "(url, title, summary, source, published_at, raw_json) "
+                        "FROM STDIN WITH CSV",
+                        buffer
+                    )
+                    cur.execute("""
+                        INSERT INTO articles_raw
+                        (url, title, summary, source, published_at, raw_json)
+                        SELECT url, title, summary, source, published_at, raw_json
+                        FROM articles_raw_staging
+                        ON CONFLICT (url) DO NOTHING
+                    """)
+                    inserted = cur.rowcount
+                    logger.info("COPY loaded %s/%s articles", inserted, len(rows))
+                    return inserted
+
+        except Exception as e:
+            logger.error("COPY load failed, falling back to batched inserts: %s", e)
+            return self.bulk_insert_rows(rows)
+
+    def get_article_count(self, exact: bool = True) -> int:
         """
         Get total count of articles in database.
 
+        Args:
+            exact: Run COUNT(*) (a full scan); if False, return the planner
+                estimate from get_article_count_fast()
+
         Returns:
             Number of articles
         """
+        if not exact:
+            return self.get_article_count_fast()
+
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
@@ -152,9 +413,45 @@ class DatabaseManager:
                     count = cur.fetchone()[0]
                     return count
         except Exception as e:
-            logger.error(f"Failed to get article count: {e}")
+            logger.error("Failed to get article count: %s", e)
+            return 0
+
+    def get_article_count_fast(self) -> int:
+        """
+        Get approximate count of articles from table statistics.
+
+        Reads pg_class.reltuples (kept current by autovacuum/ANALYZE)
+        instead of scanning the table, so it is suitable for status logs.
+        Falls back to the exact count if the table has never been analyzed.
+        The result is reused for ARTICLE_COUNT_TTL seconds, since every
+        fetch task logs it.
+
+        Returns:
+            Estimated number of articles
+        """
+        cached_at, cached = self._article_count_cache
+        if cached and time.monotonic() - cached_at < self.ARTICLE_COUNT_TTL:
+            return cached
+
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                        ('articles_raw',)
+                    )
+                    estimate = cur.fetchone()[0]
+        except Exception as e:
+            logger.error("Failed to get article count estimate: %s", e)
             return 0
 
+        # reltuples is -1 (or 0 on older servers) until the first ANALYZE
+        if estimate <= 0:
+            estimate = self.get_article_count()
+
+        self._article_count_cache = (time.monotonic(), estimate)
+        return estimate
+
     def get_company_count(self) -> int:
         """
         Get total count of companies in database.
@@ -169,9 +466,10 @@ class DatabaseManager:
                     count = cur.fetchone()[0]
                     return count
         except Exception as e:
-            logger.error(f"Failed to get company count: {e}")
+            logger.error("Failed to get company count: %s", e)
             return 0
 
+    @_cached_company_query
     def get_all_tickers(self) -> List[str]:
         """
         Get all ticker symbols from companies table.
@@ -182,13 +480,14 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute("SELECT ticker FROM companies ORDER BY ticker")
-                    results = cur.fetchall()
-                    return [row[0] for row in results]
+                    # Aggregate server-side: one row holding the sorted array
+                    cur.execute("SELECT array_agg(ticker ORDER BY ticker) FROM companies")
+                    return cur.fetchone()[0] or []
         except Exception as e:
-            logger.error(f"Failed to get tickers: {e}")
+            logger.error("Failed to get tickers: %s", e)
             return []
 
+    @_cached_company_query
     def get_top_tickers(self, limit: int = 100) -> List[str]:
         """
         Get top tickers by market cap (top companies first).
@@ -207,11 +506,13 @@ class DatabaseManager:
                 with conn.cursor() as cur:
                     # For now, return first 100 alphabetically
                     # In production, add market_cap column and ORDER BY market_cap DESC
-                    cur.execute(f"SELECT ticker FROM companies ORDER BY ticker LIMIT {limit}")
-                    results = cur.fetchall()
-                    return [row[0] for row in results]
+                    cur.execute("""
+                        SELECT array_agg(ticker ORDER BY ticker)
+                        FROM (SELECT ticker FROM companies ORDER BY ticker LIMIT %s) t
+                    """, (limit,))
+                    return cur.fetchone()[0] or []
         except Exception as e:
-            logger.error(f"Failed to get top tickers: {e}")
+            logger.error("Failed to get top tickers: %s", e)
             return []
 
     def url_exists(self, url: str) -> bool:
@@ -230,9 +531,56 @@ class DatabaseManager:
                     cur.execute("SELECT 1 FROM articles_raw WHERE url = %s LIMIT 1", (url,))
                     return cur.fetchone() is not None
         except Exception as e:
-            logger.error(f"Failed to check URL existence: {e}")
+            logger.error("Failed to check URL existence: %s", e)
             return False
 
+    def urls_exist(self, urls: Iterable[str]) -> Set[str]:
+        """
+        Check which of many URLs already exist in database.
+
+        Args:
+            urls: Article URLs to check
+
+        Returns:
+            Set of URLs that already exist
+        """
+        urls = list(urls)
+        if not urls:
+            return set()
+
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT url FROM articles_raw WHERE url = ANY(%s)", (urls,))
+                    return {row[0] for row in cur.fetchall()}
+        except Exception as e:
+            logger.error("Failed to check URL existence: %s", e)
+            return set()
+
+    def iter_urls(self, batch_size: int = 10000) -> Iterator[str]:
+        """
+        Stream every stored article URL.
+
+        Uses a server-side cursor, so URLs are fetched batch_size at a time
+        rather than loaded into memory at once.
+
+        Args:
+            batch_size: Rows per network round-trip
+
+        Yields:
+            Article URLs
+        """
+        with self.get_connection() as conn:
+            with conn.cursor(name='article_urls_stream') as cur:
+                cur.itersize = batch_size
+                cur.execute("SELECT url FROM articles_raw")
+                for (url,) in cur:
+                    yield url
+
+    def invalidate_company_cache(self):
+        """Drop cached ticker/company lists (call after changing companies)."""
+        self._company_cache.clear()
+
     def update_company_cik(self, ticker: str, cik: str) -> bool:
         """
         Update CIK value for a company.
@@ -253,15 +601,57 @@ class DatabaseManager:
                     )
                     rows_updated = cur.rowcount
                     if rows_updated > 0:
-                        logger.debug(f"Updated CIK for {ticker}: {cik}")
+                        self.invalidate_company_cache()
+                        logger.debug("Updated CIK for %s: %s", ticker, cik)
                         return True
                     else:
-                        logger.warning(f"No company found with ticker: {ticker}")
+                        logger.warning("No company found with ticker: %s", ticker)
                         return False
         except Exception as e:
-            logger.error(f"Failed to update CIK for {ticker}: {e}")
+            logger.error("Failed to update CIK for %s: %s", ticker, e)
             return False
 
+    def bulk_update_company_ciks(self, ticker_ciks: List[Tuple[str, str]]) -> int:
+        """
+        Update CIK values for many companies in a single statement.
+
+        Rows whose CIK already matches are skipped, so a startup refresh
+        with an unchanged mapping writes nothing.
+
+        Args:
+            ticker_ciks: List of (ticker, cik) tuples
+
+        Returns:
+            Number of companies whose CIK changed
+        """
+        if not ticker_ciks:
+            return 0
+
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    execute_values(
+                        cur,
+                        """
+                        UPDATE companies
+                        SET cik = v.cik
+                        FROM (VALUES %s) AS v(ticker, cik)
+                        WHERE companies.ticker = v.ticker
+                          AND companies.cik IS DISTINCT FROM v.cik
+                        """,
+                        ticker_ciks,
+                        page_size=len(ticker_ciks)
+                    )
+                    rows_updated = cur.rowcount
+                    if rows_updated > 0:
+                        self.invalidate_company_cache()
+                    logger.debug("Updated CIK for %s companies", rows_updated)
+                    return rows_updated
+        except Exception as e:
+            logger.error("Failed to bulk update CIKs: %s", e)
+            return 0
+
+    @_cached_company_query
     def get_companies_with_cik(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Get companies that have CIK values.
@@ -275,17 +665,18 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                    query = "SELECT ticker, cik FROM companies WHERE cik IS NOT NULL ORDER BY ticker"
-                    if limit:
-                        query += f" LIMIT {limit}"
-
-                    cur.execute(query)
+                    # LIMIT NULL means no limit, so one parameterized statement covers both
+                    cur.execute(
+                        "SELECT ticker, cik FROM companies WHERE cik IS NOT NULL ORDER BY ticker LIMIT %s",
+                        (limit or None,)
+                    )
                     results = cur.fetchall()
                     return [dict(row) for row in results]
         except Exception as e:
-            logger.error(f"Failed to get companies with CIK: {e}")
+            logger.error("Failed to get companies with CIK: %s", e)
             return []
 
+    @_cached_company_query
     def get_tickers_with_cik(self, limit: Optional[int] = None) -> List[tuple]:
         """
         Get tickers with their CIK values.
@@ -299,15 +690,15 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    query = "SELECT ticker, cik FROM companies WHERE cik IS NOT NULL ORDER BY ticker"
-                    if limit:
-                        query += f" LIMIT {limit}"
-
-                    cur.execute(query)
+                    # LIMIT NULL means no limit, so one parameterized statement covers both
+                    cur.execute(
+                        "SELECT ticker, cik FROM companies WHERE cik IS NOT NULL ORDER BY ticker LIMIT %s",
+                        (limit or None,)
+                    )
                     results = cur.fetchall()
                     return results
         except Exception as e:
-            logger.error(f"Failed to get tickers with CIK: {e}")
+            logger.error("Failed to get tickers with CIK: %s", e)
             return []
 
     def close(self):
@@ -0,0 +1,29 @@
+"""
+Shared HTTP session for all parsers.
+
+One requests.Session (and so one urllib3 pool manager) lets every source
+reuse keep-alive connections and TLS sessions instead of each parser
+opening its own. Parsers mount host-specific adapters on it for their
+own retry and pool settings and send their headers per request.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Distinct hosts kept in the pool cache, and connections kept per host
+POOL_HOSTS = 100
+POOL_PER_HOST = 10
+
+
+def create_session() -> requests.Session:
+    """
+    Create the process-wide session with a pooled default adapter.
+
+    Returns:
+        requests.Session shared by the parsers
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
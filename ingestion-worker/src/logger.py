@@ -6,19 +6,35 @@ Provides structured logging with appropriate formatting.
 
 import logging
 import sys
+from typing import Set
+
 from src.config import Config
 
+# Format: timestamp - name - level - message (shared by all handlers)
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Names of loggers already configured by setup_logger()
+_CONFIGURED: Set[str] = set()
+
 
 def setup_logger(name: str = 'ingestion-worker') -> logging.Logger:
     """
     Configure and return a logger instance.
 
+    Each logger name is configured once; later calls return it as-is.
+
     Args:
         name: Logger name
 
     Returns:
         Configured logger instance
     """
+    if name in _CONFIGURED:
+        return logging.getLogger(name)
+
     logger = logging.getLogger(name)
 
     # Set log level from config
@@ -31,17 +47,12 @@ def setup_logger(name: str = 'ingestion-worker') -> logging.Logger:
     # Console handler with formatting
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
-
-    # Format: timestamp - name - level - message
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
 
     logger.addHandler(console_handler)
 
     # Prevent propagation to root logger
     logger.propagate = False
 
+    _CONFIGURED.add(name)
     return logger
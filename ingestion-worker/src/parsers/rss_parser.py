@@ -4,16 +4,19 @@ RSS Feed Parser module.
 Fetches and parses RSS feeds from configured news sources.
 """
 
+import os
+import multiprocessing
 import feedparser
 import requests
 from datetime import datetime
-from typing import List, Dict, Optional
-import time
+from typing import List, Dict, Optional, Tuple
 from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 from src.config import Config
 from src.logger import setup_logger
-from src.database import DatabaseManager
+from src.database import DatabaseManager, json_param
 
 logger = setup_logger(__name__)
 
@@ -24,21 +27,43 @@ FEED_TIMEOUT = (10, 30)
 class RSSParser:
     """Parses RSS feeds and stores articles."""
 
-    def __init__(self, db_manager: DatabaseManager):
+    # feedparser is pure Python, so parsing runs in worker processes to
+    # use more than one core
+    PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+    HEADERS = {'User-Agent': 'S&P500NewsAggregator/1.0'}
+
+    # Batches at least this large (the first pass after startup, when no
+    # feed has validators yet, e.g. on an empty articles_raw) are loaded
+    # with COPY instead of batched INSERTs
+    COPY_THRESHOLD = 1000
+
+    def __init__(self, db_manager: DatabaseManager, session: Optional[requests.Session] = None):
         """
         Initialize RSS parser.
 
         Args:
             db_manager: Database manager instance
+            session: Shared HTTP session (a private one is created if omitted)
         """
         self.db_manager = db_manager
         self.feeds = Config.RSS_FEEDS
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'S&P500NewsAggregator/1.0'
-        })
-
-    def parse_published_date(self, entry) -> Optional[datetime]:
+        self.session = session or requests.Session()
+
+        # Conditional GET validators per feed URL, so unchanged feeds
+        # return 304 and skip both the download and the parse
+        self._feed_etags: Dict[str, str] = {}
+        self._feed_last_modified: Dict[str, str] = {}
+
+        # Started lazily on first submit; 'spawn' avoids forking a process
+        # that has live scheduler/download threads
+        self._parse_pool = ProcessPoolExecutor(
+            max_workers=self.PARSE_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    @staticmethod
+    def parse_published_date(entry) -> Optional[datetime]:
         """
         Extract published date from RSS entry.
 
@@ -48,121 +73,274 @@ class RSSParser:
         Returns:
             Datetime object or None
         """
-        # Try different date fields
-        date_fields = ['published_parsed', 'updated_parsed', 'created_parsed']
-
-        for field in date_fields:
-            if hasattr(entry, field) and getattr(entry, field):
+        # feedparser's *_parsed fields are UTC struct_time; build the naive
+        # datetime directly (same fields mktime/fromtimestamp round-tripped to)
+        for field in ('published_parsed', 'updated_parsed', 'created_parsed'):
+            time_tuple = entry.get(field)
+            if time_tuple:
                 try:
-                    time_tuple = getattr(entry, field)
-                    return datetime.fromtimestamp(time.mktime(time_tuple))
-                except Exception:
+                    return datetime(*time_tuple[:6])
+                except (TypeError, ValueError):
                     pass
 
         # Try parsing published/updated strings
-        for field in ['published', 'updated', 'created']:
-            if hasattr(entry, field) and getattr(entry, field):
+        for field in ('published', 'updated', 'created'):
+            date_str = entry.get(field)
+            if date_str:
                 try:
-                    return parsedate_to_datetime(getattr(entry, field))
-                except Exception:
+                    return parsedate_to_datetime(date_str)
+                except (TypeError, ValueError):
                     pass
 
         return None
 
-    def fetch_feed(self, feed_url: str, feed_name: str) -> List[Dict]:
+    def download_feed(self, feed_url: str, feed_name: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
         """
-        Fetch and parse a single RSS feed.
+        Download raw RSS feed content.
+
+        Sends If-None-Match / If-Modified-Since saved from an earlier
+        response, so feeds that have not changed come back as an empty 304.
+        The new response's validators are returned, not saved: the caller
+        saves them with save_validators() once the feed's articles are
+        stored, so a failed parse or insert is not hidden behind a 304.
 
         Args:
             feed_url: RSS feed URL
             feed_name: Human-readable feed name
 
         Returns:
-            List of article dictionaries
+            (response body, validators) tuple, or None if unchanged (304)
+            or on failure
         """
-        articles = []
+        headers = dict(self.HEADERS)
+        etag = self._feed_etags.get(feed_url)
+        if etag:
+            headers['If-None-Match'] = etag
+        last_modified = self._feed_last_modified.get(feed_url)
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
 
         try:
-            logger.info(f"Fetching RSS feed: {feed_name}")
+            logger.info("Fetching RSS feed: %s", feed_name)
+
+            # Fetch with explicit timeout (see ADR-001). Read the body straight
+            # from the urllib3 stream: response.content would buffer it as
+            # 10KB chunks and then join them into a second copy.
+            with self.session.get(
+                feed_url, headers=headers, timeout=FEED_TIMEOUT, stream=True
+            ) as response:
+                if response.status_code == 304:
+                    logger.info("Feed not modified since last fetch: %s", feed_name)
+                    return None
+
+                response.raise_for_status()
+                content = response.raw.read(decode_content=True)
+
+                validators = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                }
+                return content, validators
+
+        except Exception as e:
+            logger.error("Failed to fetch feed %s: %s", feed_name, e)
+            return None
+
+    def save_validators(self, feed_url: str, validators: Dict[str, str]):
+        """
+        Remember a feed's ETag / Last-Modified for the next conditional GET.
+
+        Args:
+            feed_url: RSS feed URL
+            validators: Validators returned by download_feed()
+        """
+        if validators.get('etag'):
+            self._feed_etags[feed_url] = validators['etag']
+        if validators.get('last_modified'):
+            self._feed_last_modified[feed_url] = validators['last_modified']
+
+    @staticmethod
+    def _entry_tags(entry) -> List[str]:
+        """
+        Extract tag terms from an RSS entry.
+
+        Tag elements are the one part of an entry whose shape varies by
+        feed, so this is the only extraction step guarded by a try.
+
+        Args:
+            entry: RSS feed entry
+
+        Returns:
+            List of tag terms (empty if the tags are malformed)
+        """
+        try:
+            return [tag.term for tag in entry.get('tags', [])]
+        except (AttributeError, TypeError):
+            return []
+
+    @staticmethod
+    def _entry_row(entry, feed_name: str) -> Optional[Tuple]:
+        """
+        Build the articles_raw INSERT row for one feed entry.
+
+        Args:
+            entry: RSS feed entry
+            feed_name: Human-readable feed name
+
+        Returns:
+            (url, title, summary, source, published_at, raw_json) tuple, or
+            None if the entry is missing a URL or title
+        """
+        url = entry.get('link')
+        title = entry.get('title', 'No title')
+
+        # Validate required fields before doing any other work
+        if not url or not title:
+            logger.warning("Skipping entry with missing URL or title from %s", feed_name)
+            return None
+
+        return (
+            url,
+            title,
+            entry.get('summary', entry.get('description', '')),
+            feed_name,
+            RSSParser.parse_published_date(entry),
+            json_param({
+                'author': entry.get('author', ''),
+                'tags': RSSParser._entry_tags(entry),
+                'content': entry.get('content', []),
+                'id': entry.get('id', ''),
+            })
+        )
+
+    @staticmethod
+    def parse_feed(content: bytes, feed_name: str) -> Optional[List[Tuple]]:
+        """
+        Parse downloaded RSS feed content into article rows.
 
-            # Fetch with explicit timeout, then parse content
-            response = self.session.get(feed_url, timeout=FEED_TIMEOUT)
-            response.raise_for_status()
-            feed = feedparser.parse(response.content)
+        Args:
+            content: Raw feed body
+            feed_name: Human-readable feed name
+
+        Returns:
+            List of rows ready for DatabaseManager.bulk_insert_rows(), or
+            None if parsing failed
+        """
+        rows = None
+
+        try:
+            feed = feedparser.parse(content)
 
             if feed.bozo:
-                logger.warning(f"Feed parsing warning for {feed_name}: {feed.bozo_exception}")
+                logger.warning("Feed parsing warning for %s: %s", feed_name, feed.bozo_exception)
 
-            # Process entries
-            for entry in feed.entries:
-                try:
-                    # Extract article data
-                    article = {
-                        'url': entry.get('link', ''),
-                        'title': entry.get('title', 'No title'),
-                        'summary': entry.get('summary', entry.get('description', '')),
-                        'source': feed_name,
-                        'published_at': self.parse_published_date(entry),
-                        'raw_json': {
-                            'author': entry.get('author', ''),
-                            'tags': [tag.term for tag in entry.get('tags', [])],
-                            'content': entry.get('content', []),
-                            'id': entry.get('id', ''),
-                        }
-                    }
-
-                    # Validate required fields
-                    if article['url'] and article['title']:
-                        articles.append(article)
-                    else:
-                        logger.warning(f"Skipping entry with missing URL or title: {entry}")
-
-                except Exception as e:
-                    logger.error(f"Error processing entry from {feed_name}: {e}")
-                    continue
-
-            logger.info(f"Fetched {len(articles)} articles from {feed_name}")
+            rows = [
+                row for row in (RSSParser._entry_row(entry, feed_name) for entry in feed.entries)
+                if row is not None
+            ]
+
+            logger.info("Fetched %s articles from %s", len(rows), feed_name)
 
         except Exception as e:
-            logger.error(f"Failed to fetch feed {feed_name}: {e}")
+            logger.error("Failed to parse feed %s: %s", feed_name, e)
 
-        return articles
+        return rows
 
-    def fetch_all_feeds(self) -> int:
+    def _parse_in_pool(self, downloads: Dict) -> List[Tuple[Dict, Optional[List[Tuple]], Dict]]:
         """
-        Fetch all configured RSS feeds.
+        Parse downloaded feeds on the process pool.
+
+        Falls back to parsing in this process if the pool is unusable
+        (e.g. a worker died).
+
+        Args:
+            downloads: Future of download_feed() -> feed dict
 
         Returns:
-            Total number of new articles inserted
+            (feed dict, rows or None if parsing failed, validators) for
+            every feed that downloaded successfully
         """
-        total_inserted = 0
+        parsed = []
+        parse_futures = {}
 
-        logger.info(f"Starting RSS feed fetch for {len(self.feeds)} feeds")
+        try:
+            for future in as_completed(downloads):
+                download = future.result()
+                if download is not None:
+                    feed = downloads[future]
+                    content, validators = download
+                    parse_future = self._parse_pool.submit(_parse_feed_worker, content, feed['name'])
+                    parse_futures[parse_future] = (feed, validators)
+
+            for future in as_completed(parse_futures):
+                feed, validators = parse_futures[future]
+                parsed.append((feed, future.result(), validators))
+
+        except BrokenProcessPool as e:
+            logger.error("Feed parse pool failed, parsing in-process: %s", e)
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=self.PARSE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            parsed = []
+            for future, feed in downloads.items():
+                download = future.result()
+                if download is not None:
+                    content, validators = download
+                    parsed.append((feed, self.parse_feed(content, feed['name']), validators))
+
+        return parsed
 
-        for feed in self.feeds:
-            feed_name = feed['name']
-            feed_url = feed['url']
+    def fetch_all_feeds(self) -> int:
+        """
+        Fetch all configured RSS feeds.
 
-            # Fetch articles from feed
-            articles = self.fetch_feed(feed_url, feed_name)
+        Feeds are downloaded concurrently (one thread per feed, each with
+        its own timeout) and each body is handed to the parse process pool
+        as soon as it arrives, so downloads and parsing overlap and parsing
+        is spread across cores. A feed's ETag / Last-Modified are saved only
+        once its articles are known to be stored.
 
-            # Insert articles into database
-            for article in articles:
-                article_id = self.db_manager.insert_article(
-                    url=article['url'],
-                    title=article['title'],
-                    summary=article['summary'],
-                    source=article['source'],
-                    published_at=article['published_at'],
-                    raw_json=article['raw_json']
-                )
+        Returns:
+            Total number of new articles inserted
+        """
+        logger.info("Starting RSS feed fetch for %s feeds", len(self.feeds))
+
+        with ThreadPoolExecutor(max_workers=len(self.feeds) or 1) as executor:
+            downloads = {
+                executor.submit(self.download_feed, feed['url'], feed['name']): feed
+                for feed in self.feeds
+            }
+            parsed = self._parse_in_pool(downloads)
+
+        # Insert all articles in one transaction
+        rows = [row for _, feed_rows, _ in parsed if feed_rows for row in feed_rows]
+        if len(rows) >= self.COPY_THRESHOLD:
+            total_inserted = self.db_manager.copy_articles(rows)
+        else:
+            total_inserted = self.db_manager.bulk_insert_rows(rows)
+
+        # Fewer inserts than rows means duplicates or failed inserts; the
+        # database tells which rows are stored
+        stored = None
+        if total_inserted < len(rows):
+            stored = self.db_manager.urls_exist(row[0] for row in rows)
+
+        for feed, feed_rows, validators in parsed:
+            if feed_rows is None:
+                continue
+            if stored is None or all(row[0] in stored for row in feed_rows):
+                self.save_validators(feed['url'], validators)
+
+        logger.info("RSS feed fetch complete. Inserted %s new articles", total_inserted)
 
-                if article_id:
-                    total_inserted += 1
+        return total_inserted
 
-            # Brief delay between feeds
-            time.sleep(1)
+    def close(self):
+        """Shut down the parse process pool."""
+        self._parse_pool.shutdown(wait=True, cancel_futures=True)
 
-        logger.info(f"RSS feed fetch complete. Inserted {total_inserted} new articles")
 
-        return total_inserted
+def _parse_feed_worker(content: bytes, feed_name: str) -> Optional[List[Tuple]]:
+    """Process-pool entry point for RSSParser.parse_feed."""
+    return RSSParser.parse_feed(content, feed_name)
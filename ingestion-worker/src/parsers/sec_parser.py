@@ -1,76 +1,151 @@
 """
-SEC EDGAR RSS Parser module.
+SEC EDGAR filings parser module.
 
-Fetches and parses SEC EDGAR Atom feeds for company filings.
+Fetches company filings from the SEC EDGAR submissions JSON API.
 """
 
+import sys
+import functools
+import orjson
 import requests
-import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import List, Dict, Optional
-import time
 from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from src.logger import setup_logger
+from src.api_clients.rate_limiter import SEC_RATE_LIMITER
 
 logger = setup_logger(__name__)
 
+# Optional C ISO 8601 parser
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
+
+# Prefer ciso8601; Python 3.11+ fromisoformat accepts a trailing 'Z' natively
+if ciso8601 is not None:
+    _fromisoformat = ciso8601.parse_datetime
+elif sys.version_info >= (3, 11):
+    _fromisoformat = datetime.fromisoformat
+else:
+    def _fromisoformat(date_str: str) -> datetime:
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+
+# Filing index page, same URL the EDGAR Atom feed links to (keeps URL
+# deduplication stable across both sources)
+_FILING_INDEX_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{accession_path}/{accession}-index.htm"
+
 
 class SECParser:
-    """Parses SEC EDGAR Atom feeds for company filings."""
+    """Parses SEC EDGAR submissions JSON for company filings."""
 
-    BASE_URL = "https://www.sec.gov/cgi-bin/browse-edgar"
+    BASE_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
     REQUEST_TIMEOUT = 10  # seconds
     MAX_RETRIES = 3
-    RETRY_DELAY = 2  # seconds
+    MAX_CONCURRENT_REQUESTS = 10  # worker threads; SEC_RATE_LIMITER caps the request rate
+    THROTTLE_BACKOFF = 10  # seconds all SEC calls pause after retries are exhausted
+    RECENT_FILINGS_LIMIT = 40  # newest entries of the submissions 'recent' arrays checked per company
 
-    # Important filing types to capture
-    IMPORTANT_FILINGS = {'8-K', '10-K', '10-Q', 'Form 4', '4'}
+    # Submissions JSON form codes (amendments add '/A') that are important
+    IMPORTANT_FORM_CODES = frozenset({'8-K', '10-K', '10-Q', '4'})
 
-    def __init__(self):
-        """Initialize SEC parser."""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'S&P500NewsAggregator/1.0 (Educational/Research Project)',
-            'Accept': 'application/atom+xml'
-        })
+    HEADERS = {
+        'User-Agent': 'S&P500NewsAggregator/1.0 (Educational/Research Project)',
+        'Accept': 'application/json'
+    }
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Initialize SEC parser with retry logic.
+
+        Args:
+            session: Shared HTTP session (a private one is created if omitted)
+        """
+        self.session = session or requests.Session()
+
+        # Configure retry strategy (honours SEC's Retry-After on 429)
+        retry_strategy = Retry(
+            total=self.MAX_RETRIES,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+        )
+        # Scoped to the submissions host so a shared session keeps its
+        # default adapter for everything else
+        adapter = HTTPAdapter(pool_maxsize=self.MAX_CONCURRENT_REQUESTS, max_retries=retry_strategy)
+        self.session.mount("https://data.sec.gov/", adapter)
+
+        # Conditional GET validators per CIK, so companies with no new
+        # filings return 304 and skip the download and parse. Validators
+        # from a fetch wait in _pending_validators until that CIK's filings
+        # are stored (see save_validators)
+        self._cik_etags: Dict[str, str] = {}
+        self._cik_last_modified: Dict[str, str] = {}
+        self._pending_validators: Dict[str, Dict[str, str]] = {}
+
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
+    def _parse_iso(date_str: str) -> datetime:
+        """Parse an ISO 8601 timestamp (memoized; filing dates repeat)."""
+        return _fromisoformat(date_str)
 
     def _parse_atom_date(self, date_str: str) -> Optional[datetime]:
         """
-        Parse Atom feed date format.
+        Parse EDGAR timestamp format.
 
         Args:
-            date_str: Date string from Atom feed
+            date_str: Date string (e.g. acceptanceDateTime)
 
         Returns:
             datetime object or None
         """
         try:
-            # Try ISO 8601 format (most Atom feeds)
-            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+            # Try ISO 8601 format (EDGAR timestamps)
+            return self._parse_iso(date_str)
         except Exception:
             try:
                 # Try RFC 2822 format
                 return parsedate_to_datetime(date_str)
             except Exception:
-                logger.warning(f"Could not parse date: {date_str}")
+                logger.warning("Could not parse date: %s", date_str)
                 return None
 
-    def _extract_filing_type(self, title: str) -> Optional[str]:
+    @classmethod
+    def _form_filing_type(cls, form: str) -> Optional[str]:
         """
-        Extract filing type from entry title.
+        Map a submissions JSON form code to its filing type.
+
+        Compares the exact code (amendment suffix dropped), so e.g. 'S-4'
+        or 'F-4/A' is not taken for a Form 4.
 
         Args:
-            title: Entry title from feed
+            form: Form code (e.g. '8-K/A')
 
         Returns:
-            Filing type or None
+            Filing type (e.g. '8-K') or None if not an important filing
+        """
+        base = form.split('/')[0].strip()
+        return base if base in cls.IMPORTANT_FORM_CODES else None
+
+    def save_validators(self, cik: str):
+        """
+        Keep the validators of the last fetch of a CIK for the next
+        conditional GET. Call once that fetch's filings are stored.
+
+        Args:
+            cik: Company CIK number, as passed to fetch_company_filings()
         """
-        # Title format is usually like "8-K - Current Report"
-        for filing_type in self.IMPORTANT_FILINGS:
-            if filing_type in title:
-                return filing_type
-        return None
+        validators = self._pending_validators.pop(cik, None)
+        if not validators:
+            return
+        if validators.get('etag'):
+            self._cik_etags[cik] = validators['etag']
+        if validators.get('last_modified'):
+            self._cik_last_modified[cik] = validators['last_modified']
 
     def fetch_company_filings(self, cik: str, ticker: str) -> List[Dict]:
         """
@@ -91,133 +166,132 @@ class SECParser:
                 'raw_json': dict
             }, ...]
         """
-        params = {
-            'action': 'getcompany',
-            'CIK': cik,
-            'output': 'atom'
-        }
+        try:
+            logger.debug("Fetching SEC filings for %s (CIK: %s)", ticker, cik)
 
-        filings = []
+            # Shared 10 req/s budget across all SEC calls
+            SEC_RATE_LIMITER.wait()
 
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                logger.debug(f"Fetching SEC filings for {ticker} (CIK: {cik})")
-
-                response = self.session.get(
-                    self.BASE_URL,
-                    params=params,
-                    timeout=self.REQUEST_TIMEOUT
-                )
-
-                if response.status_code == 404:
-                    logger.warning(f"CIK not found: {cik} ({ticker})")
-                    return []
-
-                if response.status_code != 200:
-                    logger.error(f"SEC request failed with status {response.status_code}")
-                    if attempt < self.MAX_RETRIES - 1:
-                        time.sleep(self.RETRY_DELAY)
-                        continue
-                    return []
-
-                # Parse Atom XML
-                try:
-                    root = ET.fromstring(response.content)
-                except ET.ParseError as e:
-                    logger.error(f"Failed to parse XML for {ticker}: {e}")
-                    return []
-
-                # Atom namespace
-                ns = {'atom': 'http://www.w3.org/2005/Atom'}
-
-                # Extract entries
-                entries = root.findall('atom:entry', ns)
-
-                for entry in entries:
-                    try:
-                        # Extract fields
-                        title_elem = entry.find('atom:title', ns)
-                        link_elem = entry.find('atom:link', ns)
-                        updated_elem = entry.find('atom:updated', ns)
-                        summary_elem = entry.find('atom:summary', ns)
-
-                        if title_elem is None or link_elem is None:
-                            continue
-
-                        title = title_elem.text
-                        url = link_elem.get('href', '')
-
-                        # Filter for important filing types only
-                        filing_type = self._extract_filing_type(title)
-                        if not filing_type:
-                            continue
-
-                        # Parse date
-                        published_at = None
-                        if updated_elem is not None and updated_elem.text:
-                            published_at = self._parse_atom_date(updated_elem.text)
-
-                        # Extract summary
-                        summary = summary_elem.text if summary_elem is not None else ''
-
-                        filing = {
-                            'url': url,
-                            'title': title,
-                            'summary': summary,
-                            'source': f"SEC EDGAR ({ticker})",
-                            'published_at': published_at,
-                            'raw_json': {
-                                'ticker': ticker,
-                                'cik': cik,
-                                'filing_type': filing_type
-                            }
-                        }
-
-                        # Validate required fields
-                        if filing['url'] and filing['title']:
-                            filings.append(filing)
-
-                    except Exception as e:
-                        logger.error(f"Error parsing entry for {ticker}: {e}")
-                        continue
-
-                logger.info(f"Fetched {len(filings)} important filings for {ticker} from SEC EDGAR")
-                return filings
-
-            except requests.exceptions.Timeout:
-                logger.warning(f"Request timeout for {ticker}. Retry {attempt + 1}/{self.MAX_RETRIES}")
-                if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.RETRY_DELAY)
-                    continue
+            headers = dict(self.HEADERS)
+            if cik in self._cik_etags:
+                headers['If-None-Match'] = self._cik_etags[cik]
+            if cik in self._cik_last_modified:
+                headers['If-Modified-Since'] = self._cik_last_modified[cik]
+
+            response = self.session.get(
+                self.BASE_URL.format(cik=str(cik).zfill(10)),
+                headers=headers,
+                timeout=self.REQUEST_TIMEOUT
+            )
+
+            if response.status_code == 304:
+                logger.debug("No new filings since last fetch for %s", ticker)
                 return []
 
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request error for {ticker}: {e}")
-                if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.RETRY_DELAY)
-                    continue
+            if response.status_code == 404:
+                logger.warning("CIK not found: %s (%s)", cik, ticker)
                 return []
 
-            except Exception as e:
-                logger.error(f"Unexpected error for {ticker}: {e}")
+            if response.status_code != 200:
+                logger.error("SEC request failed with status %s", response.status_code)
                 return []
 
-        logger.error(f"Failed to fetch filings for {ticker} after {self.MAX_RETRIES} retries")
-        return []
+            try:
+                data = orjson.loads(response.content)
+                recent = data['filings']['recent']
+            except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+                logger.error("Failed to parse submissions JSON for %s: %s", ticker, e)
+                return []
+
+            # Validators for the next conditional GET, kept by
+            # save_validators() once these filings are stored
+            self._pending_validators[cik] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+
+            # Parallel arrays, newest filing first
+            forms = recent.get('form', [])[:self.RECENT_FILINGS_LIMIT]
+            accessions = recent.get('accessionNumber', [])
+            filing_dates = recent.get('filingDate', [])
+            accepted = recent.get('acceptanceDateTime', [])
+            documents = recent.get('primaryDocument', [])
+            descriptions = recent.get('primaryDocDescription', [])
+            cik_int = int(cik)
+
+            filings = []
+            for i, form in enumerate(forms):
+                # Filter for important filing types only
+                filing_type = self._form_filing_type(form)
+                if not filing_type:
+                    continue
+
+                accession = accessions[i]
+                description = descriptions[i] if i < len(descriptions) else ''
+                filing_date = filing_dates[i] if i < len(filing_dates) else ''
+
+                # Parse date (acceptance timestamp, else the filing date)
+                published_at = None
+                if i < len(accepted) and accepted[i]:
+                    published_at = self._parse_atom_date(accepted[i])
+                elif filing_date:
+                    published_at = self._parse_atom_date(filing_date)
+
+                filings.append({
+                    'url': _FILING_INDEX_URL.format(
+                        cik=cik_int,
+                        accession_path=accession.replace('-', ''),
+                        accession=accession
+                    ),
+                    'title': f"{form} - {description or form}",
+                    'summary': f"Filed: {filing_date} AccNo: {accession}",
+                    'source': f"SEC EDGAR ({ticker})",
+                    'published_at': published_at,
+                    'raw_json': {
+                        'ticker': ticker,
+                        'cik': cik,
+                        'filing_type': filing_type,
+                        'primary_document': documents[i] if i < len(documents) else None
+                    }
+                })
+
+            logger.info("Fetched %s important filings for %s from SEC EDGAR", len(filings), ticker)
+            return filings
+
+        except requests.exceptions.RetryError as e:
+            # Persistent 429/5xx: back off every SEC caller, not just this one
+            SEC_RATE_LIMITER.drain(self.THROTTLE_BACKOFF)
+            logger.error("Failed to fetch filings for %s after %s retries: %s", ticker, self.MAX_RETRIES, e)
+            return []
+
+        except requests.exceptions.Timeout:
+            logger.warning("Request timeout for %s after %s retries", ticker, self.MAX_RETRIES)
+            return []
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Request error for %s: %s", ticker, e)
+            return []
+
+        except Exception as e:
+            logger.error("Unexpected error for %s: %s", ticker, e)
+            return []
 
     def fetch_multiple_companies(
         self,
         companies: List[Dict],
-        db_manager,
-        batch_delay: float = 0.2
+        db_manager
     ) -> tuple:
         """
         Fetch filings for multiple companies with rate limiting.
 
+        Requests run on a thread pool and are paced by the shared SEC token
+        bucket; filings are inserted on the calling thread as each company
+        completes. A company's validators are kept only once all of its
+        filings are stored, so a failed insert is retried on the next run.
+
         Args:
             companies: List of dicts with 'ticker' and 'cik' keys
             db_manager: DatabaseManager instance for inserting filings
-            batch_delay: Delay between requests (seconds)
 
         Returns:
             Tuple of (new_filings_count, duplicates_count, errors_count)
@@ -226,52 +300,64 @@ class SECParser:
         total_duplicates = 0
         total_errors = 0
 
-        logger.info(f"Fetching SEC filings for {len(companies)} companies")
+        logger.info("Fetching SEC filings for %s companies", len(companies))
 
-        for i, company in enumerate(companies, 1):
-            ticker = company.get('ticker')
-            cik = company.get('cik')
+        with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_REQUESTS) as executor:
+            futures = {}
+            for company in companies:
+                ticker = company.get('ticker')
+                cik = company.get('cik')
 
-            if not ticker or not cik:
-                logger.warning(f"Missing ticker or CIK in company data: {company}")
-                total_errors += 1
-                continue
+                if not ticker or not cik:
+                    logger.warning("Missing ticker or CIK in company data: %s", company)
+                    total_errors += 1
+                    continue
 
-            try:
-                # Fetch filings
-                filings = self.fetch_company_filings(cik, ticker)
-
-                # Insert into database
-                for filing in filings:
-                    article_id = db_manager.insert_article(
-                        url=filing['url'],
-                        title=filing['title'],
-                        summary=filing['summary'],
-                        source=filing['source'],
-                        published_at=filing['published_at'],
-                        raw_json=filing['raw_json']
-                    )
-
-                    if article_id:
-                        total_new += 1
-                    else:
-                        total_duplicates += 1
-
-                # Progress logging every 50 companies
-                if i % 50 == 0:
-                    logger.info(f"Progress: {i}/{len(companies)} companies processed")
-
-                # Rate limiting delay
-                time.sleep(batch_delay)
-
-            except Exception as e:
-                logger.error(f"Error processing {ticker}: {e}")
-                total_errors += 1
-                continue
+                futures[executor.submit(self.fetch_company_filings, cik, ticker)] = (ticker, cik)
+
+            for i, future in enumerate(as_completed(futures), 1):
+                ticker, cik = futures[future]
+
+                try:
+                    # Fetch filings
+                    filings = future.result()
+
+                    # Insert into database
+                    inserted = 0
+                    for filing in filings:
+                        article_id = db_manager.insert_article(
+                            url=filing['url'],
+                            title=filing['title'],
+                            summary=filing['summary'],
+                            source=filing['source'],
+                            published_at=filing['published_at'],
+                            raw_json=filing['raw_json']
+                        )
+
+                        if article_id:
+                            inserted += 1
+                        else:
+                            total_duplicates += 1
+                    total_new += inserted
+
+                    # Rows not inserted are duplicates or failures; keep the
+                    # validators only if the database has every filing
+                    urls = {filing['url'] for filing in filings}
+                    if inserted == len(filings) or db_manager.urls_exist(urls) >= urls:
+                        self.save_validators(cik)
+
+                    # Progress logging every 50 companies
+                    if i % 50 == 0:
+                        logger.info("Progress: %s/%s companies processed", i, len(futures))
+
+                except Exception as e:
+                    logger.error("Error processing %s: %s", ticker, e)
+                    total_errors += 1
+                    continue
 
         logger.info(
-            f"SEC filing fetch complete: {total_new} new, "
-            f"{total_duplicates} duplicates, {total_errors} errors"
+            "SEC filing fetch complete: %s new, %s duplicates, %s errors",
+            total_new, total_duplicates, total_errors
         )
 
         return (total_new, total_duplicates, total_errors)
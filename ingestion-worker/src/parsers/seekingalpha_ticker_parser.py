@@ -12,15 +12,37 @@ Implements conservative rate limiting to avoid blocking:
 
 import time
 import logging
-import xml.etree.ElementTree as ET
 from datetime import datetime
-from typing import List, Dict, Tuple
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, Tuple
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from lxml import etree
+
+from src.url_filter import BloomFilter
+
+# Optional C ISO 8601 parser for non-RFC 2822 dates
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
 
 logger = logging.getLogger(__name__)
 
+# Seeking Alpha namespace-qualified tags, expanded once
+_SA_NS = 'https://seekingalpha.com/api/1.0'
+_AUTHOR_TAG = f'{{{_SA_NS}}}author_name'
+
+# Precompiled: symbol text of every <sa:stock> in an item, as plain str
+_STOCK_SYMBOLS_XPATH = etree.XPath(
+    './/sa:stock/sa:symbol/text()',
+    namespaces={'sa': _SA_NS},
+    smart_strings=False
+)
+
 
 class SeekingAlphaTickerParser:
     """Parse Seeking Alpha ticker-specific RSS feeds."""
@@ -29,10 +51,25 @@ class SeekingAlphaTickerParser:
     BATCH_SIZE = 50
     BATCH_DELAY = 2.0  # seconds between batches
     REQUEST_TIMEOUT = 10
+    MAX_CONCURRENT_REQUESTS = 4  # worker threads within a batch
 
-    def __init__(self):
-        """Initialize parser with retry logic."""
-        self.session = requests.Session()
+    HEADERS = {'User-Agent': 'S&P500NewsAggregator/1.0 (Educational/Research Project)'}
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        max_concurrent_requests: Optional[int] = None
+    ):
+        """
+        Initialize parser with retry logic.
+
+        Args:
+            session: Shared HTTP session (a private one is created if omitted)
+            max_concurrent_requests: Worker threads within a batch
+                (defaults to MAX_CONCURRENT_REQUESTS)
+        """
+        self.max_concurrent_requests = max_concurrent_requests or self.MAX_CONCURRENT_REQUESTS
+        self.session = session or requests.Session()
 
         # Configure retry strategy
         retry_strategy = Retry(
@@ -40,19 +77,21 @@ class SeekingAlphaTickerParser:
             backoff_factor=1,
             status_forcelist=[429, 500, 502, 503, 504],
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        adapter = HTTPAdapter(pool_maxsize=self.max_concurrent_requests, max_retries=retry_strategy)
+        self.session.mount("https://seekingalpha.com/", adapter)
 
-        # Set user agent
-        self.session.headers.update({
-            'User-Agent': 'S&P500NewsAggregator/1.0 (Educational/Research Project)'
-        })
+        # Optional Bloom filter of stored URLs (set by the scheduler at
+        # startup); when present only the URLs it reports are checked with
+        # urls_exist
+        self.known_urls: Optional[BloomFilter] = None
 
     def fetch_all_tickers(self, tickers: List[str], db_manager) -> Tuple[int, int, int]:
         """
         Fetch news for all tickers in batches.
 
+        Tickers within a batch are fetched concurrently on a small thread
+        pool; batches are still separated by BATCH_DELAY.
+
         Args:
             tickers: List of ticker symbols
             db_manager: DatabaseManager instance for inserting articles
@@ -67,27 +106,33 @@ class SeekingAlphaTickerParser:
         # Process in batches
         num_batches = (len(tickers) + self.BATCH_SIZE - 1) // self.BATCH_SIZE
 
-        logger.info(f"Fetching {len(tickers)} tickers in {num_batches} batches")
+        logger.info("Fetching %s tickers in %s batches", len(tickers), num_batches)
 
         for batch_num in range(num_batches):
             start_idx = batch_num * self.BATCH_SIZE
             end_idx = min(start_idx + self.BATCH_SIZE, len(tickers))
             batch = tickers[start_idx:end_idx]
 
-            logger.info(f"Processing batch {batch_num + 1}/{num_batches} ({len(batch)} tickers)")
+            logger.info("Processing batch %s/%s (%s tickers)", batch_num + 1, num_batches, len(batch))
 
-            for ticker in batch:
-                try:
-                    new, duplicates = self._fetch_ticker(ticker, db_manager)
-                    total_new += new
-                    total_duplicates += duplicates
-                except Exception as e:
-                    logger.error(f"Error fetching {ticker}: {e}")
-                    total_errors += 1
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as executor:
+                futures = {
+                    executor.submit(self._fetch_ticker, ticker, db_manager): ticker
+                    for ticker in batch
+                }
+                for future in as_completed(futures):
+                    ticker = futures[future]
+                    try:
+                        new, duplicates = future.result()
+                        total_new += new
+                        total_duplicates += duplicates
+                    except Exception as e:
+                        logger.error("Error fetching %s: %s", ticker, e)
+                        total_errors += 1
 
             # Delay between batches (except after last batch)
             if batch_num < num_batches - 1:
-                logger.debug(f"Waiting {self.BATCH_DELAY}s before next batch...")
+                logger.debug("Waiting %ss before next batch...", self.BATCH_DELAY)
                 time.sleep(self.BATCH_DELAY)
 
         return total_new, total_duplicates, total_errors
@@ -102,84 +147,108 @@ class SeekingAlphaTickerParser:
         url = self.BASE_URL.format(ticker=ticker)
 
         try:
-            response = self.session.get(url, timeout=self.REQUEST_TIMEOUT)
-            response.raise_for_status()
-
-            # Parse XML
-            root = ET.fromstring(response.content)
-            items = root.findall('.//item')
+            with self.session.get(
+                url, headers=self.HEADERS, timeout=self.REQUEST_TIMEOUT, stream=True
+            ) as response:
+                response.raise_for_status()
+
+                # Parse <item> elements straight off the socket (gzip decoded),
+                # reading only the URL for now; feeds are a few dozen items,
+                # so they are held until the duplicate check below
+                response.raw.decode_content = True
+                candidates = []
+                for _, item in etree.iterparse(response.raw, events=('end',), tag='item'):
+                    item_url = self._extract_url(item)
+                    if item_url:
+                        candidates.append((item_url, item))
+
+            # Drop already-stored URLs, then fully parse only the new items.
+            # The Bloom filter has no false negatives, so URLs it rules out
+            # skip the database; the ones it reports may be false positives
+            # and are confirmed with one urls_exist query
+            known_urls = self.known_urls
+            candidate_urls = [item_url for item_url, _ in candidates]
+            if known_urls is not None:
+                candidate_urls = [item_url for item_url in candidate_urls if item_url in known_urls]
+            stored = db_manager.urls_exist(candidate_urls)
 
-            new_articles = 0
             duplicates = 0
-
-            for item in items:
-                article_data = self._parse_item(item, ticker)
-                if not article_data:
-                    continue
-
-                # Check if URL already exists
-                if self._url_exists(article_data['url'], db_manager):
+            fresh = []
+            for item_url, item in candidates:
+                if item_url in stored:
                     duplicates += 1
                     continue
-
-                # Insert into database
-                if self._insert_article(article_data, db_manager):
-                    new_articles += 1
+                article_data = self._parse_item_full(item, ticker, item_url)
+                if article_data:
+                    fresh.append(article_data)
+
+            # Insert the rest in one batch; ON CONFLICT catches URLs stored
+            # since startup by other sources (or repeated within this feed)
+            new_articles = db_manager.bulk_insert_articles(fresh)
+            duplicates += len(fresh) - new_articles
+
+            # Only URLs known to be stored go into the filter, so a failed
+            # insert is retried on the next run
+            if known_urls is not None and fresh:
+                fresh_urls = [a['url'] for a in fresh]
+                if new_articles < len(fresh):
+                    fresh_urls = db_manager.urls_exist(fresh_urls)
+                known_urls.update(fresh_urls)
 
             if new_articles > 0 or duplicates > 0:
-                logger.debug(f"{ticker}: {new_articles} new, {duplicates} duplicates")
+                logger.debug("%s: %s new, %s duplicates", ticker, new_articles, duplicates)
 
             return new_articles, duplicates
 
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 429:
-                logger.warning(f"Rate limited on {ticker} - backing off")
+                logger.warning("Rate limited on %s - backing off", ticker)
                 time.sleep(5)  # Extra delay on rate limit
             raise
         except Exception as e:
-            logger.error(f"Failed to fetch {ticker}: {e}")
+            logger.error("Failed to fetch %s: %s", ticker, e)
             raise
 
-    def _parse_item(self, item: ET.Element, primary_ticker: str) -> Dict:
-        """Parse a single RSS item into article data."""
-        try:
-            # Extract basic fields
-            title_elem = item.find('title')
-            link_elem = item.find('link')
-            pubdate_elem = item.find('pubDate')
-            guid_elem = item.find('guid')
+    def _extract_url(self, item: etree._Element) -> Optional[str]:
+        """
+        Extract just the article URL from an RSS item.
+
+        Returns:
+            Article URL, or None if the item has no title or link
+        """
+        url = item.findtext('link')
+        if not url or not item.findtext('title'):
+            return None
 
-            if not (title_elem is not None and link_elem is not None):
-                return None
+        # Use GUID as URL if link is generic
+        guid = item.findtext('guid')
+        if guid and 'seekingalpha.com/Market' in guid:
+            url = guid
 
-            title = title_elem.text
-            url = link_elem.text
+        return url
 
-            # Use GUID as URL if link is generic
-            if guid_elem is not None and 'seekingalpha.com/Market' in guid_elem.text:
-                url = guid_elem.text
+    def _parse_item_full(self, item: etree._Element, primary_ticker: str, url: str) -> Optional[Dict]:
+        """Parse the remaining fields of an RSS item whose URL is new."""
+        try:
+            title = item.findtext('title')
+            guid = item.findtext('guid')
 
             # Parse publish date
-            published_at = self._parse_date(pubdate_elem.text if pubdate_elem is not None else None)
+            published_at = self._parse_date(item.findtext('pubDate'))
 
             # Extract all mentioned tickers
-            namespace = {'sa': 'https://seekingalpha.com/api/1.0'}
-            stocks = item.findall('.//sa:stock', namespace)
-            mentioned_tickers = []
-
-            for stock in stocks:
-                symbol_elem = stock.find('sa:symbol', namespace)
-                if symbol_elem is not None:
-                    mentioned_tickers.append(symbol_elem.text)
+            mentioned_tickers = _STOCK_SYMBOLS_XPATH(item)
 
             # Get author
-            author_elem = item.find('{https://seekingalpha.com/api/1.0}author_name')
-            author = author_elem.text if author_elem is not None else 'Unknown'
+            author = item.findtext(_AUTHOR_TAG, 'Unknown')
 
             # Create summary with ticker mentions
-            summary = f"Mentions: {', '.join(mentioned_tickers[:10])}" if mentioned_tickers else ""
-            if len(mentioned_tickers) > 10:
-                summary += f" and {len(mentioned_tickers) - 10} more"
+            n = len(mentioned_tickers)
+            summary = ''
+            if n:
+                summary = 'Mentions: ' + ', '.join(islice(mentioned_tickers, 10))
+                if n > 10:
+                    summary += f" and {n - 10} more"
 
             return {
                 'url': url,
@@ -191,12 +260,13 @@ class SeekingAlphaTickerParser:
                     'primary_ticker': primary_ticker,
                     'mentioned_tickers': mentioned_tickers,
                     'author': author,
-                    'guid': guid_elem.text if guid_elem is not None else None
+                    # Omit the GUID when it is just the article URL
+                    'guid': guid if guid != url else None
                 }
             }
 
         except Exception as e:
-            logger.error(f"Error parsing item: {e}")
+            logger.error("Error parsing item: %s", e)
             return None
 
     def _parse_date(self, date_str: str) -> datetime:
@@ -206,26 +276,12 @@ class SeekingAlphaTickerParser:
 
         try:
             # RFC 2822 format: "Wed, 17 Dec 2025 09:25:20 -0500"
-            return datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %z').replace(tzinfo=None)
-        except:
+            dt = parsedate_to_datetime(date_str)
+        except (TypeError, ValueError):
+            # ISO 8601 variants
             try:
-                # Try without timezone
-                return datetime.strptime(date_str[:25], '%a, %d %b %Y %H:%M:%S')
-            except:
+                dt = ciso8601.parse_datetime(date_str) if ciso8601 else datetime.fromisoformat(date_str)
+            except ValueError:
                 return datetime.now()
 
-    def _url_exists(self, url: str, db_manager) -> bool:
-        """Check if URL already exists in database."""
-        return db_manager.url_exists(url)
-
-    def _insert_article(self, article_data: Dict, db_manager) -> bool:
-        """Insert article into database."""
-        result = db_manager.insert_article(
-            url=article_data['url'],
-            title=article_data['title'],
-            summary=article_data['summary'],
-            source=article_data['source'],
-            published_at=article_data['published_at'],
-            raw_json=article_data['raw_json']
-        )
-        return result is not None
+        return dt.replace(tzinfo=None) if dt.tzinfo else dt
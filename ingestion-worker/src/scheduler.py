@@ -7,6 +7,7 @@ Runs RSS parsing and API calls on a configurable schedule.
 import schedule
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 from src.config import Config
 from src.logger import setup_logger
@@ -14,6 +15,8 @@ from src.database import DatabaseManager
 from src.parsers import RSSParser, SeekingAlphaTickerParser, SECParser
 from src.api_clients import FinnhubClient, AlphaVantageClient
 from src.api_clients.sec_cik_mapper import SECCIKMapper
+from src.url_filter import BloomFilter
+from src.http_session import create_session
 
 logger = setup_logger(__name__)
 
@@ -21,12 +24,21 @@ logger = setup_logger(__name__)
 class IngestionScheduler:
     """Schedules and executes periodic data ingestion tasks."""
 
+    TASK_WORKERS = 5  # one per scheduled task type
+    MAX_IDLE_SLEEP = 60  # seconds; also the heartbeat interval (healthcheck allows 300)
+
     def __init__(self):
         """Initialize scheduler with database and parsers."""
         self.db_manager = DatabaseManager()
-        self.rss_parser = RSSParser(self.db_manager)
-        self.seekingalpha_parser = SeekingAlphaTickerParser()
-        self.sec_parser = SECParser()
+
+        # One connection pool for every parser (keep-alive/TLS reuse)
+        self.http_session = create_session()
+        self.rss_parser = RSSParser(self.db_manager, session=self.http_session)
+        self.seekingalpha_parser = SeekingAlphaTickerParser(
+            session=self.http_session,
+            max_concurrent_requests=Config.SEEKINGALPHA_CONCURRENCY
+        )
+        self.sec_parser = SECParser(session=self.http_session)
         self.sec_cik_mapper = SECCIKMapper()
 
         # Initialize API clients (Week 2)
@@ -36,24 +48,38 @@ class IngestionScheduler:
         # Try to initialize API clients with error handling
         try:
             if Config.FINNHUB_API_KEY and Config.FINNHUB_API_KEY != 'your_finnhub_api_key_here':
-                self.finnhub_client = FinnhubClient(Config.FINNHUB_API_KEY)
+                self.finnhub_client = FinnhubClient(
+                    Config.FINNHUB_API_KEY,
+                    max_concurrent_requests=Config.FINNHUB_CONCURRENCY
+                )
                 logger.info("Finnhub API client initialized")
             else:
                 logger.warning("Finnhub API key not configured - skipping Finnhub integration")
         except Exception as e:
-            logger.error(f"Failed to initialize Finnhub client: {e}")
+            logger.error("Failed to initialize Finnhub client: %s", e)
 
         try:
             if Config.ALPHAVANTAGE_API_KEY and Config.ALPHAVANTAGE_API_KEY != 'your_alphavantage_api_key_here':
-                self.alphavantage_client = AlphaVantageClient(Config.ALPHAVANTAGE_API_KEY)
+                self.alphavantage_client = AlphaVantageClient(
+                    Config.ALPHAVANTAGE_API_KEY,
+                    max_concurrent_requests=Config.ALPHAVANTAGE_CONCURRENCY
+                )
                 logger.info("Alpha Vantage API client initialized")
             else:
                 logger.warning("Alpha Vantage API key not configured - skipping Alpha Vantage integration")
         except Exception as e:
-            logger.error(f"Failed to initialize Alpha Vantage client: {e}")
+            logger.error("Failed to initialize Alpha Vantage client: %s", e)
 
         self.fetch_interval = Config.FETCH_INTERVAL_MINUTES
 
+        # Scheduled tasks run off the scheduler thread so a long fetch
+        # does not delay the others; task name -> last submitted future
+        self._task_executor = ThreadPoolExecutor(
+            max_workers=self.TASK_WORKERS,
+            thread_name_prefix='ingestion-task'
+        )
+        self._running_tasks = {}
+
         # Track consecutive failures for monitoring
         self.failure_counts = {
             'rss': 0,
@@ -72,12 +98,13 @@ class IngestionScheduler:
             new_articles = self.rss_parser.fetch_all_feeds()
 
             # Get current totals
-            total_articles = self.db_manager.get_article_count()
+            total_articles = self.db_manager.get_article_count(exact=False)
 
             duration = (datetime.now() - start_time).total_seconds()
             logger.info(
-                f"=== RSS feed fetch complete: {new_articles} new articles, "
-                f"{total_articles} total articles, {duration:.2f}s ==="
+                "=== RSS feed fetch complete: %s new articles, "
+                "%s total articles, %.2fs ===",
+                new_articles, total_articles, duration
             )
 
             # Reset failure count on success
@@ -85,11 +112,11 @@ class IngestionScheduler:
 
         except Exception as e:
             self.failure_counts['rss'] += 1
-            logger.error(f"RSS feed fetch task failed: {e}", exc_info=True)
+            logger.error("RSS feed fetch task failed: %s", e, exc_info=True)
 
             # Alert if consecutive failures
             if self.failure_counts['rss'] >= 3:
-                logger.warning(f"RSS feed has failed {self.failure_counts['rss']} times consecutively")
+                logger.warning("RSS feed has failed %s times consecutively", self.failure_counts['rss'])
 
     def fetch_seekingalpha_tickers(self):
         """Task: Fetch Seeking Alpha ticker-specific feeds."""
@@ -99,7 +126,7 @@ class IngestionScheduler:
         try:
             # Get all tickers from database
             all_tickers = self.db_manager.get_all_tickers()
-            logger.info(f"Fetching news for {len(all_tickers)} tickers")
+            logger.info("Fetching news for %s tickers", len(all_tickers))
 
             # Fetch ticker feeds with rate limiting
             new_articles, duplicates, errors = self.seekingalpha_parser.fetch_all_tickers(
@@ -107,13 +134,14 @@ class IngestionScheduler:
             )
 
             # Get current totals
-            total_articles = self.db_manager.get_article_count()
+            total_articles = self.db_manager.get_article_count(exact=False)
 
             duration = (datetime.now() - start_time).total_seconds()
             logger.info(
-                f"=== Seeking Alpha ticker feeds complete: {new_articles} new, "
-                f"{duplicates} duplicates, {errors} errors, "
-                f"{total_articles} total articles, {duration:.2f}s ==="
+                "=== Seeking Alpha ticker feeds complete: %s new, "
+                "%s duplicates, %s errors, "
+                "%s total articles, %.2fs ===",
+                new_articles, duplicates, errors, total_articles, duration
             )
 
             # Reset failure count on success
@@ -121,11 +149,11 @@ class IngestionScheduler:
 
         except Exception as e:
             self.failure_counts['seekingalpha'] += 1
-            logger.error(f"Seeking Alpha ticker fetch task failed: {e}", exc_info=True)
+            logger.error("Seeking Alpha ticker fetch task failed: %s", e, exc_info=True)
 
             # Alert if consecutive failures
             if self.failure_counts['seekingalpha'] >= 3:
-                logger.warning(f"Seeking Alpha has failed {self.failure_counts['seekingalpha']} times consecutively")
+                logger.warning("Seeking Alpha has failed %s times consecutively", self.failure_counts['seekingalpha'])
 
     def fetch_finnhub_news(self):
         """Task: Fetch news from Finnhub API for top 50 companies."""
@@ -139,47 +167,45 @@ class IngestionScheduler:
         try:
             # Get top 50 tickers
             top_tickers = self.db_manager.get_top_tickers(50)
-            logger.info(f"Fetching Finnhub news for {len(top_tickers)} top companies")
+            logger.info("Fetching Finnhub news for %s top companies", len(top_tickers))
 
             new_articles = 0
             duplicates = 0
             errors = 0
 
-            for ticker in top_tickers:
-                try:
-                    articles = self.finnhub_client.fetch_company_news(ticker, days_back=7)
+            # Tickers are fetched concurrently; results are stored as they complete
+            for ticker, articles, error in self.finnhub_client.fetch_company_news_concurrent(
+                top_tickers, days_back=7
+            ):
+                if error:
+                    logger.error("Error fetching Finnhub news for %s: %s", ticker, error)
+                    errors += 1
+                    continue
 
-                    for article in articles:
-                        article_id = self.db_manager.insert_article(
-                            url=article['url'],
-                            title=article['title'],
-                            summary=article['summary'],
-                            source=article['source'],
-                            published_at=article['published_at'],
-                            raw_json=article['raw_json']
-                        )
-
-                        if article_id:
-                            new_articles += 1
-                        else:
-                            duplicates += 1
+                try:
+                    # One batched INSERT per ticker instead of one per article
+                    inserted = self.db_manager.bulk_insert_articles(articles)
+                    new_articles += inserted
+                    duplicates += len(articles) - inserted
 
                 except Exception as e:
-                    logger.error(f"Error fetching Finnhub news for {ticker}: {e}")
+                    logger.error("Error storing Finnhub news for %s: %s", ticker, e)
                     errors += 1
 
             # Get current totals
-            total_articles = self.db_manager.get_article_count()
+            total_articles = self.db_manager.get_article_count(exact=False)
 
             # Get API stats
             api_stats = self.finnhub_client.get_request_stats()
 
             duration = (datetime.now() - start_time).total_seconds()
             logger.info(
-                f"=== Finnhub news fetch complete: {new_articles} new, "
-                f"{duplicates} duplicates, {errors} errors, "
-                f"{total_articles} total articles, {duration:.2f}s, "
-                f"API requests: {api_stats['requests_today']}/{api_stats['daily_limit']} ==="
+                "=== Finnhub news fetch complete: %s new, "
+                "%s duplicates, %s errors, "
+                "%s total articles, %.2fs, "
+                "API requests: %s/%s ===",
+                new_articles, duplicates, errors, total_articles, duration,
+                api_stats['requests_today'], api_stats['daily_limit']
             )
 
             # Reset failure count on success
@@ -187,11 +213,11 @@ class IngestionScheduler:
 
         except Exception as e:
             self.failure_counts['finnhub'] += 1
-            logger.error(f"Finnhub news fetch task failed: {e}", exc_info=True)
+            logger.error("Finnhub news fetch task failed: %s", e, exc_info=True)
 
             # Alert if consecutive failures
             if self.failure_counts['finnhub'] >= 3:
-                logger.warning(f"Finnhub has failed {self.failure_counts['finnhub']} times consecutively")
+                logger.warning("Finnhub has failed %s times consecutively", self.failure_counts['finnhub'])
 
     def fetch_alphavantage_news(self):
         """Task: Fetch news from Alpha Vantage API for top 100 companies."""
@@ -205,52 +231,51 @@ class IngestionScheduler:
         try:
             # Get top 100 tickers
             top_tickers = self.db_manager.get_top_tickers(100)
-            logger.info(f"Fetching Alpha Vantage news for {len(top_tickers)} top companies")
+            logger.info("Fetching Alpha Vantage news for %s top companies", len(top_tickers))
 
             new_articles = 0
             duplicates = 0
             errors = 0
 
-            for ticker in top_tickers:
-                try:
-                    articles = self.alphavantage_client.fetch_news_sentiment(ticker, limit=50)
+            # Tickers are fetched concurrently; results are stored as they complete
+            for ticker, articles, error in self.alphavantage_client.fetch_news_sentiment_concurrent(
+                top_tickers, limit=50, keep_raw=True
+            ):
+                if error:
+                    logger.error("Error fetching Alpha Vantage news for %s: %s", ticker, error)
+                    errors += 1
+                    continue
 
+                try:
                     for article in articles:
                         # Include sentiment data in raw_json
                         raw_json = article['raw_json']
                         raw_json['sentiment_score'] = article.get('sentiment_score')
                         raw_json['sentiment_label'] = article.get('sentiment_label')
 
-                        article_id = self.db_manager.insert_article(
-                            url=article['url'],
-                            title=article['title'],
-                            summary=article['summary'],
-                            source=article['source'],
-                            published_at=article['published_at'],
-                            raw_json=raw_json
-                        )
-
-                        if article_id:
-                            new_articles += 1
-                        else:
-                            duplicates += 1
+                    # One batched INSERT per ticker instead of one per article
+                    inserted = self.db_manager.bulk_insert_articles(articles)
+                    new_articles += inserted
+                    duplicates += len(articles) - inserted
 
                 except Exception as e:
-                    logger.error(f"Error fetching Alpha Vantage news for {ticker}: {e}")
+                    logger.error("Error storing Alpha Vantage news for %s: %s", ticker, e)
                     errors += 1
 
             # Get current totals
-            total_articles = self.db_manager.get_article_count()
+            total_articles = self.db_manager.get_article_count(exact=False)
 
             # Get API stats
             api_stats = self.alphavantage_client.get_request_stats()
 
             duration = (datetime.now() - start_time).total_seconds()
             logger.info(
-                f"=== Alpha Vantage news fetch complete: {new_articles} new, "
-                f"{duplicates} duplicates, {errors} errors, "
-                f"{total_articles} total articles, {duration:.2f}s, "
-                f"API requests: {api_stats['requests_today']}/{api_stats['daily_limit']} ==="
+                "=== Alpha Vantage news fetch complete: %s new, "
+                "%s duplicates, %s errors, "
+                "%s total articles, %.2fs, "
+                "API requests: %s/%s ===",
+                new_articles, duplicates, errors, total_articles, duration,
+                api_stats['requests_today'], api_stats['daily_limit']
             )
 
             # Reset failure count on success
@@ -258,11 +283,11 @@ class IngestionScheduler:
 
         except Exception as e:
             self.failure_counts['alphavantage'] += 1
-            logger.error(f"Alpha Vantage news fetch task failed: {e}", exc_info=True)
+            logger.error("Alpha Vantage news fetch task failed: %s", e, exc_info=True)
 
             # Alert if consecutive failures
             if self.failure_counts['alphavantage'] >= 3:
-                logger.warning(f"Alpha Vantage has failed {self.failure_counts['alphavantage']} times consecutively")
+                logger.warning("Alpha Vantage has failed %s times consecutively", self.failure_counts['alphavantage'])
 
     def fetch_sec_filings(self):
         """Task: Fetch SEC EDGAR filings for all companies."""
@@ -272,7 +297,7 @@ class IngestionScheduler:
         try:
             # Get all companies with CIK values
             companies = self.db_manager.get_companies_with_cik()
-            logger.info(f"Fetching SEC filings for {len(companies)} companies with CIK")
+            logger.info("Fetching SEC filings for %s companies with CIK", len(companies))
 
             if not companies:
                 logger.warning("No companies have CIK values - run CIK mapping first")
@@ -280,17 +305,18 @@ class IngestionScheduler:
 
             # Fetch filings with rate limiting
             new_filings, duplicates, errors = self.sec_parser.fetch_multiple_companies(
-                companies, self.db_manager, batch_delay=0.2
+                companies, self.db_manager
             )
 
             # Get current totals
-            total_articles = self.db_manager.get_article_count()
+            total_articles = self.db_manager.get_article_count(exact=False)
 
             duration = (datetime.now() - start_time).total_seconds()
             logger.info(
-                f"=== SEC EDGAR filings fetch complete: {new_filings} new, "
-                f"{duplicates} duplicates, {errors} errors, "
-                f"{total_articles} total articles, {duration:.2f}s ==="
+                "=== SEC EDGAR filings fetch complete: %s new, "
+                "%s duplicates, %s errors, "
+                "%s total articles, %.2fs ===",
+                new_filings, duplicates, errors, total_articles, duration
             )
 
             # Reset failure count on success
@@ -298,11 +324,11 @@ class IngestionScheduler:
 
         except Exception as e:
             self.failure_counts['sec'] += 1
-            logger.error(f"SEC EDGAR filings fetch task failed: {e}", exc_info=True)
+            logger.error("SEC EDGAR filings fetch task failed: %s", e, exc_info=True)
 
             # Alert if consecutive failures
             if self.failure_counts['sec'] >= 3:
-                logger.warning(f"SEC EDGAR has failed {self.failure_counts['sec']} times consecutively")
+                logger.warning("SEC EDGAR has failed %s times consecutively", self.failure_counts['sec'])
 
     def run_startup_tasks(self):
         """Run tasks immediately on startup."""
@@ -315,7 +341,7 @@ class IngestionScheduler:
 
         # Check company count
         company_count = self.db_manager.get_company_count()
-        logger.info(f"Database initialized with {company_count} companies")
+        logger.info("Database initialized with %s companies", company_count)
 
         if company_count == 0:
             logger.warning("No companies in database - seed data may not have loaded")
@@ -328,35 +354,64 @@ class IngestionScheduler:
                 logger.info("Updating CIK values in database...")
                 self.sec_cik_mapper.update_database_ciks(self.db_manager)
         except Exception as e:
-            logger.error(f"Failed to update CIK mapping: {e}")
+            logger.error("Failed to update CIK mapping: %s", e)
 
-        # Run initial RSS fetch
-        self.fetch_rss_feeds()
+        # Preload known URLs so Seeking Alpha can drop duplicates in memory
+        try:
+            article_count = self.db_manager.get_article_count(exact=False)
+            url_filter = BloomFilter(capacity=max(1_000_000, 2 * article_count), error_rate=0.001)
+            url_filter.update(self.db_manager.iter_urls())
+            self.seekingalpha_parser.known_urls = url_filter
+            logger.info("Loaded %s known article URLs into Bloom filter", len(url_filter))
+        except Exception as e:
+            logger.error("Failed to preload known URLs: %s", e)
+
+        # Run initial RSS fetch on the task pool, so the main loop (and its
+        # heartbeat) starts without waiting for it
+        self._run_in_background(self.fetch_rss_feeds)
+
+    def _run_in_background(self, task):
+        """
+        Submit a scheduled task to the task pool.
+
+        A task whose previous run is still in progress is skipped rather
+        than queued, so slow runs never pile up behind each other.
+
+        Args:
+            task: Bound task method (e.g. self.fetch_rss_feeds)
+        """
+        name = task.__name__
+        previous = self._running_tasks.get(name)
+        if previous is not None and not previous.done():
+            logger.warning("Skipping %s: previous run still in progress", name)
+            return
+
+        self._running_tasks[name] = self._task_executor.submit(task)
 
     def setup_schedule(self):
         """Configure the schedule for periodic tasks."""
         # RSS feeds every N minutes (default: 15 minutes)
-        schedule.every(self.fetch_interval).minutes.do(self.fetch_rss_feeds)
+        schedule.every(self.fetch_interval).minutes.do(self._run_in_background, self.fetch_rss_feeds)
 
         # Seeking Alpha ticker feeds every 4 hours
-        schedule.every(4).hours.do(self.fetch_seekingalpha_tickers)
+        schedule.every(4).hours.do(self._run_in_background, self.fetch_seekingalpha_tickers)
 
         # Finnhub news every 4 hours (staggered 2 hours after Seeking Alpha)
         if self.finnhub_client:
-            schedule.every(4).hours.do(self.fetch_finnhub_news)
+            schedule.every(4).hours.do(self._run_in_background, self.fetch_finnhub_news)
             logger.info("Finnhub news fetch scheduled every 4 hours")
         else:
             logger.info("Finnhub API not configured - skipping Finnhub schedule")
 
         # Alpha Vantage once daily at 6 AM (low rate limit)
         if self.alphavantage_client:
-            schedule.every().day.at("06:00").do(self.fetch_alphavantage_news)
+            schedule.every().day.at("06:00").do(self._run_in_background, self.fetch_alphavantage_news)
             logger.info("Alpha Vantage news fetch scheduled daily at 6:00 AM")
         else:
             logger.info("Alpha Vantage API not configured - skipping Alpha Vantage schedule")
 
         # SEC EDGAR filings every 2 hours
-        schedule.every(2).hours.do(self.fetch_sec_filings)
+        schedule.every(2).hours.do(self._run_in_background, self.fetch_sec_filings)
 
         logger.info(
             f"Scheduler configured:\n"
@@ -392,14 +447,27 @@ class IngestionScheduler:
                         f.write(str(time.time()))
                 except Exception:
                     pass
-                time.sleep(10)  # Check every 10 seconds
+
+                # Sleep until the next job is due, waking at least every
+                # MAX_IDLE_SLEEP seconds to refresh the heartbeat
+                idle = schedule.idle_seconds()
+                if idle is None:
+                    idle = self.MAX_IDLE_SLEEP
+                time.sleep(min(max(idle, 0), self.MAX_IDLE_SLEEP))
 
         except KeyboardInterrupt:
             logger.info("Received shutdown signal")
         except Exception as e:
-            logger.error(f"Scheduler error: {e}", exc_info=True)
+            logger.error("Scheduler error: %s", e, exc_info=True)
             raise
         finally:
             logger.info("Shutting down...")
+            self._task_executor.shutdown(wait=True, cancel_futures=True)
+            self.rss_parser.close()
+            self.http_session.close()
+            if self.finnhub_client:
+                self.finnhub_client.close()
+            if self.alphavantage_client:
+                self.alphavantage_client.close()
             self.db_manager.close()
             logger.info("=== Ingestion Worker Stopped ===")
@@ -0,0 +1,140 @@
+"""Tests for DatabaseManager article storage (against a mocked pool)."""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from src import database
+from src.database import DatabaseManager
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Manager whose pool hands out one connection with a recording cursor."""
+    monkeypatch.setattr(DatabaseManager, '_initialize_pool', lambda self: None)
+    manager = DatabaseManager()
+
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    manager.connection_pool = MagicMock()
+    manager.connection_pool.getconn.return_value = conn
+
+    manager.conn = conn
+    manager.cursor = cursor
+    return manager
+
+
+def article(url):
+    return {
+        'url': url,
+        'title': 'Story',
+        'summary': 'Summary',
+        'source': 'Finnhub',
+        'published_at': datetime(2025, 12, 17, 9, 25),
+        'raw_json': {'ticker': 'AAPL'},
+    }
+
+
+def test_bulk_insert_articles_returns_inserted_count(db, monkeypatch):
+    execute_values = MagicMock(return_value=[(1,), (2,)])
+    monkeypatch.setattr(database, 'execute_values', execute_values)
+
+    inserted = db.bulk_insert_articles([article('https://a'), article('https://b'), article('https://c')])
+
+    assert inserted == 2
+    rows = execute_values.call_args.args[2]
+    assert [row[0] for row in rows] == ['https://a', 'https://b', 'https://c']
+    assert rows[0][5].adapted == {'ticker': 'AAPL'}
+    db.conn.commit.assert_called_once()
+
+
+def test_bulk_insert_articles_empty_skips_database(db):
+    assert db.bulk_insert_articles([]) == 0
+    db.connection_pool.getconn.assert_not_called()
+
+
+def test_bulk_insert_falls_back_to_per_row_inserts(db, monkeypatch):
+    monkeypatch.setattr(database, 'execute_values', MagicMock(side_effect=Exception("bad row")))
+    # Per-row inserts: first is new, second is a duplicate (no RETURNING row)
+    db.cursor.fetchone.side_effect = [(7,), None]
+
+    inserted = db.bulk_insert_articles([article('https://a'), article('https://b')])
+
+    assert inserted == 1
+    db.conn.rollback.assert_called_once()
+    executed = [call.args for call in db.cursor.execute.call_args_list]
+    inserts = [params for sql, *params in executed if sql.startswith('EXECUTE ins_article')]
+    assert [params[0][0] for params in inserts] == ['https://a', 'https://b']
+    assert inserts[0][0][5].adapted == {'ticker': 'AAPL'}
+
+
+def test_urls_exist_returns_stored_subset(db):
+    db.cursor.fetchall.return_value = [('https://a',)]
+
+    assert db.urls_exist(iter(['https://a', 'https://b'])) == {'https://a'}
+    sql, params = db.cursor.execute.call_args.args
+    assert 'url = ANY(%s)' in sql
+    assert params == (['https://a', 'https://b'],)
+
+
+def test_urls_exist_empty_skips_database(db):
+    assert db.urls_exist([]) == set()
+    db.connection_pool.getconn.assert_not_called()
+
+
+def test_urls_exist_reports_nothing_on_error(db):
+    db.cursor.execute.side_effect = Exception("connection lost")
+
+    assert db.urls_exist(['https://a']) == set()
+
+
+def test_company_queries_are_cached_until_invalidated(db):
+    db.cursor.fetchone.return_value = (['AAPL', 'MSFT'],)
+
+    assert db.get_top_tickers(50) == ['AAPL', 'MSFT']
+    assert db.get_top_tickers(50) == ['AAPL', 'MSFT']
+    assert db.cursor.execute.call_count == 1
+
+    db.invalidate_company_cache()
+    db.get_top_tickers(50)
+    assert db.cursor.execute.call_count == 2
+
+
+def copied_csv(cursor):
+    sql, buffer = cursor.copy_expert.call_args.args
+    return sql, buffer.getvalue()
+
+
+def test_copy_articles_stages_csv_and_keeps_empty_strings(db):
+    db.cursor.rowcount = 2
+    rows = [
+        ('https://a', 'Say "hi"', '', 'RSS', datetime(2025, 12, 17, 9, 25), database.json_param({'id': 'x'})),
+        ('https://b', 'Line\nbreak', None, 'RSS', None, None),
+    ]
+
+    assert db.copy_articles(rows) == 2
+
+    sql, body = copied_csv(db.cursor)
+    assert sql.startswith('COPY articles_raw_staging')
+    assert body == (
+        '"https://a","Say ""hi""","","RSS","2025-12-17T09:25:00","{""id"":""x""}"\n'
+        '"https://b","Line\nbreak",,"RSS",,\n'
+    )
+    executed = [call.args[0] for call in db.cursor.execute.call_args_list]
+    assert 'CREATE TEMP TABLE articles_raw_staging' in executed[0]
+    assert 'ON CONFLICT (url) DO NOTHING' in executed[-1]
+    db.conn.commit.assert_called_once()
+
+
+def test_copy_articles_falls_back_to_batched_inserts(db, monkeypatch):
+    db.cursor.copy_expert.side_effect = Exception("copy failed")
+    execute_values = MagicMock(return_value=[(1,)])
+    monkeypatch.setattr(database, 'execute_values', execute_values)
+    rows = [('https://a', 'Story', 'Summary', 'RSS', None, None)]
+
+    assert db.copy_articles(rows) == 1
+    db.conn.rollback.assert_called_once()
+    assert execute_values.call_args.args[2] == rows
@@ -0,0 +1,160 @@
+"""Tests for RSS conditional GET handling."""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.parsers import rss_parser
+from src.parsers.rss_parser import RSSParser
+
+FEED_URL = 'https://example.com/feed.xml'
+
+FEED_BODY = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Example</title>
+  <item>
+    <title>Example story</title>
+    <link>https://example.com/story</link>
+    <pubDate>Wed, 17 Dec 2025 09:25:20 GMT</pubDate>
+  </item>
+</channel></rss>"""
+
+
+class FakeRaw(io.BytesIO):
+    """urllib3 response body (read() takes decode_content)."""
+
+    def read(self, *args, decode_content=False):
+        return super().read(*args)
+
+
+class FakeResponse:
+    """Minimal streamed requests.Response."""
+
+    def __init__(self, status_code=200, body=b'', headers=None):
+        self.status_code = status_code
+        self.raw = FakeRaw(body)
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeDB:
+    """Stand-in for DatabaseManager's insert and URL lookup."""
+
+    def __init__(self, stored=(), fail_inserts=False):
+        self.stored = set(stored)
+        self.fail_inserts = fail_inserts
+        self.copied = []
+
+    def bulk_insert_rows(self, rows):
+        if self.fail_inserts:
+            return 0
+        new = {row[0] for row in rows} - self.stored
+        self.stored |= new
+        return len(new)
+
+    def copy_articles(self, rows):
+        self.copied.append(rows)
+        return self.bulk_insert_rows(rows)
+
+    def urls_exist(self, urls):
+        return {url for url in urls if url in self.stored}
+
+
+@pytest.fixture
+def make_parser():
+    parsers = []
+
+    def make(db, *responses):
+        session = MagicMock()
+        session.get.side_effect = list(responses)
+        parser = RSSParser(db, session=session)
+        parser.feeds = [{'name': 'Example', 'url': FEED_URL}]
+        # Parse on a thread instead of spawning worker processes
+        parser._parse_pool.shutdown()
+        parser._parse_pool = ThreadPoolExecutor(max_workers=1)
+        parsers.append(parser)
+        return parser, session
+
+    yield make
+    for parser in parsers:
+        parser.close()
+
+
+def sent_headers(session, call=-1):
+    return session.get.call_args_list[call].kwargs['headers']
+
+
+def test_validators_sent_after_successful_insert(make_parser):
+    parser, session = make_parser(
+        FakeDB(),
+        FakeResponse(body=FEED_BODY, headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 17 Dec 2025 10:00:00 GMT'}),
+        FakeResponse(status_code=304),
+    )
+
+    assert parser.fetch_all_feeds() == 1
+    assert 'If-None-Match' not in sent_headers(session)
+
+    assert parser.fetch_all_feeds() == 0
+    assert sent_headers(session)['If-None-Match'] == '"v1"'
+    assert sent_headers(session)['If-Modified-Since'] == 'Wed, 17 Dec 2025 10:00:00 GMT'
+
+
+def test_validators_saved_when_all_rows_are_duplicates(make_parser):
+    parser, session = make_parser(
+        FakeDB(stored={'https://example.com/story'}),
+        FakeResponse(body=FEED_BODY, headers={'ETag': '"v1"'}),
+        FakeResponse(status_code=304),
+    )
+
+    assert parser.fetch_all_feeds() == 0
+    parser.fetch_all_feeds()
+    assert sent_headers(session)['If-None-Match'] == '"v1"'
+
+
+def test_validators_not_saved_when_insert_fails(make_parser):
+    parser, session = make_parser(
+        FakeDB(fail_inserts=True),
+        FakeResponse(body=FEED_BODY, headers={'ETag': '"v1"'}),
+        FakeResponse(body=FEED_BODY, headers={'ETag': '"v1"'}),
+    )
+
+    parser.fetch_all_feeds()
+    parser.fetch_all_feeds()
+    assert 'If-None-Match' not in sent_headers(session)
+
+
+def test_validators_not_saved_when_parse_fails(make_parser, monkeypatch):
+    def broken_parse(content):
+        raise ValueError("bad feed")
+
+    monkeypatch.setattr(rss_parser.feedparser, 'parse', broken_parse)
+    parser, session = make_parser(
+        FakeDB(),
+        FakeResponse(body=FEED_BODY, headers={'ETag': '"v1"'}),
+        FakeResponse(body=FEED_BODY, headers={'ETag': '"v1"'}),
+    )
+
+    assert parser.fetch_all_feeds() == 0
+    parser.fetch_all_feeds()
+    assert 'If-None-Match' not in sent_headers(session)
+
+
+def test_large_batches_are_loaded_with_copy(make_parser, monkeypatch):
+    db = FakeDB()
+    parser, session = make_parser(db, FakeResponse(body=FEED_BODY), FakeResponse(body=FEED_BODY))
+
+    assert parser.fetch_all_feeds() == 1
+    assert db.copied == []
+
+    monkeypatch.setattr(RSSParser, 'COPY_THRESHOLD', 1)
+    assert parser.fetch_all_feeds() == 0
+    assert [row[0] for row in db.copied[0]] == ['https://example.com/story']
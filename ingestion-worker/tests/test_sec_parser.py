@@ -0,0 +1,131 @@
+"""Tests for SEC EDGAR submissions parsing."""
+
+from unittest.mock import MagicMock
+
+import orjson
+import pytest
+
+from src.parsers.sec_parser import SECParser
+
+CIK = '0000320193'
+
+
+def submissions_response(forms, status_code=200, headers=None):
+    """Submissions JSON response listing the given form codes, newest first."""
+    n = len(forms)
+    body = {
+        'filings': {
+            'recent': {
+                'form': forms,
+                'accessionNumber': [f"0000320193-25-{i:06d}" for i in range(n)],
+                'filingDate': ['2025-12-17'] * n,
+                'acceptanceDateTime': ['2025-12-17T16:30:00.000Z'] * n,
+                'primaryDocument': ['doc.htm'] * n,
+                'primaryDocDescription': [''] * n,
+            }
+        }
+    }
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = orjson.dumps(body)
+    response.headers = headers or {}
+    return response
+
+
+def make_parser(*responses):
+    session = MagicMock()
+    session.get.side_effect = list(responses)
+    return SECParser(session=session), session
+
+
+@pytest.mark.parametrize('form, expected', [
+    ('4', '4'),
+    ('4/A', '4'),
+    ('8-K', '8-K'),
+    ('8-K/A', '8-K'),
+    ('10-K', '10-K'),
+    ('10-Q/A', '10-Q'),
+    ('S-4', None),
+    ('S-4/A', None),
+    ('F-4', None),
+    ('F-4/A', None),
+    ('DEF 14A', None),
+    ('SC 13G', None),
+])
+def test_form_filing_type_matches_exact_codes(form, expected):
+    assert SECParser._form_filing_type(form) == expected
+
+
+def test_fetch_company_filings_skips_registration_forms():
+    parser, _ = make_parser(submissions_response(['S-4', '4', 'F-4/A', '8-K/A', 'S-4/A']))
+
+    filings = parser.fetch_company_filings(CIK, 'AAPL')
+
+    assert [f['raw_json']['filing_type'] for f in filings] == ['4', '8-K']
+    assert filings[0]['url'] == (
+        'https://www.sec.gov/Archives/edgar/data/320193/'
+        '000032019325000001/0000320193-25-000001-index.htm'
+    )
+
+
+class FakeDB:
+    """Stand-in for DatabaseManager's single-row insert and URL lookup."""
+
+    def __init__(self, fail_inserts=False):
+        self.stored = set()
+        self.fail_inserts = fail_inserts
+
+    def insert_article(self, url, **fields):
+        if self.fail_inserts or url in self.stored:
+            return None
+        self.stored.add(url)
+        return len(self.stored)
+
+    def urls_exist(self, urls):
+        return {url for url in urls if url in self.stored}
+
+
+def test_etag_kept_after_filings_are_stored():
+    parser, session = make_parser(
+        submissions_response(['8-K'], headers={'ETag': '"v1"'}),
+        submissions_response([], status_code=304),
+    )
+    db = FakeDB()
+    companies = [{'ticker': 'AAPL', 'cik': CIK}]
+
+    assert parser.fetch_multiple_companies(companies, db) == (1, 0, 0)
+    assert 'If-None-Match' not in session.get.call_args.kwargs['headers']
+
+    parser.fetch_multiple_companies(companies, db)
+    assert session.get.call_args.kwargs['headers']['If-None-Match'] == '"v1"'
+
+
+def test_etag_kept_when_filings_are_duplicates():
+    parser, session = make_parser(
+        submissions_response(['8-K'], headers={'ETag': '"v1"'}),
+        submissions_response(['8-K'], headers={'ETag': '"v1"'}),
+        submissions_response([], status_code=304),
+    )
+    db = FakeDB()
+    companies = [{'ticker': 'AAPL', 'cik': CIK}]
+
+    parser.fetch_multiple_companies(companies, db)
+    parser._cik_etags.clear()
+    assert parser.fetch_multiple_companies(companies, db) == (0, 1, 0)
+
+    parser.fetch_multiple_companies(companies, db)
+    assert session.get.call_args.kwargs['headers']['If-None-Match'] == '"v1"'
+
+
+def test_etag_not_kept_when_insert_fails():
+    parser, session = make_parser(
+        submissions_response(['8-K'], headers={'ETag': '"v1"'}),
+        submissions_response(['8-K'], headers={'ETag': '"v1"'}),
+    )
+    db = FakeDB(fail_inserts=True)
+    companies = [{'ticker': 'AAPL', 'cik': CIK}]
+
+    parser.fetch_multiple_companies(companies, db)
+    parser.fetch_multiple_companies(companies, db)
+
+    assert 'If-None-Match' not in session.get.call_args.kwargs['headers']
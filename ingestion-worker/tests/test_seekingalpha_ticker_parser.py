@@ -0,0 +1,96 @@
+"""Tests for the Seeking Alpha ticker parser's duplicate handling."""
+
+import io
+from unittest.mock import MagicMock
+
+from src.parsers.seekingalpha_ticker_parser import SeekingAlphaTickerParser
+from src.url_filter import BloomFilter
+
+FEED_ITEM = """
+  <item>
+    <title>{title}</title>
+    <link>{url}</link>
+    <guid>{url}</guid>
+    <pubDate>Wed, 17 Dec 2025 09:25:20 -0500</pubDate>
+    <sa:stock><sa:symbol>AAPL</sa:symbol></sa:stock>
+  </item>"""
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:sa="https://seekingalpha.com/api/1.0">
+<channel>{items}
+</channel>
+</rss>"""
+
+
+class FakeDB:
+    """In-memory stand-in for DatabaseManager's URL and insert methods."""
+
+    def __init__(self, stored=(), fail_inserts=False):
+        self.stored = set(stored)
+        self.fail_inserts = fail_inserts
+        self.checked = []
+
+    def urls_exist(self, urls):
+        urls = list(urls)
+        self.checked.append(urls)
+        return {url for url in urls if url in self.stored}
+
+    def bulk_insert_articles(self, articles):
+        if self.fail_inserts:
+            return 0
+        new = {a['url'] for a in articles} - self.stored
+        self.stored |= new
+        return len(new)
+
+
+def make_parser(*urls):
+    """Parser whose session serves one feed containing the given URLs."""
+    items = ''.join(FEED_ITEM.format(title=f"Story {i}", url=url) for i, url in enumerate(urls))
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.raw = io.BytesIO(FEED.format(items=items).encode())
+
+    session = MagicMock()
+    session.get.return_value = response
+    return SeekingAlphaTickerParser(session=session)
+
+
+def test_without_filter_checks_every_url_in_database():
+    parser = make_parser('https://sa/a', 'https://sa/b')
+    db = FakeDB(stored={'https://sa/a'})
+
+    assert parser._fetch_ticker('AAPL', db) == (1, 1)
+    assert db.checked[0] == ['https://sa/a', 'https://sa/b']
+
+
+def test_filter_positive_not_in_database_is_still_inserted():
+    # A URL the filter reports (a false positive) must be confirmed by the
+    # database, not dropped
+    parser = make_parser('https://sa/new')
+    parser.known_urls = BloomFilter(capacity=100)
+    parser.known_urls.add('https://sa/new')
+    db = FakeDB()
+
+    assert parser._fetch_ticker('AAPL', db) == (1, 0)
+    assert 'https://sa/new' in db.stored
+
+
+def test_filter_negatives_skip_database_check():
+    parser = make_parser('https://sa/a', 'https://sa/b')
+    parser.known_urls = BloomFilter(capacity=100)
+    parser.known_urls.add('https://sa/a')
+    db = FakeDB(stored={'https://sa/a'})
+
+    assert parser._fetch_ticker('AAPL', db) == (1, 1)
+    assert db.checked[0] == ['https://sa/a']
+    assert 'https://sa/b' in parser.known_urls
+
+
+def test_failed_insert_is_not_added_to_filter():
+    parser = make_parser('https://sa/a')
+    parser.known_urls = BloomFilter(capacity=100)
+    db = FakeDB(fail_inserts=True)
+
+    parser._fetch_ticker('AAPL', db)
+
+    assert 'https://sa/a' not in parser.known_urls
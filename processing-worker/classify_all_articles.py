@@ -13,13 +13,19 @@ Usage:
 
     # Dry run (no database writes)
     POSTGRES_HOST=localhost python classify_all_articles.py --dry-run --limit 100
+
+Several copies can run at once (e.g. one per GPU): each claims its own
+rows with SELECT ... FOR UPDATE SKIP LOCKED. Claims left behind by a copy
+that was killed expire after 30 minutes and are picked up again.
 """
 
 import sys
 import argparse
 from pathlib import Path
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import time
+import uuid
 
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
@@ -33,18 +39,34 @@ from logger import setup_logger
 logger = setup_logger(__name__)
 
 
+def claimed_chunks(db, chunk_size, worker_id, limit=None):
+    """Yield chunks of articles claimed for this worker until none are left."""
+    claimed = 0
+    while limit is None or claimed < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - claimed)
+        chunk = db.claim_unclassified(size, worker_id)
+        if not chunk:
+            return
+        claimed += len(chunk)
+        yield chunk
+
+
 def main():
     parser = argparse.ArgumentParser(description='Classify all unclassified articles')
     parser.add_argument('--model-path', type=str, default=None,
                         help='Path to BERT model (default: src/models/bert_classifier/final)')
-    parser.add_argument('--batch-size', type=int, default=64,
-                        help='Batch size for inference (default: 64)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Batch size for inference (default: 256 on CUDA, else 64)')
     parser.add_argument('--checkpoint', type=int, default=500,
                         help='Save checkpoint every N articles (default: 500)')
     parser.add_argument('--limit', type=int, default=None,
                         help='Limit number of articles to process (default: all)')
     parser.add_argument('--dry-run', action='store_true',
                         help='Run without saving to database')
+    parser.add_argument('--quantize', action='store_true',
+                        help='INT8 dynamic quantization on CPU (faster; predictions may differ from FP32)')
+    parser.add_argument('--compile', action='store_true',
+                        help='Compile the model with torch.compile on CUDA (slower start, faster batches)')
 
     args = parser.parse_args()
 
@@ -57,12 +79,20 @@ def main():
     model_path = Path(args.model_path) if args.model_path else get_default_bert_model_path()
     print(f"Loading model from: {model_path}")
 
-    classifier = BertClassifier(model_path)
+    classifier = BertClassifier(
+        model_path,
+        quantize_cpu=args.quantize,
+        compile_model=args.compile
+    )
     model_version = classifier.get_model_version()
     print(f"Model loaded. Version: {model_version}")
-    print(f"Device: {classifier.device}")
+    print(f"Device: {classifier.device} ({classifier.dtype})")
     print()
 
+    # Half-precision GPU inference fits much larger batches
+    if args.batch_size is None:
+        args.batch_size = 256 if classifier.device.type == 'cuda' else 64
+
     # Connect to database
     db = ProcessingDatabaseManager()
 
@@ -80,29 +110,21 @@ def main():
         print("All articles already classified!")
         return
 
-    # Get unclassified articles
-    limit = args.limit or stats['unclassified_count'] + 1000  # Buffer for safety
-    print(f"Fetching up to {limit:,} unclassified articles...")
-
-    articles = db.get_unclassified_articles(limit=limit)
-    total_articles = len(articles)
-
-    if not articles:
-        print("No unclassified articles found!")
-        return
-
-    print(f"Found {total_articles:,} articles to classify")
-    print()
+    # Read unclassified articles one checkpoint at a time. Real runs claim
+    # their rows (SKIP LOCKED), so several copies of this script can run at
+    # once; dry runs only read.
+    expected = min(args.limit, stats['unclassified_count']) if args.limit else stats['unclassified_count']
+    worker_id = f"claimed_{uuid.uuid4().hex[:12]}"
 
     if args.dry_run:
         print("*** DRY RUN MODE - No database writes ***")
         print()
+        chunks = db.iter_unclassified_articles(args.checkpoint, limit=args.limit)
+    else:
+        print(f"Worker claim id: {worker_id}")
+        chunks = claimed_chunks(db, args.checkpoint, worker_id, limit=args.limit)
 
-    # Show source distribution
-    source_dist = Counter(a['source'] for a in articles)
-    print("Source distribution:")
-    for source, count in source_dist.most_common(10):
-        print(f"  {source}: {count:,}")
+    print(f"Classifying up to {expected:,} unclassified articles...")
     print()
 
     # Process in checkpoint batches
@@ -112,54 +134,74 @@ def main():
 
     start_time = time.time()
     total_processed = 0
-    all_labels = []
-
-    for checkpoint_start in range(0, total_articles, args.checkpoint):
-        checkpoint_end = min(checkpoint_start + args.checkpoint, total_articles)
-        checkpoint_articles = articles[checkpoint_start:checkpoint_end]
-
-        # Prepare texts (headline + summary, like training)
-        texts = []
-        for article in checkpoint_articles:
-            headline = article['title']
-            summary = article.get('summary') or ''
-            text = f"{headline} {summary}".strip()
-            texts.append(text)
-
-        # Run inference
-        labels, confidences = classifier.predict(
-            texts,
-            batch_size=args.batch_size,
-            show_progress=True
-        )
-
-        # Prepare database updates
-        updates = []
-        for article, label, confidence in zip(checkpoint_articles, labels, confidences):
-            updates.append({
-                'article_id': article['id'],
-                'classification_label': label,
-                'classification_confidence': round(confidence, 4),
-                'classification_source': 'student',
-                'classification_model_version': model_version
-            })
-            all_labels.append(label)
-
-        # Save to database (unless dry run)
+    label_dist = Counter()
+    source_dist = Counter()
+
+    # Checkpoint writes run on a background thread while the next checkpoint
+    # is classified; at most one write is in flight
+    writer = ThreadPoolExecutor(max_workers=1)
+    pending_write = None
+
+    try:
+        for checkpoint_articles in chunks:
+            source_dist.update(a['source'] for a in checkpoint_articles)
+
+            # Prepare texts (headline + summary, like training)
+            texts = []
+            for article in checkpoint_articles:
+                headline = article['title']
+                summary = article.get('summary') or ''
+                text = f"{headline} {summary}".strip()
+                texts.append(text)
+
+            # Run inference
+            labels, confidences = classifier.predict(
+                texts,
+                batch_size=args.batch_size,
+                show_progress=True
+            )
+
+            # Prepare database updates
+            updates = []
+            for article, label, confidence in zip(checkpoint_articles, labels, confidences):
+                updates.append({
+                    'article_id': article['id'],
+                    'classification_label': label,
+                    'classification_confidence': round(confidence, 4),
+                    'classification_source': 'student',
+                    'classification_model_version': model_version
+                })
+            label_dist.update(labels)
+
+            # Save to database (unless dry run)
+            if not args.dry_run:
+                if pending_write is not None:
+                    pending_write.result()  # Surface errors from the previous write
+                pending_write = writer.submit(db.batch_update_classification_status, updates)
+
+            total_processed += len(checkpoint_articles)
+            elapsed = time.time() - start_time
+            rate = total_processed / elapsed if elapsed > 0 else 0
+
+            # Show progress
+            print(f"\nCheckpoint: {total_processed:,}/{expected:,} ({total_processed/max(expected, 1)*100:.1f}%)")
+            print(f"  Rate: {rate:.1f} articles/sec")
+            print(f"  Distribution: FACTUAL={label_dist.get('FACTUAL', 0):,}, "
+                  f"OPINION={label_dist.get('OPINION', 0):,}, "
+                  f"SLOP={label_dist.get('SLOP', 0):,}")
+
+        # Wait for the last checkpoint write
+        if pending_write is not None:
+            pending_write.result()
+    finally:
+        writer.shutdown()
+        # Hand back anything claimed but not classified (e.g. on error)
         if not args.dry_run:
-            db.batch_update_classification_status(updates)
+            db.release_claims(worker_id)
 
-        total_processed += len(checkpoint_articles)
-        elapsed = time.time() - start_time
-        rate = total_processed / elapsed if elapsed > 0 else 0
-
-        # Show progress
-        label_dist = Counter(all_labels)
-        print(f"\nCheckpoint: {total_processed:,}/{total_articles:,} ({total_processed/total_articles*100:.1f}%)")
-        print(f"  Rate: {rate:.1f} articles/sec")
-        print(f"  Distribution: FACTUAL={label_dist.get('FACTUAL', 0):,}, "
-              f"OPINION={label_dist.get('OPINION', 0):,}, "
-              f"SLOP={label_dist.get('SLOP', 0):,}")
+    if total_processed == 0:
+        print("No unclassified articles found!")
+        return
 
     # Final summary
     elapsed = time.time() - start_time
@@ -173,7 +215,11 @@ def main():
     print(f"Average rate:    {total_processed/elapsed:.1f} articles/sec")
     print()
 
-    label_dist = Counter(all_labels)
+    print("Source distribution:")
+    for source, count in source_dist.most_common(10):
+        print(f"  {source}: {count:,}")
+    print()
+
     print("Final distribution:")
     for label in ['FACTUAL', 'OPINION', 'SLOP']:
         count = label_dist.get(label, 0)
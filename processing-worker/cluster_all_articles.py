@@ -6,7 +6,9 @@ Processes historical data in 36-hour windows.
 
 import sys
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
+
+import numpy as np
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
@@ -14,6 +16,133 @@ sys.path.insert(0, str(Path(__file__).parent / 'src'))
 from database import ProcessingDatabaseManager
 from mechanical_refinery.clustering import SentenceEmbeddingClusterer
 
+# Headlines collected from streamed windows before one encode call
+ENCODE_BATCH_ARTICLES = 4096
+
+
+def stream_windows(db, window_hours, step_hours, exclude_sec_edgar):
+    """
+    Yield (window_start, window_end, articles) for every window.
+
+    One query does it all: the date range, the windows (generate_series
+    from the oldest article, stepping step_hours, each window_hours long
+    and capped at the newest article) and their articles, streamed through
+    a named cursor in window order. Empty windows come back with no
+    articles (LEFT JOIN). Each window's articles are newest first.
+    """
+    source_filter = " AND source NOT LIKE 'SEC EDGAR%%'" if exclude_sec_edgar else ""
+    join_filter = " AND a.source NOT LIKE 'SEC EDGAR%%'" if exclude_sec_edgar else ""
+    query = f"""
+        WITH bounds AS (
+            SELECT MIN(published_at) AS oldest, MAX(published_at) AS newest
+            FROM articles_raw
+            WHERE published_at IS NOT NULL{source_filter}
+        ),
+        windows AS (
+            SELECT gs AS window_start,
+                   LEAST(gs + make_interval(hours => %s), newest) AS window_end
+            FROM bounds,
+                 generate_series(oldest, newest, make_interval(hours => %s)) AS gs
+            WHERE gs < newest
+        )
+        SELECT w.window_start, w.window_end,
+               a.id, a.title, a.summary, a.source, a.published_at
+        FROM windows w
+        LEFT JOIN articles_raw a
+          ON a.published_at >= w.window_start
+         AND a.published_at < w.window_end{join_filter}
+        ORDER BY w.window_start, a.published_at DESC
+    """
+
+    with db.get_connection() as conn:
+        with conn.cursor(name='cluster_stream') as cur:
+            cur.itersize = 5000
+            cur.execute(query, (window_hours, step_hours))
+
+            window = None
+            articles = []
+
+            for row in cur:
+                if (row[0], row[1]) != window:
+                    if window is not None:
+                        yield window[0], window[1], articles
+                    window = (row[0], row[1])
+                    articles = []
+
+                if row[2] is not None:
+                    articles.append({
+                        'id': row[2],
+                        'title': row[3],
+                        'summary': row[4] or '',
+                        'source': row[5],
+                        'published_at': row[6]
+                    })
+
+            if window is not None:
+                yield window[0], window[1], articles
+
+
+def cluster_windows(db, clusterer, windows, stats):
+    """
+    Encode the headlines of a group of windows in one call, then cluster
+    and save each window.
+
+    Args:
+        db: ProcessingDatabaseManager
+        clusterer: SentenceEmbeddingClusterer
+        windows: (window number, window_start, window_end, articles) tuples
+        stats: Running totals, updated in place
+    """
+    to_encode = [a for _, _, _, articles in windows if len(articles) >= 2 for a in articles]
+    embeddings = None
+    if to_encode:
+        print(f"Encoding {len(to_encode):,} headlines...")
+        encode_start = datetime.now()
+        # float16 halves the memory held per batch; the clusterer upcasts
+        # each window's slice to float32
+        embeddings = clusterer.encode(to_encode, batch_size=512).astype(np.float16)
+        encode_time = (datetime.now() - encode_start).total_seconds()
+        stats['time'] += encode_time
+        print(f"  Time: {encode_time:.2f}s")
+        print()
+
+    offset = 0
+    for number, window_start, window_end, articles in windows:
+        print(f"Window {number}: {window_start} to {window_end}")
+
+        if len(articles) < 2:
+            print(f"  Skipped (< 2 articles)")
+            print()
+            continue
+
+        print(f"  Articles: {len(articles)}")
+
+        window_embeddings = embeddings[offset:offset + len(articles)]
+        offset += len(articles)
+
+        # Run clustering
+        start_time = datetime.now()
+        result = clusterer.cluster_articles_with_embeddings(articles, window_embeddings)
+        processing_time = (datetime.now() - start_time).total_seconds()
+
+        result_stats = result.stats
+        print(f"  Clusters: {result_stats['clusters']}")
+        print(f"  Duplicates: {result_stats['duplicates']} ({result_stats['dedup_rate']*100:.1f}%)")
+        print(f"  Time: {processing_time:.2f}s")
+
+        # Save to database
+        db.save_cluster_results(
+            batch_id=result.batch_id,
+            assignments=result.cluster_assignments,
+            clustering_method='embeddings'
+        )
+
+        stats['processed'] += len(articles)
+        stats['clusters'] += result_stats['clusters']
+        stats['time'] += processing_time
+
+        print()
+
 
 def main():
     print("=" * 80)
@@ -41,123 +170,47 @@ def main():
         similarity_threshold=similarity_threshold
     )
 
-    # Get date range of all articles
-    print("Finding date range...")
-    with db.get_connection() as conn:
-        with conn.cursor() as cur:
-            query = """
-                SELECT
-                    MIN(published_at) as oldest,
-                    MAX(published_at) as newest,
-                    COUNT(*) as total
-                FROM articles_raw
-                WHERE published_at IS NOT NULL
-            """
-            if exclude_sec_edgar:
-                query += " AND source NOT LIKE 'SEC EDGAR%%'"
-
-            cur.execute(query)
-            row = cur.fetchone()
-            oldest_date = row[0]
-            newest_date = row[1]
-            total_articles = row[2]
-
-    print(f"Date range: {oldest_date} to {newest_date}")
-    print(f"Total articles: {total_articles:,}")
-    print()
-
-    # Generate windows
-    windows = []
-    current_start = oldest_date
-
-    while current_start < newest_date:
-        window_end = current_start + timedelta(hours=window_hours)
-        if window_end > newest_date:
-            window_end = newest_date
-
-        windows.append((current_start, window_end))
-        current_start += timedelta(hours=step_hours)
-
-    print(f"Generated {len(windows)} windows")
+    # Windows stream in from a single query; their headlines are encoded in
+    # large batches (ENCODE_BATCH_ARTICLES at a time) rather than one small
+    # encode per window, and each window is clustered once its batch is done
+    print("Streaming windows...")
     print()
     print("-" * 80)
     print()
 
-    # Process each window
-    total_processed = 0
-    total_clusters = 0
-    total_time = 0
-
-    for i, (window_start, window_end) in enumerate(windows, 1):
-        print(f"Window {i}/{len(windows)}: {window_start} to {window_end}")
-
-        # Get articles in this window
-        with db.get_connection() as conn:
-            with conn.cursor() as cur:
-                query = """
-                    SELECT id, title, summary, source, published_at
-                    FROM articles_raw
-                    WHERE published_at >= %s
-                      AND published_at < %s
-                """
-                params = [window_start, window_end]
+    stats = {'windows': 0, 'articles': 0, 'processed': 0, 'clusters': 0, 'time': 0.0}
+    first_start = last_end = None
+    pending = []
+    pending_articles = 0
 
-                if exclude_sec_edgar:
-                    query += " AND source NOT LIKE 'SEC EDGAR%%'"
+    for window_start, window_end, articles in stream_windows(db, window_hours, step_hours, exclude_sec_edgar):
+        stats['windows'] += 1
+        stats['articles'] += len(articles)
+        first_start = first_start or window_start
+        last_end = window_end
 
-                query += " ORDER BY published_at DESC"
-
-                cur.execute(query, params)
-
-                articles = []
-                for row in cur.fetchall():
-                    articles.append({
-                        'id': row[0],
-                        'title': row[1],
-                        'summary': row[2] or '',
-                        'source': row[3],
-                        'published_at': row[4]
-                    })
-
-        if len(articles) < 2:
-            print(f"  Skipped (< 2 articles)")
-            print()
-            continue
+        pending.append((stats['windows'], window_start, window_end, articles))
+        if len(articles) >= 2:
+            pending_articles += len(articles)
+        if pending_articles >= ENCODE_BATCH_ARTICLES:
+            cluster_windows(db, clusterer, pending, stats)
+            pending = []
+            pending_articles = 0
 
-        print(f"  Articles: {len(articles)}")
-
-        # Run clustering
-        start_time = datetime.now()
-        result = clusterer.cluster_articles(articles)
-        processing_time = (datetime.now() - start_time).total_seconds()
-
-        stats = result.stats
-        print(f"  Clusters: {stats['clusters']}")
-        print(f"  Duplicates: {stats['duplicates']} ({stats['dedup_rate']*100:.1f}%)")
-        print(f"  Time: {processing_time:.2f}s")
-
-        # Save to database
-        db.save_cluster_results(
-            batch_id=result.batch_id,
-            assignments=result.cluster_assignments,
-            clustering_method='embeddings'
-        )
-
-        total_processed += len(articles)
-        total_clusters += stats['clusters']
-        total_time += processing_time
-
-        print()
+    cluster_windows(db, clusterer, pending, stats)
 
     # Final summary
     print("=" * 80)
     print("COMPLETE - ALL ARTICLES CLUSTERED")
     print("=" * 80)
     print()
-    print(f"Total windows processed: {len(windows)}")
-    print(f"Total articles processed: {total_processed:,}")
-    print(f"Total clusters found: {total_clusters:,}")
-    print(f"Total processing time: {total_time:.1f}s ({total_time/60:.1f} minutes)")
+    if first_start is not None:
+        print(f"Date range: {first_start} to {last_end}")
+    print(f"Total windows processed: {stats['windows']}")
+    print(f"Total articles in windows: {stats['articles']:,}")
+    print(f"Total articles processed: {stats['processed']:,}")
+    print(f"Total clusters found: {stats['clusters']:,}")
+    print(f"Total processing time: {stats['time']:.1f}s ({stats['time']/60:.1f} minutes)")
     print()
     print("View all clusters at http://localhost:5000/")
     print()
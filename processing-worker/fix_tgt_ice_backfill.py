@@ -10,6 +10,8 @@ Usage:
 """
 
 import os
+import io
+import csv
 import sys
 import argparse
 from pathlib import Path
@@ -24,7 +26,66 @@ sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from database import ProcessingDatabaseManager
 from mechanical_refinery.entity_mapper import CompanyEntityMapper
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+
+# Row count from which COPY beats a multi-row INSERT
+COPY_THRESHOLD = 1024
+
+MENTION_COLUMNS = ('article_id', 'company_id', 'ticker', 'mention_type',
+                   'match_method', 'matched_text', 'confidence')
+
+UPSERT_MENTIONS_SET = """
+    ON CONFLICT (article_id, company_id) DO UPDATE
+    SET confidence = GREATEST(
+            article_company_mentions.confidence,
+            EXCLUDED.confidence
+        ),
+        mention_type = EXCLUDED.mention_type,
+        match_method = EXCLUDED.match_method,
+        matched_text = EXCLUDED.matched_text
+"""
+
+
+def insert_mentions(cur, mentions_by_article):
+    """
+    Upsert entity mentions on an open cursor (same conflict rule as
+    ProcessingDatabaseManager.save_entity_mentions).
+
+    Large sets are streamed with COPY into a staging table and upserted
+    from there; small ones use a single multi-row INSERT.
+
+    Returns:
+        Number of mention rows written
+    """
+    rows = [
+        (m.article_id, m.company_id, m.ticker, m.mention_type,
+         m.match_method, m.matched_text, m.confidence)
+        for mentions in mentions_by_article.values()
+        for m in mentions
+    ]
+    columns = ', '.join(MENTION_COLUMNS)
+
+    if len(rows) < COPY_THRESHOLD:
+        execute_values(cur, f"""
+            INSERT INTO article_company_mentions ({columns})
+            VALUES %s
+        """ + UPSERT_MENTIONS_SET, rows, page_size=1000)
+        return len(rows)
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    cur.execute("""
+        CREATE TEMP TABLE mentions_staging
+            (LIKE article_company_mentions INCLUDING DEFAULTS) ON COMMIT DROP
+    """)
+    cur.copy_expert(f"COPY mentions_staging ({columns}) FROM STDIN WITH CSV", buffer)
+    cur.execute(f"""
+        INSERT INTO article_company_mentions ({columns})
+        SELECT {columns} FROM mentions_staging
+    """ + UPSERT_MENTIONS_SET)
+    return len(rows)
 
 
 def main():
@@ -116,6 +177,16 @@ def main():
     print(f"    No longer matches: {no_longer_matches} (false positives removed)")
 
     if not args.dry_run:
+        # Only the legitimate ones are re-inserted
+        mentions_to_save = {}
+        for article in articles:
+            mentions = mapper.map_article(article)
+            tgt_mentions = [m for m in mentions if m.ticker == 'TGT']
+            if tgt_mentions:
+                mentions_to_save[article['id']] = tgt_mentions
+
+        # Delete and re-insert in one transaction, so a failure leaves the
+        # old rows in place
         with db.get_connection() as conn:
             with conn.cursor() as cur:
                 # Delete ALL old "Target" name matches
@@ -126,19 +197,9 @@ def main():
                 deleted = cur.rowcount
                 print(f"  Deleted {deleted} old 'Target' name-match rows")
 
-        # Re-insert only the legitimate ones
-        reinserted = 0
-        mentions_to_save = {}
-        for article in articles:
-            mentions = mapper.map_article(article)
-            tgt_mentions = [m for m in mentions if m.ticker == 'TGT']
-            if tgt_mentions:
-                mentions_to_save[article['id']] = tgt_mentions
-                reinserted += 1
-
-        if mentions_to_save:
-            db.save_entity_mentions(mentions_to_save)
-        print(f"  Re-inserted {reinserted} legitimate TGT mentions")
+                if mentions_to_save:
+                    insert_mentions(cur, mentions_to_save)
+        print(f"  Re-inserted {len(mentions_to_save)} legitimate TGT mentions")
     else:
         print(f"  [DRY RUN] Would delete old TGT name matches and re-insert {still_matches_tgt} legitimate ones")
 
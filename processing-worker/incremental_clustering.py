@@ -5,6 +5,8 @@ Incremental clustering for newly classified FACTUAL articles.
 This script matches new articles to existing cluster centroids within
 their 36-hour publication window. Articles that don't match existing
 clusters are either grouped into new clusters or marked as noise.
+Centroid headline embeddings are cached in article_embeddings
+(database/schema/07_article_embeddings.sql) so they are encoded only once.
 
 Usage:
     POSTGRES_HOST=localhost python incremental_clustering.py
@@ -16,8 +18,11 @@ import argparse
 from pathlib import Path
 from datetime import datetime, timedelta
 from collections import defaultdict
+from bisect import bisect_right
 import uuid
 import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
 
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
@@ -31,6 +36,11 @@ logger = setup_logger(__name__)
 WINDOW_HOURS = 48
 # Similarity threshold for matching to existing centroids
 SIMILARITY_THRESHOLD = 0.5
+# Articles scored against the centroids per matrix product (bounds memory
+# to MATCH_BLOCK_SIZE x centroids similarities)
+MATCH_BLOCK_SIZE = 1024
+# Sentence transformer for headlines (also the article_embeddings cache key)
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
 
 
 def get_window_bounds(published_at: datetime) -> tuple:
@@ -66,7 +76,7 @@ def run_incremental_clustering(lookback_hours: int = 6, dry_run: bool = False):
 
     db = ProcessingDatabaseManager()
     clusterer = SentenceEmbeddingClusterer(
-        model_name='all-MiniLM-L6-v2',
+        model_name=EMBEDDING_MODEL,
         similarity_threshold=SIMILARITY_THRESHOLD
     )
 
@@ -119,43 +129,80 @@ def run_incremental_clustering(lookback_hours: int = 6, dry_run: bool = False):
     print(f"Grouped into {len(window_groups)} time windows")
     print()
 
+    # Get existing centroids for all windows in one query, with their cached
+    # embeddings, then hand each centroid to every window whose range
+    # contains it
+    window_starts = sorted(window_groups)
+    window = timedelta(hours=WINDOW_HOURS)
+    window_centroids = {window_start: [] for window_start in window_starts}
+    embedding_of = {}
+
+    with db.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT
+                    a.id, a.title, a.summary,
+                    a.cluster_batch_id, a.cluster_label, a.published_at,
+                    e.embedding
+                FROM articles_raw a
+                LEFT JOIN article_embeddings e
+                  ON e.article_id = a.id AND e.model_name = %s
+                WHERE a.is_cluster_centroid = TRUE
+                  AND a.published_at >= %s
+                  AND a.published_at < %s
+                  AND a.cluster_label != -1
+            """, (EMBEDDING_MODEL, window_starts[0], window_starts[-1] + window))
+
+            for row in cur.fetchall():
+                centroid = {
+                    'id': row[0],
+                    'title': row[1],
+                    'summary': row[2] or '',
+                    'batch_id': row[3],
+                    'cluster_label': row[4]
+                }
+                # Windows with start <= published_at < start + WINDOW_HOURS
+                first = bisect_right(window_starts, row[5] - window)
+                last = bisect_right(window_starts, row[5])
+                for window_start in window_starts[first:last]:
+                    window_centroids[window_start].append(centroid)
+
+                if row[6] is not None:
+                    embedding_of[row[0]] = np.frombuffer(row[6], dtype=np.float16)
+
+    # Encode every new article and every centroid without a cached embedding
+    # (once, even if it falls in several windows) in one large-batch pass
+    unique_centroids = {c['id']: c for centroids in window_centroids.values() for c in centroids}
+    uncached_centroids = [c for c in unique_centroids.values() if c['id'] not in embedding_of]
+    to_encode = new_articles + uncached_centroids
+    print(f"Encoding {len(to_encode)} headlines "
+          f"({len(uncached_centroids)} of {len(unique_centroids)} centroids not cached)...")
+    # Kept as float16 (half the memory); upcast to float32 per window for
+    # the similarity products
+    embedding_rows = normalize_rows(clusterer.encode(to_encode, batch_size=256)).astype(np.float16)
+    embedding_of.update((item['id'], row) for item, row in zip(to_encode, embedding_rows))
+    print()
+
+    if uncached_centroids and not dry_run:
+        save_embeddings(db, {c['id']: embedding_of[c['id']] for c in uncached_centroids})
+
+    def embeddings_for(items):
+        return np.stack([embedding_of[item['id']] for item in items]).astype(np.float32)
+
     total_matched = 0
     total_new_clusters = 0
     total_noise = 0
 
     for window_start, window_articles in sorted(window_groups.items()):
-        window_end = window_start + timedelta(hours=WINDOW_HOURS)
-
         print(f"Processing window: {window_start.date()} ({len(window_articles)} articles)")
 
-        # Get existing centroids in this window
-        with db.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        id, title, summary,
-                        cluster_batch_id, cluster_label
-                    FROM articles_raw
-                    WHERE is_cluster_centroid = TRUE
-                      AND published_at >= %s
-                      AND published_at < %s
-                      AND cluster_label != -1
-                """, (window_start, window_end))
-
-                existing_centroids = []
-                for row in cur.fetchall():
-                    existing_centroids.append({
-                        'id': row[0],
-                        'title': row[1],
-                        'summary': row[2] or '',
-                        'batch_id': row[3],
-                        'cluster_label': row[4]
-                    })
+        existing_centroids = window_centroids[window_start]
 
         if existing_centroids:
             # Match new articles to existing centroids
             matched, unmatched = match_to_centroids(
-                window_articles, existing_centroids, clusterer
+                window_articles, existing_centroids,
+                embeddings_for(window_articles), embeddings_for(existing_centroids)
             )
 
             if matched and not dry_run:
@@ -165,7 +212,7 @@ def run_incremental_clustering(lookback_hours: int = 6, dry_run: bool = False):
 
             # Cluster unmatched articles among themselves
             if len(unmatched) >= 2:
-                result = clusterer.cluster_articles(unmatched)
+                result = clusterer.cluster_articles_with_embeddings(unmatched, embeddings_for(unmatched))
                 if result.cluster_assignments and not dry_run:
                     db.save_cluster_results(
                         batch_id=result.batch_id,
@@ -173,6 +220,10 @@ def run_incremental_clustering(lookback_hours: int = 6, dry_run: bool = False):
                         clustering_method='embeddings'
                     )
                     save_cluster_updates(db, result)
+                    save_embeddings(db, {
+                        assign['article_id']: embedding_of[assign['article_id']]
+                        for assign in result.cluster_assignments if assign['is_centroid']
+                    })
 
                 total_new_clusters += result.stats['clusters']
                 total_noise += result.stats['noise_points']
@@ -184,7 +235,9 @@ def run_incremental_clustering(lookback_hours: int = 6, dry_run: bool = False):
         else:
             # No existing centroids - cluster all new articles
             if len(window_articles) >= 2:
-                result = clusterer.cluster_articles(window_articles)
+                result = clusterer.cluster_articles_with_embeddings(
+                    window_articles, embeddings_for(window_articles)
+                )
                 if result.cluster_assignments and not dry_run:
                     db.save_cluster_results(
                         batch_id=result.batch_id,
@@ -192,6 +245,10 @@ def run_incremental_clustering(lookback_hours: int = 6, dry_run: bool = False):
                         clustering_method='embeddings'
                     )
                     save_cluster_updates(db, result)
+                    save_embeddings(db, {
+                        assign['article_id']: embedding_of[assign['article_id']]
+                        for assign in result.cluster_assignments if assign['is_centroid']
+                    })
 
                 total_new_clusters += result.stats['clusters']
                 total_noise += result.stats['noise_points']
@@ -218,95 +275,109 @@ def run_incremental_clustering(lookback_hours: int = 6, dry_run: bool = False):
     print()
 
 
-def match_to_centroids(articles, centroids, clusterer):
+def normalize_rows(embeddings):
+    """Scale embeddings to unit length, so cosine similarity is a dot product."""
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return (embeddings / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def match_to_centroids(articles, centroids, article_embeddings, centroid_embeddings):
     """
     Match articles to existing cluster centroids.
 
+    Args:
+        articles: New articles in the window
+        centroids: Existing centroids in the window
+        article_embeddings: Unit-length embeddings, row-aligned with articles
+        centroid_embeddings: Unit-length embeddings, row-aligned with centroids
+
     Returns:
         tuple: (matched_articles, unmatched_articles)
     """
     if not centroids:
         return [], articles
 
-    # Generate embeddings for new articles and centroids
-    article_texts = [a['title'] for a in articles]
-    centroid_texts = [c['title'] for c in centroids]
-
-    # Load model if not already loaded
-    if clusterer.model is None:
-        clusterer._load_model()
-
-    article_embeddings = clusterer.model.encode(article_texts, show_progress_bar=False)
-    centroid_embeddings = clusterer.model.encode(centroid_texts, show_progress_bar=False)
-
-    # Calculate similarities
-    from sklearn.metrics.pairwise import cosine_similarity
-    similarities = cosine_similarity(article_embeddings, centroid_embeddings)
-
-    matched = []
-    unmatched = []
-
-    for i, article in enumerate(articles):
-        max_sim_idx = np.argmax(similarities[i])
-        max_sim = similarities[i][max_sim_idx]
-
-        if max_sim >= SIMILARITY_THRESHOLD:
-            matched_centroid = centroids[max_sim_idx]
-            matched.append({
-                'article': article,
-                'batch_id': matched_centroid['batch_id'],
-                'cluster_label': matched_centroid['cluster_label'],
-                'similarity': float(max_sim),
-                'centroid_id': matched_centroid['id']
-            })
-        else:
-            unmatched.append(article)
+    # Best centroid per article by cosine similarity (matrix products on unit
+    # vectors), one block of articles at a time so the full articles x
+    # centroids matrix is never held
+    best_idx = np.empty(len(articles), dtype=np.intp)
+    best_sim = np.empty(len(articles), dtype=np.float32)
+    for start in range(0, len(articles), MATCH_BLOCK_SIZE):
+        similarities = article_embeddings[start:start + MATCH_BLOCK_SIZE] @ centroid_embeddings.T
+        block_idx = similarities.argmax(axis=1)
+        best_idx[start:start + len(block_idx)] = block_idx
+        best_sim[start:start + len(block_idx)] = similarities[np.arange(len(block_idx)), block_idx]
+    is_match = best_sim >= SIMILARITY_THRESHOLD
+
+    matched = [
+        {
+            'article': articles[i],
+            'batch_id': centroids[best_idx[i]]['batch_id'],
+            'cluster_label': centroids[best_idx[i]]['cluster_label'],
+            'similarity': float(best_sim[i]),
+            'centroid_id': centroids[best_idx[i]]['id']
+        }
+        for i in np.flatnonzero(is_match)
+    ]
+    unmatched = [articles[i] for i in np.flatnonzero(~is_match)]
 
     return matched, unmatched
 
 
 def save_matched_articles(db, matched):
-    """Save articles that matched existing clusters."""
+    """Save articles that matched existing clusters (one statement per table)."""
+    rows = [
+        (str(match['batch_id']), match['cluster_label'], 1.0 - match['similarity'], match['article']['id'])
+        for match in matched
+    ]
+
     with db.get_connection() as conn:
         with conn.cursor() as cur:
-            for match in matched:
-                article = match['article']
-                distance = 1.0 - match['similarity']
-
-                # Update articles_raw
-                cur.execute("""
-                    UPDATE articles_raw
-                    SET cluster_batch_id = %s,
-                        cluster_label = %s,
-                        is_cluster_centroid = FALSE,
-                        distance_to_centroid = %s
-                    WHERE id = %s
-                """, (
-                    str(match['batch_id']),
-                    match['cluster_label'],
-                    distance,
-                    article['id']
-                ))
-
-                # Insert into article_clusters
-                cur.execute("""
-                    INSERT INTO article_clusters
-                    (cluster_batch_id, article_id, cluster_label, is_centroid,
-                     distance_to_centroid, clustering_method)
-                    VALUES (%s, %s, %s, FALSE, %s, 'embeddings')
-                    ON CONFLICT (cluster_batch_id, article_id) DO UPDATE
-                    SET cluster_label = EXCLUDED.cluster_label,
-                        distance_to_centroid = EXCLUDED.distance_to_centroid
-                """, (
-                    match['batch_id'],
-                    article['id'],
-                    match['cluster_label'],
-                    distance
-                ))
+            # Update articles_raw
+            execute_values(cur, """
+                UPDATE articles_raw AS a
+                SET cluster_batch_id = v.batch_id,
+                    cluster_label = v.label,
+                    is_cluster_centroid = FALSE,
+                    distance_to_centroid = v.distance
+                FROM (VALUES %s) AS v(batch_id, label, distance, article_id)
+                WHERE a.id = v.article_id
+            """, rows, template="(%s::uuid, %s::integer, %s::double precision, %s::integer)",
+                page_size=1000)
+
+            # Insert into article_clusters
+            execute_values(cur, """
+                INSERT INTO article_clusters
+                (cluster_batch_id, article_id, cluster_label, is_centroid,
+                 distance_to_centroid, clustering_method)
+                VALUES %s
+                ON CONFLICT (cluster_batch_id, article_id) DO UPDATE
+                SET cluster_label = EXCLUDED.cluster_label,
+                    distance_to_centroid = EXCLUDED.distance_to_centroid
+            """, [(batch_id, article_id, label, distance) for batch_id, label, distance, article_id in rows],
+                template="(%s::uuid, %s, %s, FALSE, %s, 'embeddings')", page_size=1000)
 
             conn.commit()
 
 
+def save_embeddings(db, embeddings_by_id):
+    """Cache float16 headline embeddings (article_id -> vector) for later runs."""
+    if not embeddings_by_id:
+        return
+
+    with db.get_connection() as conn:
+        with conn.cursor() as cur:
+            execute_values(cur, """
+                INSERT INTO article_embeddings (article_id, model_name, embedding)
+                VALUES %s
+                ON CONFLICT (article_id, model_name) DO UPDATE
+                SET embedding = EXCLUDED.embedding
+            """, [
+                (article_id, EMBEDDING_MODEL, psycopg2.Binary(embedding.astype(np.float16).tobytes()))
+                for article_id, embedding in embeddings_by_id.items()
+            ], page_size=1000)
+
+
 def save_cluster_updates(db, result):
     """Save cluster updates from a ClusteringResult."""
     cluster_updates = [
@@ -324,26 +395,27 @@ def save_cluster_updates(db, result):
 
 def mark_as_noise(db, articles, batch_id):
     """Mark articles as noise (no cluster match)."""
+    article_ids = [article['id'] for article in articles]
 
     with db.get_connection() as conn:
         with conn.cursor() as cur:
-            for article in articles:
-                cur.execute("""
-                    UPDATE articles_raw
-                    SET cluster_batch_id = %s,
-                        cluster_label = -1,
-                        is_cluster_centroid = FALSE,
-                        distance_to_centroid = NULL
-                    WHERE id = %s
-                """, (batch_id, article['id']))
-
-                cur.execute("""
-                    INSERT INTO article_clusters
-                    (cluster_batch_id, article_id, cluster_label, is_centroid,
-                     distance_to_centroid, clustering_method)
-                    VALUES (%s, %s, -1, FALSE, NULL, 'embeddings')
-                    ON CONFLICT (cluster_batch_id, article_id) DO NOTHING
-                """, (batch_id, article['id']))
+            cur.execute("""
+                UPDATE articles_raw
+                SET cluster_batch_id = %s,
+                    cluster_label = -1,
+                    is_cluster_centroid = FALSE,
+                    distance_to_centroid = NULL
+                WHERE id = ANY(%s)
+            """, (batch_id, article_ids))
+
+            execute_values(cur, """
+                INSERT INTO article_clusters
+                (cluster_batch_id, article_id, cluster_label, is_centroid,
+                 distance_to_centroid, clustering_method)
+                VALUES %s
+                ON CONFLICT (cluster_batch_id, article_id) DO NOTHING
+            """, [(batch_id, article_id) for article_id in article_ids],
+                template="(%s::uuid, %s, -1, FALSE, NULL, 'embeddings')", page_size=1000)
 
             conn.commit()
 
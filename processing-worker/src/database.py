@@ -1,9 +1,9 @@
 """Database operations for Archive-First processing."""
 
 import psycopg2
-from psycopg2.extras import RealDictCursor, execute_batch
+from psycopg2.extras import RealDictCursor, execute_batch, execute_values
 from contextlib import contextmanager
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 from datetime import datetime, timedelta
 import uuid
 
@@ -214,18 +214,19 @@ class ProcessingDatabaseManager:
             for assign in assignments
         ]
 
+        # Multi-row INSERTs (1000 rows per statement) in one transaction
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                execute_batch(cur, """
+                execute_values(cur, """
                     INSERT INTO article_clusters
                         (cluster_batch_id, article_id, cluster_label, is_centroid, distance_to_centroid, clustering_method)
-                    VALUES (%s, %s, %s, %s, %s, %s)
+                    VALUES %s
                     ON CONFLICT (cluster_batch_id, article_id) DO UPDATE
                     SET cluster_label = EXCLUDED.cluster_label,
                         is_centroid = EXCLUDED.is_centroid,
                         distance_to_centroid = EXCLUDED.distance_to_centroid,
                         clustering_method = EXCLUDED.clustering_method
-                """, records)
+                """, records, page_size=1000)
 
         logger.info(f"Saved {len(assignments)} cluster assignments to audit table (method: {clustering_method})")
 
@@ -418,6 +419,116 @@ class ProcessingDatabaseManager:
 
                 return [dict(row) for row in cur.fetchall()]
 
+    def iter_unclassified_articles(
+        self,
+        chunk_size: int = 500,
+        limit: Optional[int] = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Stream unclassified articles in chunks through a server-side cursor.
+
+        Same rows and order as get_unclassified_articles(), but only one
+        chunk is held in memory at a time and the first chunk is available
+        before the whole result set has been read.
+
+        Args:
+            chunk_size: Articles per yielded chunk
+            limit: Maximum number of articles (default: all)
+
+        Yields:
+            Lists of article dicts
+        """
+        query = """
+            SELECT id, title, summary, source, published_at
+            FROM articles_raw
+            WHERE classification_label IS NULL
+              AND source NOT LIKE 'SEC EDGAR%%'
+            ORDER BY fetched_at DESC
+        """
+        params = []
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+
+        with self.get_connection() as conn:
+            with conn.cursor(name='unclassified_stream', cursor_factory=RealDictCursor) as cur:
+                cur.itersize = chunk_size
+                cur.execute(query, params)
+
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [dict(row) for row in rows]
+
+    def claim_unclassified(self, limit: int, worker_id: str,
+                           claim_timeout_minutes: int = 30) -> List[Dict]:
+        """
+        Atomically claim up to `limit` unclassified articles for one worker.
+
+        Claimed rows get classification_source = worker_id and classified_at
+        = claim time until they are classified; FOR UPDATE SKIP LOCKED lets
+        concurrent workers claim disjoint rows without waiting on each other.
+        Claims older than claim_timeout_minutes (e.g. left by a worker that
+        was killed before release_claims) can be claimed again.
+
+        Args:
+            limit: Maximum number of articles to claim
+            worker_id: Claim marker (fits classification_source, 20 chars)
+            claim_timeout_minutes: Age after which another worker's claim expires
+
+        Returns:
+            List of claimed article dicts (empty when nothing is left)
+        """
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    UPDATE articles_raw
+                    SET classification_source = %s,
+                        classified_at = NOW()
+                    WHERE id IN (
+                        SELECT id
+                        FROM articles_raw
+                        WHERE classification_label IS NULL
+                          AND source NOT LIKE 'SEC EDGAR%%'
+                          AND (classification_source IS NULL
+                               OR classification_source NOT LIKE 'claimed%%'
+                               OR classified_at IS NULL
+                               OR classified_at < NOW() - make_interval(mins => %s))
+                        ORDER BY fetched_at DESC
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, title, summary, source, published_at
+                """, (worker_id, claim_timeout_minutes, limit))
+
+                return [dict(row) for row in cur.fetchall()]
+
+    def release_claims(self, worker_id: str) -> int:
+        """
+        Release a worker's claimed articles that were not classified.
+
+        Args:
+            worker_id: Claim marker passed to claim_unclassified()
+
+        Returns:
+            Number of articles released
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE articles_raw
+                    SET classification_source = NULL,
+                        classified_at = NULL
+                    WHERE classification_source = %s
+                      AND classification_label IS NULL
+                """, (worker_id,))
+                released = cur.rowcount
+
+        if released:
+            logger.info(f"Released {released} claimed articles ({worker_id})")
+        return released
+
     def save_teacher_labels(self, labels: List[Dict]):
         """
         Save teacher labels for retraining.
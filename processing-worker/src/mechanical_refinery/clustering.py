@@ -4,17 +4,23 @@ import numpy as np
 from abc import ABC, abstractmethod
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import DBSCAN
-from sklearn.metrics.pairwise import cosine_distances, cosine_similarity
+from sklearn.metrics.pairwise import cosine_distances
 from typing import List, Dict, Set
 from dataclasses import dataclass
 import uuid
 import re
+import unicodedata
 
 from src.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+def _normalize_headline(title: str) -> str:
+    """Normalize a headline for exact-duplicate detection (NFKC, casefold, whitespace)."""
+    return ' '.join(unicodedata.normalize('NFKC', title).casefold().split())
+
+
 @dataclass
 class ClusteringResult:
     """Results from clustering operation."""
@@ -189,6 +195,9 @@ class SentenceEmbeddingClusterer(BaseClusterer):
 
     method_name = "embeddings"
 
+    # Rows per similarity block in _neighbor_lists()
+    NEIGHBOR_BLOCK_SIZE = 1024
+
     def __init__(
         self,
         model_name: str = 'all-MiniLM-L6-v2',
@@ -240,28 +249,87 @@ class SentenceEmbeddingClusterer(BaseClusterer):
                 stats={'total': 0, 'clusters': 0, 'centroids': 0, 'duplicates': 0}
             )
 
-        batch_id = uuid.uuid4()
-        article_ids = [a['id'] for a in articles]
-        headlines = [a['title'] for a in articles]
+        return self.cluster_articles_with_embeddings(articles, self.encode(articles))
 
-        # Encode headlines
-        logger.info(f"[EMBEDDINGS] Encoding {len(headlines)} headlines...")
+    def encode(self, articles: List[Dict], batch_size: int = 32) -> np.ndarray:
+        """
+        Encode article headlines to embeddings.
+
+        Callers clustering many windows can encode every article in one
+        call (with a larger batch_size) and pass slices of the result to
+        cluster_articles_with_embeddings().
+
+        Args:
+            articles: List of article dicts with a 'title' key
+            batch_size: Encoder batch size
+
+        Returns:
+            Array of shape (len(articles), embedding_dim)
+        """
+        # Syndicated stories repeat the same headline; encode each distinct
+        # (normalized) headline once and share its embedding
+        first_index: Dict[str, int] = {}
+        unique_headlines = []
+        row_of = np.empty(len(articles), dtype=np.intp)
+
+        for i, article in enumerate(articles):
+            key = _normalize_headline(article['title'])
+            row = first_index.get(key)
+            if row is None:
+                row = first_index[key] = len(unique_headlines)
+                unique_headlines.append(article['title'])
+            row_of[i] = row
+
+        logger.info(
+            f"[EMBEDDINGS] Encoding {len(unique_headlines)} distinct headlines "
+            f"({len(articles)} articles)..."
+        )
         embeddings = self.model.encode(
-            headlines,
+            unique_headlines,
+            batch_size=batch_size,
             show_progress_bar=True,
             convert_to_numpy=True
         )
+        return embeddings[row_of]
+
+    def cluster_articles_with_embeddings(
+        self,
+        articles: List[Dict],
+        embeddings: np.ndarray
+    ) -> ClusteringResult:
+        """
+        Cluster articles whose headline embeddings are already computed.
+
+        Args:
+            articles: List of article dicts with 'id' and 'title' keys
+            embeddings: Output of encode() for these articles, row-aligned
+
+        Returns:
+            ClusteringResult with assignments for every article
+        """
+        if not articles:
+            return ClusteringResult(
+                batch_id=uuid.uuid4(),
+                cluster_assignments=[],
+                stats={'total': 0, 'clusters': 0, 'centroids': 0, 'duplicates': 0}
+            )
 
-        # Compute similarity matrix
-        logger.info("[EMBEDDINGS] Computing cosine similarity matrix...")
-        similarity_matrix = cosine_similarity(embeddings)
+        batch_id = uuid.uuid4()
+        article_ids = [a['id'] for a in articles]
 
-        # Convert to distance (1 - similarity)
-        distance_matrix = 1 - similarity_matrix
+        # Unit-normalize so cosine similarity is a plain dot product
+        # (in float32, also for embeddings stored as float16)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        normalized = embeddings / np.maximum(norms, 1e-12)
+
+        # Thresholded neighbor lists (never the full N x N matrix)
+        logger.info("[EMBEDDINGS] Finding neighbors above similarity threshold...")
+        neighbors = self._neighbor_lists(normalized)
 
         # Greedy clustering
         logger.info(f"[EMBEDDINGS] Clustering (threshold={self.similarity_threshold})...")
-        cluster_labels = self._greedy_cluster(similarity_matrix)
+        cluster_labels = self._greedy_cluster(neighbors)
 
         # Build cluster assignments
         cluster_assignments = []
@@ -289,18 +357,17 @@ class SentenceEmbeddingClusterer(BaseClusterer):
                     })
                     centroid_count += 1
             else:
-                # Find centroid (highest avg similarity)
-                if len(indices) == 1:
-                    centroid_idx = indices[0]
-                else:
-                    cluster_similarities = similarity_matrix[np.ix_(indices, indices)]
-                    avg_similarities = cluster_similarities.mean(axis=1)
-                    centroid_idx = indices[np.argmax(avg_similarities)]
+                # Find centroid (highest avg similarity); only this
+                # cluster's similarities are computed
+                cluster_vectors = normalized[indices]
+                cluster_similarities = cluster_vectors @ cluster_vectors.T
+                centroid_pos = int(np.argmax(cluster_similarities.mean(axis=1)))
+                centroid_idx = indices[centroid_pos]
 
                 # Mark all articles
-                for idx in indices:
+                for pos, idx in enumerate(indices):
                     is_centroid = (idx == centroid_idx)
-                    dist = distance_matrix[idx, centroid_idx]
+                    dist = 1 - cluster_similarities[pos, centroid_pos]
 
                     cluster_assignments.append({
                         'article_id': int(article_ids[idx]),
@@ -338,7 +405,31 @@ class SentenceEmbeddingClusterer(BaseClusterer):
             stats=stats
         )
 
-    def _greedy_cluster(self, similarity_matrix: np.ndarray) -> np.ndarray:
+    def _neighbor_lists(self, normalized: np.ndarray) -> List[np.ndarray]:
+        """
+        Find, for every article, all articles at or above the threshold.
+
+        Exact (not approximate): similarities are computed as blocked
+        matrix products so peak memory is NEIGHBOR_BLOCK_SIZE x N rather
+        than N x N, and only the indices above the threshold are kept.
+
+        Args:
+            normalized: Unit-length float32 embeddings
+
+        Returns:
+            Per-article arrays of neighbor indices (each includes itself)
+        """
+        n = len(normalized)
+        neighbors = []
+
+        for start in range(0, n, self.NEIGHBOR_BLOCK_SIZE):
+            block = normalized[start:start + self.NEIGHBOR_BLOCK_SIZE] @ normalized.T
+            for row in block >= self.similarity_threshold:
+                neighbors.append(np.flatnonzero(row))
+
+        return neighbors
+
+    def _greedy_cluster(self, neighbors: List[np.ndarray]) -> np.ndarray:
         """
         Greedy clustering with deterministic ordering.
 
@@ -346,15 +437,18 @@ class SentenceEmbeddingClusterer(BaseClusterer):
         order-dependency artifacts. Articles with more similar neighbors are processed
         first, creating denser, more stable clusters.
 
+        Args:
+            neighbors: Output of _neighbor_lists()
+
         Returns:
             Array of cluster labels (-1 for noise/unique)
         """
-        n = len(similarity_matrix)
+        n = len(neighbors)
         labels = np.full(n, -1, dtype=int)
         current_cluster = 0
 
         # Count similar articles for each item (connectivity)
-        connectivity = np.sum(similarity_matrix >= self.similarity_threshold, axis=1)
+        connectivity = np.array([len(similar) for similar in neighbors])
 
         # Process in descending order of connectivity (most connected first)
         # This makes clustering more deterministic and groups denser clusters first
@@ -364,8 +458,8 @@ class SentenceEmbeddingClusterer(BaseClusterer):
             if labels[i] != -1:
                 continue  # Already assigned
 
-            # Find all articles similar to this one
-            similar_indices = np.where(similarity_matrix[i] >= self.similarity_threshold)[0]
+            # All articles similar to this one
+            similar_indices = neighbors[i]
 
             if len(similar_indices) >= self.min_cluster_size:
                 # Form a cluster
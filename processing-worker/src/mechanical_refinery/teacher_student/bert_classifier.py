@@ -6,6 +6,7 @@ This classifier loads a fine-tuned DistilBERT/DeBERTa model for
 
 from pathlib import Path
 from typing import List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 from src.logger import setup_logger
@@ -24,17 +25,30 @@ class BertClassifier:
     # Class labels (must match training order)
     LABEL_MAP = {0: 'FACTUAL', 1: 'OPINION', 2: 'SLOP'}
 
-    def __init__(self, model_path: Optional[Path] = None):
+    def __init__(
+        self,
+        model_path: Optional[Path] = None,
+        quantize_cpu: bool = False,
+        compile_model: bool = False
+    ):
         """
         Initialize BERT classifier.
 
         Args:
             model_path: Path to saved model directory (contains config.json, model.safetensors, etc.)
+            quantize_cpu: On CPU, dynamically quantize Linear layers to INT8
+                (opt-in: predictions can differ from FP32, and the model
+                version gains an '_int8' suffix)
+            compile_model: On CUDA, compile the model with torch.compile
         """
         self.model_path = model_path
         self.model = None
         self.tokenizer = None
         self.device = None
+        self.dtype = None
+        self.quantize_cpu = quantize_cpu
+        self.quantized = False
+        self.compile_model = compile_model
         self.is_loaded = False
 
         if model_path:
@@ -78,16 +92,48 @@ class BertClassifier:
             self.device = torch.device('cpu')
             logger.info("Using CPU")
 
-        # Load tokenizer and model
-        self.tokenizer = AutoTokenizer.from_pretrained(str(model_path))
+        # Load tokenizer and model. The Rust-backed fast tokenizer batches
+        # in native code and releases the GIL for the prefetch thread
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_path), use_fast=True)
+        if not self.tokenizer.is_fast:
+            raise ValueError(
+                f"No fast tokenizer available for {model_path}. "
+                f"Install the 'tokenizers' package or save the model with a tokenizer.json"
+            )
         self.model = AutoModelForSequenceClassification.from_pretrained(str(model_path))
-        self.model.to(self.device)
+
+        # Half precision on CUDA (tensor cores, half the memory traffic);
+        # bfloat16 where supported since it keeps float32's exponent range
+        if self.device.type == 'cuda':
+            self.dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        else:
+            self.dtype = torch.float32
+
+        self.model.to(self.device, dtype=self.dtype)
         self.model.eval()  # Set to evaluation mode
 
+        # INT8 weights for the Linear layers on CPU: int8 dot products
+        # (VNNI where available) and a quarter of the weight memory traffic
+        if self.device.type == 'cpu' and self.quantize_cpu:
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            self.quantized = True
+
+        # Fused kernels and less per-layer Python overhead. dynamic=True
+        # because length-sorted batches vary in sequence length; the first
+        # batches pay the compile time, so this is for long runs
+        if self.device.type == 'cuda' and self.compile_model and hasattr(torch, 'compile'):
+            self.model = torch.compile(self.model, dynamic=True)
+            logger.info("Model compiled with torch.compile")
+
         self.model_path = model_path
         self.is_loaded = True
 
-        logger.info(f"Model loaded successfully. Device: {self.device}")
+        logger.info(
+            f"Model loaded successfully. Device: {self.device}, dtype: {self.dtype}"
+            f"{', INT8 Linear layers' if self.quantized else ''}"
+        )
 
     def predict(
         self,
@@ -111,8 +157,13 @@ class BertClassifier:
 
         import torch
 
-        all_predictions = []
-        all_confidences = []
+        # Batch texts of similar length together so each batch pads only to
+        # its own longest member; character length is a cheap token proxy
+        order = np.argsort([len(t) for t in texts], kind='stable')
+        sorted_texts = [texts[i] for i in order]
+
+        all_predictions = [None] * len(texts)
+        all_confidences = [0.0] * len(texts)
 
         # Process in batches
         num_batches = (len(texts) + batch_size - 1) // batch_size
@@ -127,36 +178,51 @@ class BertClassifier:
         else:
             batch_iter = range(0, len(texts), batch_size)
 
-        with torch.no_grad():
-            for i in batch_iter:
-                batch_texts = texts[i:i + batch_size]
+        pin = self.device.type == 'cuda'
 
-                # Tokenize
-                inputs = self.tokenizer(
-                    batch_texts,
-                    padding=True,
-                    truncation=True,
-                    max_length=256,  # Match training
-                    return_tensors='pt'
-                )
+        def tokenize(start: int):
+            # Padded to the longest text in this batch
+            inputs = self.tokenizer(
+                sorted_texts[start:start + batch_size],
+                padding='longest',
+                truncation=True,
+                max_length=256,  # Match training
+                return_tensors='pt'
+            )
+            if pin:
+                # Page-locked memory lets the host-to-GPU copy run async
+                inputs = {k: v.pin_memory() for k, v in inputs.items()}
+            return inputs
+
+        # Tokenize one batch ahead on a worker thread (the fast tokenizer
+        # releases the GIL), so the device is not idle between batches
+        with ThreadPoolExecutor(max_workers=1) as tokenizer_pool, torch.inference_mode():
+            next_inputs = tokenizer_pool.submit(tokenize, 0) if texts else None
+
+            for i in batch_iter:
+                inputs = next_inputs.result()
+                if i + batch_size < len(texts):
+                    next_inputs = tokenizer_pool.submit(tokenize, i + batch_size)
 
                 # Move to device
-                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+                inputs = {k: v.to(self.device, non_blocking=pin) for k, v in inputs.items()}
 
                 # Forward pass
                 outputs = self.model(**inputs)
                 logits = outputs.logits
 
-                # Get predictions and confidences
-                probs = torch.softmax(logits, dim=-1)
+                # Get predictions and confidences (softmax in float32 so
+                # half-precision logits give the same confidences)
+                probs = torch.softmax(logits.float(), dim=-1)
                 pred_indices = torch.argmax(probs, dim=-1)
                 confidences = torch.max(probs, dim=-1).values
 
-                # Convert to labels
-                for idx, conf in zip(pred_indices.cpu().numpy(),
-                                     confidences.cpu().numpy()):
-                    all_predictions.append(self.LABEL_MAP[idx])
-                    all_confidences.append(float(conf))
+                # Convert to labels, back in the caller's order
+                for pos, idx, conf in zip(order[i:i + batch_size],
+                                          pred_indices.cpu().numpy(),
+                                          confidences.cpu().numpy()):
+                    all_predictions[pos] = self.LABEL_MAP[idx]
+                    all_confidences[pos] = float(conf)
 
         return all_predictions, all_confidences
 
@@ -176,7 +242,8 @@ class BertClassifier:
     def get_model_version(self) -> str:
         """Get model version string for tracking."""
         if self.model_path:
-            return f"bert_{self.model_path.name}"
+            suffix = '_int8' if self.quantized else ''
+            return f"bert_{self.model_path.name}{suffix}"
         return "bert_unknown"
 
 
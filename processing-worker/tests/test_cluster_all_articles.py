@@ -0,0 +1,96 @@
+"""Tests for streaming windowed clustering in cluster_all_articles.py."""
+
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import numpy as np
+
+import cluster_all_articles
+from cluster_all_articles import cluster_windows, stream_windows
+from mechanical_refinery.clustering import SentenceEmbeddingClusterer
+
+DAY1, DAY2, DAY3 = datetime(2026, 1, 1), datetime(2026, 1, 2), datetime(2026, 1, 3)
+
+
+def article(article_id, title):
+    return {'id': article_id, 'title': title, 'summary': '', 'source': 'Reuters', 'published_at': DAY1}
+
+
+class KeywordClusterer(SentenceEmbeddingClusterer):
+    """Embeds headlines by keyword instead of loading a model."""
+
+    def __init__(self):
+        self.similarity_threshold = 0.78
+        self.min_cluster_size = 2
+        self.encode_calls = []
+
+    def encode(self, articles, batch_size=32):
+        self.encode_calls.append(len(articles))
+        return np.array([[1.0, 0.0] if 'fed' in a['title'] else [0.0, 1.0] for a in articles])
+
+
+def fake_db(rows):
+    """Database whose named cursor yields the given rows."""
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.__iter__.return_value = iter(rows)
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+
+    db = MagicMock()
+
+    @contextmanager
+    def get_connection():
+        yield conn
+
+    db.get_connection = get_connection
+    return db
+
+
+def test_stream_windows_groups_rows_by_window():
+    rows = [
+        (DAY1, DAY2, 1, 'Fed holds', None, 'Reuters', DAY1),
+        (DAY1, DAY2, 2, 'Fed pauses', 'x', 'CNBC', DAY1),
+        (DAY2, DAY3, None, None, None, None, None),
+    ]
+
+    windows = list(stream_windows(fake_db(rows), 24, 24, exclude_sec_edgar=True))
+
+    assert [(start, end, [a['id'] for a in articles]) for start, end, articles in windows] == [
+        (DAY1, DAY2, [1, 2]),
+        (DAY2, DAY3, []),
+    ]
+
+
+def test_cluster_windows_encodes_once_and_slices_per_window():
+    clusterer = KeywordClusterer()
+    db = MagicMock()
+    windows = [
+        (1, DAY1, DAY2, [article(1, 'fed holds'), article(2, 'fed pauses'), article(3, 'oil rises')]),
+        (2, DAY2, DAY3, [article(4, 'single story')]),
+        (3, DAY2, DAY3, [article(5, 'oil jumps'), article(6, 'oil climbs')]),
+    ]
+    stats = {'windows': 3, 'articles': 6, 'processed': 0, 'clusters': 0, 'time': 0.0}
+
+    cluster_windows(db, clusterer, windows, stats)
+
+    assert clusterer.encode_calls == [5]
+    assert stats['processed'] == 5
+    saved = [call.kwargs['assignments'] for call in db.save_cluster_results.call_args_list]
+    assert [sorted(a['article_id'] for a in assignments) for assignments in saved] == [[1, 2, 3], [5, 6]]
+
+
+def test_main_streams_in_encode_batches(monkeypatch):
+    rows = [(DAY1, DAY2, i, f'fed story {i}', None, 'Reuters', DAY1) for i in range(3)]
+    rows += [(DAY2, DAY3, i, f'oil story {i}', None, 'Reuters', DAY2) for i in range(3, 6)]
+    clusterer = KeywordClusterer()
+    db = fake_db(rows)
+
+    monkeypatch.setattr(cluster_all_articles, 'ENCODE_BATCH_ARTICLES', 3)
+    monkeypatch.setattr(cluster_all_articles, 'ProcessingDatabaseManager', lambda: db)
+    monkeypatch.setattr(cluster_all_articles, 'SentenceEmbeddingClusterer', lambda **kwargs: clusterer)
+
+    cluster_all_articles.main()
+
+    assert clusterer.encode_calls == [3, 3]
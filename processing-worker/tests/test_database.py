@@ -0,0 +1,66 @@
+"""Tests for ProcessingDatabaseManager queries (against a mocked connection)."""
+
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.database import ProcessingDatabaseManager
+
+
+@pytest.fixture
+def db():
+    """Manager whose connections hand out one recording cursor."""
+    manager = ProcessingDatabaseManager()
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+
+    @contextmanager
+    def get_connection():
+        yield conn
+
+    manager.get_connection = get_connection
+    manager.cursor = cursor
+    return manager
+
+
+def executed_sql(cursor):
+    sql, params = cursor.execute.call_args.args
+    return ' '.join(sql.split()), params
+
+
+def test_claim_unclassified_marks_rows_with_worker_and_time(db):
+    db.cursor.fetchall.return_value = [{'id': 1, 'title': 'T', 'summary': None,
+                                        'source': 'Reuters', 'published_at': None}]
+
+    claimed = db.claim_unclassified(500, 'claimed_abc')
+
+    sql, params = executed_sql(db.cursor)
+    assert claimed == [{'id': 1, 'title': 'T', 'summary': None, 'source': 'Reuters', 'published_at': None}]
+    assert "SET classification_source = %s, classified_at = NOW()" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert params == ('claimed_abc', 30, 500)
+
+
+def test_claim_unclassified_reclaims_expired_claims(db):
+    db.cursor.fetchall.return_value = []
+
+    db.claim_unclassified(100, 'claimed_abc', claim_timeout_minutes=5)
+
+    sql, params = executed_sql(db.cursor)
+    assert "OR classification_source NOT LIKE 'claimed%%'" in sql
+    assert "OR classified_at < NOW() - make_interval(mins => %s)" in sql
+    assert params == ('claimed_abc', 5, 100)
+
+
+def test_release_claims_clears_marker_and_time(db):
+    db.cursor.rowcount = 3
+
+    assert db.release_claims('claimed_abc') == 3
+
+    sql, params = executed_sql(db.cursor)
+    assert "SET classification_source = NULL, classified_at = NULL" in sql
+    assert "WHERE classification_source = %s AND classification_label IS NULL" in sql
+    assert params == ('claimed_abc',)
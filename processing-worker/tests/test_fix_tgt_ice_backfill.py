@@ -0,0 +1,56 @@
+"""Tests for the TGT backfill's mention reinsert (against a mocked cursor)."""
+
+import csv
+from unittest.mock import MagicMock
+
+import fix_tgt_ice_backfill
+from fix_tgt_ice_backfill import COPY_THRESHOLD, insert_mentions
+from mechanical_refinery.entity_mapper import CompanyMention
+
+
+def mentions(count):
+    """mentions_by_article with one TGT mention per article."""
+    return {
+        article_id: [CompanyMention(
+            article_id=article_id, company_id=42, ticker='TGT', mention_type='title',
+            match_method='name', matched_text='Target', confidence=0.9
+        )]
+        for article_id in range(1, count + 1)
+    }
+
+
+def test_small_sets_use_one_multi_row_insert(monkeypatch):
+    execute_values = MagicMock()
+    monkeypatch.setattr(fix_tgt_ice_backfill, 'execute_values', execute_values)
+    cur = MagicMock()
+
+    assert insert_mentions(cur, mentions(3)) == 3
+
+    _, sql, rows = execute_values.call_args.args
+    assert 'ON CONFLICT (article_id, company_id) DO UPDATE' in sql
+    assert rows[0] == (1, 42, 'TGT', 'title', 'name', 'Target', 0.9)
+    cur.copy_expert.assert_not_called()
+
+
+def test_large_sets_are_copied_through_staging_table(monkeypatch):
+    execute_values = MagicMock()
+    monkeypatch.setattr(fix_tgt_ice_backfill, 'execute_values', execute_values)
+    cur = MagicMock()
+    copied = []
+    cur.copy_expert.side_effect = lambda sql, buffer: copied.append((sql, buffer.read()))
+
+    assert insert_mentions(cur, mentions(COPY_THRESHOLD)) == COPY_THRESHOLD
+
+    execute_values.assert_not_called()
+    copy_sql, body = copied[0]
+    assert copy_sql.startswith('COPY mentions_staging')
+    rows = list(csv.reader(body.splitlines()))
+    assert len(rows) == COPY_THRESHOLD
+    assert rows[0] == ['1', '42', 'TGT', 'title', 'name', 'Target', '0.9']
+
+    statements = [' '.join(call.args[0].split()) for call in cur.execute.call_args_list]
+    assert statements[0].startswith('CREATE TEMP TABLE mentions_staging')
+    assert 'ON COMMIT DROP' in statements[0]
+    assert statements[1].startswith('INSERT INTO article_company_mentions')
+    assert 'FROM mentions_staging' in statements[1]
+    assert 'ON CONFLICT (article_id, company_id) DO UPDATE' in statements[1]
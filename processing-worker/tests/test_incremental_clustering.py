@@ -0,0 +1,54 @@
+"""Tests for matching new articles to existing cluster centroids."""
+
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import numpy as np
+
+import incremental_clustering
+from incremental_clustering import match_to_centroids, normalize_rows, save_matched_articles
+
+
+def test_match_to_centroids_picks_best_centroid_above_threshold(monkeypatch):
+    monkeypatch.setattr(incremental_clustering, 'MATCH_BLOCK_SIZE', 2)
+    articles = [{'id': i} for i in range(3)]
+    centroids = [
+        {'id': 10, 'batch_id': 'b1', 'cluster_label': 0},
+        {'id': 11, 'batch_id': 'b1', 'cluster_label': 1},
+    ]
+    article_embeddings = normalize_rows(np.array([[1.0, 0.1], [0.1, 1.0], [-1.0, -1.0]]))
+    centroid_embeddings = normalize_rows(np.array([[1.0, 0.0], [0.0, 1.0]]))
+
+    matched, unmatched = match_to_centroids(articles, centroids, article_embeddings, centroid_embeddings)
+
+    assert [(m['article']['id'], m['centroid_id'], m['cluster_label']) for m in matched] == [
+        (0, 10, 0),
+        (1, 11, 1),
+    ]
+    assert matched[0]['similarity'] > 0.99
+    assert unmatched == [{'id': 2}]
+
+
+def test_save_matched_articles_batches_both_tables(monkeypatch):
+    execute_values = MagicMock()
+    monkeypatch.setattr(incremental_clustering, 'execute_values', execute_values)
+    conn = MagicMock()
+    db = MagicMock()
+
+    @contextmanager
+    def get_connection():
+        yield conn
+
+    db.get_connection = get_connection
+    matched = [
+        {'article': {'id': 1}, 'batch_id': 'b1', 'cluster_label': 0, 'similarity': 0.75, 'centroid_id': 10},
+        {'article': {'id': 2}, 'batch_id': 'b1', 'cluster_label': 1, 'similarity': 0.5, 'centroid_id': 11},
+    ]
+
+    save_matched_articles(db, matched)
+
+    update, insert = execute_values.call_args_list
+    assert 'UPDATE articles_raw AS a' in update.args[1]
+    assert update.args[2] == [('b1', 0, 0.25, 1), ('b1', 1, 0.5, 2)]
+    assert 'INSERT INTO article_clusters' in insert.args[1]
+    assert insert.args[2] == [('b1', 1, 0, 0.25), ('b1', 2, 1, 0.5)]